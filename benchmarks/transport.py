@@ -0,0 +1,100 @@
+"""Compare per-call overhead of the HTTP and RPC transports to a client.
+
+Usage: python benchmarks/transport.py FILE [-n CALLS] [--concurrency N]
+
+Starts (or reuses) the client for FILE through the manager, then times
+`/client/id`, which does no language server work, and `/capability/outline`
+on FILE over both transports.
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import anyio
+from lsap.schema.outline import OutlineRequest, OutlineResponse
+from pydantic import RootModel
+
+from lsp_cli.cli.connect import ServerClient, open_client, open_manager
+from lsp_cli.manager.models import (
+    CreateClientRequest,
+    CreateClientResponse,
+    GetIDResponse,
+)
+from lsp_cli.settings import settings
+
+type Call = Callable[[ServerClient], Awaitable[None]]
+
+
+async def bench_sequential(client: ServerClient, call: Call, n: int) -> list[float]:
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        await call(client)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def bench_concurrent(
+    client: ServerClient, call: Call, n: int, concurrency: int
+) -> float:
+    limiter = anyio.CapacityLimiter(concurrency)
+
+    async def one() -> None:
+        async with limiter:
+            await call(client)
+
+    start = time.perf_counter()
+    async with anyio.create_task_group() as tg:
+        for _ in range(n):
+            tg.start_soon(one)
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", type=Path)
+    parser.add_argument("-n", "--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    async with open_manager() as manager:
+        resp = await manager.post(
+            "/create",
+            CreateClientResponse,
+            json=CreateClientRequest(path=args.file.resolve()),
+        )
+
+    async def client_id(client: ServerClient) -> None:
+        await client.get("/client/id", GetIDResponse)
+
+    async def outline(client: ServerClient) -> None:
+        await client.post(
+            "/capability/outline",
+            RootModel[OutlineResponse | None],
+            json=OutlineRequest(file_path=args.file),
+        )
+
+    print(f"{'transport':<10}{'call':<10}{'p50 ms':>10}{'mean ms':>10}{'conc/s':>10}")
+    for transport in ("http", "rpc"):
+        settings.transport = transport
+        async with open_client(resp.uds_path, resp.rpc_path) as (client, _):
+            for name, call in (("id", client_id), ("outline", outline)):
+                # Warm up caches on both ends before measuring.
+                await bench_sequential(client, call, 3)
+                samples = await bench_sequential(client, call, args.calls)
+                elapsed = await bench_concurrent(
+                    client, call, args.calls, args.concurrency
+                )
+                print(
+                    f"{transport:<10}{name:<10}"
+                    f"{statistics.median(samples) * 1e3:>10.2f}"
+                    f"{statistics.mean(samples) * 1e3:>10.2f}"
+                    f"{args.calls / elapsed:>10.0f}"
+                )
+
+
+if __name__ == "__main__":
+    anyio.run(main)
@@ -1,3 +1,4 @@
+import importlib
 import signal
 import sys
 from textwrap import dedent
@@ -5,19 +6,9 @@ from textwrap import dedent
 import cyclopts
 from loguru import logger
 
-from lsp_cli.cli import (
-    definition,
-    locate,
-    outline,
-    reference,
-    rename,
-    search,
-    server,
-    symbol,
-)
 from lsp_cli.exceptions import CapabilityCommandException
 from lsp_cli.logging import setup_logging
-from lsp_cli.settings import MANAGER_LOG_PATH, get_client_log_path
+from lsp_cli.paths import MANAGER_LOG_PATH, get_client_log_path
 from lsp_cli.state import env_state
 
 app = cyclopts.App(
@@ -28,15 +19,52 @@ app = cyclopts.App(
     exit_on_error=False,
 )
 
-# Add sub-apps
-app.command(server.app)
-app.command(rename.app)
-app.command(definition.app)
-app.command(locate.app)
-app.command(reference.app)
-app.command(outline.app)
-app.command(symbol.app)
-app.command(search.app)
+# Sub-apps. They are imported lazily, so each invocation only loads the modules
+# of the command it runs.
+COMMANDS = (
+    "server",
+    "rename",
+    "definition",
+    "locate",
+    "reference",
+    "calls",
+    "outline",
+    "symbol",
+    "search",
+    "diagnostics",
+    "index",
+    "unused",
+    "raw",
+    "shell",
+)
+for name in COMMANDS:
+    app.command(f"lsp_cli.cli.{name}:app", name=name)
+
+
+def load_commands() -> None:
+    """Import the modules of every command now rather than when it runs."""
+    for name in COMMANDS:
+        importlib.import_module(f"lsp_cli.cli.{name}")
+
+
+def report_error(e: Exception) -> None:
+    match e:
+        case CapabilityCommandException() as cce:
+            client_log_path = get_client_log_path(cce.client_id)
+        case _:
+            client_log_path = get_client_log_path(None)
+
+    print(f"An error occurred: {e}", file=sys.stderr)
+    if env_state.debug:
+        print(
+            dedent(
+                f"""\
+                For more details, check the logs:
+                manager: {MANAGER_LOG_PATH}
+                client: {client_log_path}"""
+            ),
+            file=sys.stderr,
+        )
 
 
 @logger.catch
@@ -52,23 +80,7 @@ def run() -> None:
     try:
         app()
     except Exception as e:  # noqa: BLE001
-        match e:
-            case CapabilityCommandException() as cce:
-                client_log_path = get_client_log_path(cce.client_id)
-            case _:
-                client_log_path = get_client_log_path(None)
-
-        print(f"An error occurred: {e}", file=sys.stderr)
-        if env_state.debug:
-            print(
-                dedent(
-                    f"""\
-                    For more details, check the logs:
-                    manager: {MANAGER_LOG_PATH}
-                    client: {client_log_path}"""
-                ),
-                file=sys.stderr,
-            )
+        report_error(e)
 
 
 if __name__ == "__main__":
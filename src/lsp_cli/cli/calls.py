@@ -0,0 +1,212 @@
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from typing import Annotated
+
+import cyclopts
+from attrs import frozen
+from lsap.schema.locate import LocateRequest
+
+from lsp_cli.manager.models import (
+    CallDirection,
+    CallNode,
+    CallsExpandRequest,
+    CallsResponse,
+)
+from lsp_cli.settings import settings
+
+from . import options as op
+from .connect import connect_server
+from .utils import create_locate, display_path
+
+app = cyclopts.App(
+    name="calls",
+    help="Trace the callers or callees of a function, level by level.",
+)
+
+
+@frozen
+class CallEntry:
+    node: CallNode
+    # The node of the previous level that it calls or is called by.
+    parent: CallNode
+    # 1-based lines of the calls in the caller's file.
+    lines: list[int]
+    # Listed before, so it is not expanded again.
+    seen: bool
+
+
+@frozen
+class CallLevel:
+    depth: int
+    entries: list[CallEntry]
+    # Nodes were left out for the node budget.
+    truncated: bool = False
+
+
+async def walk_calls(
+    expand: Callable[[list[CallNode]], Awaitable[CallsResponse]],
+    roots: Sequence[CallNode],
+    direction: CallDirection,
+    depth: int,
+    max_nodes: int,
+    errors: list[str],
+) -> AsyncIterator[CallLevel]:
+    """The levels of the call hierarchy below `roots`, as each is expanded.
+
+    Every node is expanded once, however many nodes reach it, so cycles end
+    where they come back to a node already listed. No new nodes are listed
+    past `max_nodes`, counting the roots.
+    """
+    nodes = {node.id: node for node in roots}
+    frontier = list(roots)
+    for level in range(1, depth + 1):
+        if not frontier:
+            return
+        resp = await expand(frontier)
+        errors.extend(resp.errors)
+        reached = {node.id: node for node in resp.nodes}
+
+        entries: list[CallEntry] = []
+        frontier = []
+        truncated = False
+        for edge in resp.edges:
+            parent_id, node_id = (
+                (edge.callee, edge.caller)
+                if direction == "incoming"
+                else (edge.caller, edge.callee)
+            )
+            if node_id in nodes:
+                entries.append(
+                    CallEntry(nodes[node_id], nodes[parent_id], edge.lines, True)
+                )
+                continue
+            if len(nodes) >= max_nodes:
+                truncated = True
+                continue
+            node = nodes[node_id] = reached[node_id]
+            frontier.append(node)
+            entries.append(CallEntry(node, nodes[parent_id], edge.lines, False))
+
+        yield CallLevel(level, entries, truncated)
+        if truncated:
+            return
+
+
+def _at_lines(lines: Sequence[int]) -> str:
+    if len(lines) == 1:
+        return f"at line {lines[0]}"
+    return f"at lines {', '.join(map(str, lines))}"
+
+
+def format_node(node: CallNode) -> str:
+    return f"`{node.name}` ({node.kind}) `{display_path(node.file_path)}:{node.line}`"
+
+
+def format_level(level: CallLevel, direction: CallDirection) -> str:
+    lines = [f"## Depth {level.depth}"]
+    for entry in level.entries:
+        relation = (
+            f"calls `{entry.parent.name}`"
+            if direction == "incoming"
+            else f"called by `{entry.parent.name}`"
+        )
+        line = f"- {format_node(entry.node)}, {relation} {_at_lines(entry.lines)}"
+        if entry.seen:
+            line += " (listed above)"
+        lines.append(line)
+    if not level.entries:
+        lines.append("No calls found.")
+    return "\n".join(lines)
+
+
+@app.default
+async def calls(
+    file_path: op.FilePathOpt,
+    /,
+    *,
+    scope: op.ScopeOpt = None,
+    find: op.FindOpt = None,
+    incoming: Annotated[
+        bool,
+        cyclopts.Parameter(
+            name=["--incoming"],
+            help="Trace the callers of the symbol (the default).",
+        ),
+    ] = False,
+    outgoing: Annotated[
+        bool,
+        cyclopts.Parameter(
+            name=["--outgoing"],
+            help="Trace the functions the symbol calls.",
+        ),
+    ] = False,
+    depth: Annotated[
+        int,
+        cyclopts.Parameter(
+            name=["--depth"],
+            help="Levels of calls to trace.",
+            validator=op.positive_int_validator,
+        ),
+    ] = 2,
+    max_nodes: Annotated[
+        int | None,
+        cyclopts.Parameter(
+            name=["--max-nodes"],
+            help="Max functions to list, counting the symbol itself.",
+            validator=op.positive_int_validator,
+        ),
+    ] = None,
+    project: op.ProjectOpt = None,
+) -> None:
+    """
+    Trace who calls a function (--incoming, the default) or what it calls
+    (--outgoing), up to --depth levels away.
+
+    Each level is printed as soon as it is expanded. A function reached again,
+    e.g. through recursion, is marked as listed above and not expanded twice.
+    """
+
+    if incoming and outgoing:
+        raise ValueError("--incoming and --outgoing cannot be used together")
+    direction: CallDirection = "outgoing" if outgoing else "incoming"
+    locate = create_locate(file_path, scope, find)
+
+    async with connect_server(locate.file_path, project_path=project) as client:
+        prepared = await client.post(
+            "/capability/calls/prepare",
+            CallsResponse,
+            json=LocateRequest(locate=locate),
+        )
+        if not prepared.nodes:
+            print("Warning: No call hierarchy found")
+            return
+
+        title = "Incoming calls" if direction == "incoming" else "Outgoing calls"
+        for root in prepared.nodes:
+            print(f"# {title} of {format_node(root)}\n")
+
+        async def expand(nodes: list[CallNode]) -> CallsResponse:
+            return await client.post(
+                "/capability/calls/expand",
+                CallsResponse,
+                json=CallsExpandRequest(nodes=nodes, direction=direction),
+            )
+
+        errors: list[str] = []
+        limit = max_nodes if max_nodes is not None else settings.calls_max_nodes
+        last: CallLevel | None = None
+        async for level in walk_calls(
+            expand, prepared.nodes, direction, depth, limit, errors
+        ):
+            print(format_level(level, direction) + "\n")
+            last = level
+
+    for error in errors:
+        print(f"Warning: Cannot expand {error}")
+    if last is not None and last.truncated:
+        print(f"Info: Stopped at {limit} functions. Use --max-nodes to list more.")
+    elif (
+        last is not None
+        and last.depth == depth
+        and any(not entry.seen for entry in last.entries)
+    ):
+        print("Info: Use --depth to trace further.")
@@ -0,0 +1,233 @@
+"""Connections from the CLI to the manager and its clients.
+
+Every command imports this module, so it must not pull in the server stack.
+"""
+
+import os
+import subprocess
+import sys
+from collections.abc import AsyncGenerator
+from contextlib import AsyncExitStack, asynccontextmanager, suppress
+from contextvars import ContextVar
+from pathlib import Path
+
+import anyio
+import httpx
+from attrs import define, field
+
+from lsp_cli.exceptions import CapabilityCommandException
+from lsp_cli.manager.models import (
+    CreateClientRequest,
+    CreateClientResponse,
+    GetIDResponse,
+)
+from lsp_cli.paths import (
+    MANAGER_LOG_PATH,
+    MANAGER_READY_FD_ENV,
+    MANAGER_STARTUP_LOCK_PATH,
+    MANAGER_UDS_PATH,
+)
+from lsp_cli.settings import settings
+from lsp_cli.utils.http import AsyncHttpClient
+from lsp_cli.utils.lock import file_lock
+from lsp_cli.utils.rpc import RpcClient, RpcError, connect_rpc
+from lsp_cli.utils.socket import is_socket_alive
+
+DEFAULT_HTTP_TIMEOUT = 60.0
+
+type ServerClient = AsyncHttpClient | RpcClient
+
+
+async def _spawn_manager(timeout: float) -> bool:
+    """Spawn a background manager and wait until its socket is listening.
+
+    Readiness is signalled by the child writing to an inherited pipe, so no
+    polling is needed. If the child exits early, the pipe hits EOF instead and
+    False is returned.
+    """
+    read_fd, write_fd = os.pipe()
+    try:
+        try:
+            # A plain Popen (rather than an asyncio subprocess transport) keeps the
+            # detached manager alive when this short-lived CLI process exits.
+            subprocess.Popen(
+                (sys.executable, "-m", "lsp_cli.manager"),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                env={**os.environ, MANAGER_READY_FD_ENV: str(write_fd)},
+                pass_fds=(write_fd,),
+                start_new_session=True,
+            )
+        finally:
+            os.close(write_fd)
+
+        with anyio.fail_after(timeout):
+            await anyio.wait_readable(read_fd)
+        return bool(os.read(read_fd, 1))
+    finally:
+        os.close(read_fd)
+
+
+async def start_manager(timeout: float = 10.0) -> None:
+    """Start the background manager unless another process already did.
+
+    Concurrent callers are serialized by a startup lock: the first one spawns
+    the manager and holds the lock until it is ready, the others wait on the
+    lock and then find the socket alive.
+
+    A spawned manager that defers to one shutting down exits without becoming
+    ready, so the socket is checked again and one more manager is spawned.
+    """
+    async with file_lock(MANAGER_STARTUP_LOCK_PATH, timeout=timeout):
+        for _ in range(2):
+            if await is_socket_alive(MANAGER_UDS_PATH) or await _spawn_manager(timeout):
+                return
+    raise RuntimeError(f"Manager exited before becoming ready, see {MANAGER_LOG_PATH}")
+
+
+@asynccontextmanager
+async def open_manager(start: bool = True) -> AsyncGenerator[AsyncHttpClient]:
+    if start and not await is_socket_alive(MANAGER_UDS_PATH):
+        await start_manager()
+
+    transport = httpx.AsyncHTTPTransport(uds=str(MANAGER_UDS_PATH), retries=5)
+
+    async with AsyncHttpClient(
+        httpx.AsyncClient(
+            transport=transport,
+            base_url="http://localhost",
+            timeout=30.0,
+        )
+    ) as client:
+        yield client
+
+
+@asynccontextmanager
+async def open_client(
+    uds_path: Path, rpc_path: Path | None = None
+) -> AsyncGenerator[tuple[ServerClient, str]]:
+    timeout = settings.warmup_time + DEFAULT_HTTP_TIMEOUT
+    client: ServerClient
+    if settings.transport == "rpc" and rpc_path is not None:
+        client = await connect_rpc(rpc_path, timeout=timeout)
+    else:
+        transport = httpx.AsyncHTTPTransport(uds=uds_path.as_posix())
+        client = AsyncHttpClient(
+            httpx.AsyncClient(
+                transport=transport,
+                base_url="http://localhost",
+                timeout=timeout,
+            )
+        )
+
+    async with client:
+        resp = await client.get("/client/id", GetIDResponse)
+        yield client, resp.id
+
+
+def error_detail(e: Exception) -> str:
+    """The message of an error returned by the manager or a client."""
+    match e:
+        case httpx.HTTPStatusError():
+            with suppress(Exception):
+                return e.response.json().get("detail", str(e))
+        case RpcError():
+            return e.detail
+    return str(e)
+
+
+@define
+class Session:
+    """Connections kept open across the commands of one process, e.g. `lsp shell`."""
+
+    _stack: AsyncExitStack
+    _manager: AsyncHttpClient | None = field(default=None, init=False)
+    _clients: dict[Path, tuple[ServerClient, str]] = field(factory=dict, init=False)
+    # Commands may connect concurrently, e.g. to outline many files.
+    _lock: anyio.Lock = field(factory=anyio.Lock, init=False)
+
+    async def manager(self) -> AsyncHttpClient:
+        async with self._lock:
+            # An earlier command may have shut the manager down; reopening
+            # respawns it.
+            if self._manager is None or not await is_socket_alive(MANAGER_UDS_PATH):
+                self._manager = await self._stack.enter_async_context(open_manager())
+            return self._manager
+
+    async def client(
+        self, uds_path: Path, rpc_path: Path | None = None
+    ) -> tuple[ServerClient, str]:
+        async with self._lock:
+            if uds_path not in self._clients:
+                self._clients[uds_path] = await self._stack.enter_async_context(
+                    open_client(uds_path, rpc_path)
+                )
+            return self._clients[uds_path]
+
+
+_session: ContextVar[Session | None] = ContextVar("session", default=None)
+
+
+@asynccontextmanager
+async def open_session() -> AsyncGenerator[Session]:
+    """Reuse manager and client connections for all commands run inside."""
+    async with AsyncExitStack() as stack:
+        session = Session(stack)
+        token = _session.set(session)
+        try:
+            yield session
+        finally:
+            _session.reset(token)
+
+
+@asynccontextmanager
+async def connect_manager() -> AsyncGenerator[AsyncHttpClient]:
+    if session := _session.get():
+        yield await session.manager()
+        return
+
+    async with open_manager() as client:
+        yield client
+
+
+@asynccontextmanager
+async def connect_client(
+    uds_path: Path, rpc_path: Path | None = None
+) -> AsyncGenerator[tuple[ServerClient, str]]:
+    if session := _session.get():
+        yield await session.client(uds_path, rpc_path)
+        return
+
+    async with open_client(uds_path, rpc_path) as conn:
+        yield conn
+
+
+@asynccontextmanager
+async def connect_server(
+    path: Path, project_path: Path | None = None
+) -> AsyncGenerator[ServerClient]:
+    if not path.exists():
+        raise FileNotFoundError(f"File not found: {path}")
+
+    try:
+        async with connect_manager() as client:
+            resp = await client.post(
+                "/create",
+                CreateClientResponse,
+                json=CreateClientRequest(
+                    path=path.resolve(), project_path=project_path
+                ),
+            )
+
+        async with connect_client(resp.uds_path, resp.rpc_path) as (client, client_id):
+            try:
+                yield client
+            except (httpx.HTTPStatusError, RpcError) as e:
+                raise CapabilityCommandException(
+                    client_id=client_id, message=error_detail(e)
+                ) from e
+            except Exception as e:
+                raise CapabilityCommandException(client_id=client_id) from e
+    except httpx.HTTPStatusError as e:
+        raise RuntimeError(error_detail(e)) from e
@@ -5,7 +5,8 @@ from lsap.schema.definition import DefinitionRequest, DefinitionResponse
 from lsap.schema.rename import RootModel
 
 from . import options as op
-from .utils import connect_server, create_locate
+from .connect import connect_server
+from .utils import create_locate
 
 app = cyclopts.App(
     name="definition",
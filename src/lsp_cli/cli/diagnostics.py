@@ -0,0 +1,64 @@
+from pathlib import Path
+from typing import Annotated
+
+import cyclopts
+
+from lsp_cli.manager.models import DiagnosticsRequest, DiagnosticsResponse
+from lsp_cli.settings import settings
+
+from . import options as op
+from .connect import connect_server
+
+app = cyclopts.App(
+    name="diagnostics",
+    help="Get errors and warnings reported by the language server.",
+)
+
+
+@app.default
+async def diagnostics(
+    path: Annotated[
+        Path | None,
+        cyclopts.Parameter(
+            help="File or directory to check. Defaults to the project, then the current directory.",
+            converter=op.path_converter,
+        ),
+    ] = None,
+    /,
+    *,
+    max_files: Annotated[
+        int | None,
+        cyclopts.Parameter(
+            name=["--max-files"],
+            help="Max files to check that have no diagnostics yet.",
+            validator=op.positive_int_validator,
+        ),
+    ] = None,
+    project: op.ProjectOpt = None,
+) -> None:
+    """
+    Get errors and warnings for a file, or for every source file in a directory.
+
+    Files the server has already checked (e.g. because another command opened
+    them) are answered instantly; the rest are checked a few at a time.
+    """
+
+    target = path or project or Path.cwd()
+
+    async with connect_server(target, project_path=project) as client:
+        resp = await client.post(
+            "/capability/diagnostics",
+            DiagnosticsResponse,
+            json=DiagnosticsRequest(
+                path=target,
+                max_files=max_files
+                if max_files is not None
+                else settings.default_max_files,
+            ),
+        )
+
+    print(resp.format())
+    if resp.unchecked_files:
+        print(
+            "\nInfo: Some files were not checked. Run again, or raise --max-files, to check more."
+        )
@@ -0,0 +1,226 @@
+import json
+from collections import Counter
+from collections.abc import Sequence
+from itertools import batched
+from pathlib import Path
+from typing import Annotated, Any, TextIO
+
+import anyio
+import anyio.to_thread
+import cyclopts
+import httpx
+from attrs import define, field
+
+from lsp_cli.manager.models import (
+    CreateClientResponse,
+    CreateClientsRequest,
+    CreateClientsResponse,
+    IndexRequest,
+    IndexResponse,
+)
+from lsp_cli.utils.files import content_hash, iter_source_files
+from lsp_cli.utils.rpc import RpcError
+
+from . import options as op
+from .connect import connect_client, connect_manager, error_detail
+
+app = cyclopts.App(
+    name="index",
+    help="Export the symbols of a whole project.",
+)
+
+INDEX_VERSION = 1
+INDEX_FIELDS = ("name", "kind", "line", "character", "end_line", "parent")
+
+# Files sent to a client per request, so each one is answered well within the
+# request timeout however large the project is.
+INDEX_BATCH_FILES = 64
+
+type IndexRecord = dict[str, Any]
+
+
+def read_index(path: Path, root: Path) -> dict[str, IndexRecord]:
+    """Records of a previous export of `root` by relative path, if it is usable."""
+    try:
+        with path.open(encoding="utf-8") as f:
+            header = json.loads(next(f, "null"))
+            if not isinstance(header, dict) or (
+                header.get("version"),
+                header.get("root"),
+            ) != (INDEX_VERSION, root.as_posix()):
+                return {}
+            return {record["path"]: record for record in map(json.loads, f)}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def assign_files(
+    files: Sequence[Path], clients: Sequence[CreateClientResponse]
+) -> dict[int, list[Path]]:
+    """Files of each client by its index, given to the innermost project of
+    their language."""
+    order = sorted(
+        range(len(clients)), key=lambda i: -len(clients[i].info.project_path.parts)
+    )
+    assigned: dict[int, list[Path]] = {}
+    for path in files:
+        for index in order:
+            info = clients[index].info
+            if path.name.endswith(tuple(info.suffixes)) and path.is_relative_to(
+                info.project_path
+            ):
+                assigned.setdefault(index, []).append(path)
+                break
+    return assigned
+
+
+def _hash_files(files: Sequence[Path]) -> dict[Path, str]:
+    hashes = {}
+    for path in files:
+        try:
+            hashes[path] = content_hash(path.read_bytes())
+        except OSError:
+            continue
+    return hashes
+
+
+@define
+class IndexWriter:
+    """Records written to an export as they come, with counts for the summary."""
+
+    file: TextIO
+    written: set[str] = field(factory=set)
+    counts: Counter[str] = field(factory=Counter)
+
+    def write(self, record: IndexRecord, status: str | None = None) -> None:
+        self.file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        self.file.write("\n")
+        if status is not None:
+            self.written.add(record["path"])
+            self.counts[status] += 1
+            self.counts["symbols"] += len(record["symbols"])
+
+
+async def _index_files(
+    server: CreateClientResponse,
+    paths: Sequence[Path],
+    root: Path,
+    writer: IndexWriter,
+    errors: list[str],
+) -> None:
+    info = server.info
+    try:
+        async with connect_client(server.uds_path, server.rpc_path) as (client, _):
+            for batch in batched(paths, INDEX_BATCH_FILES, strict=False):
+                resp = await client.post(
+                    "/capability/index",
+                    IndexResponse,
+                    json=IndexRequest(files=list(batch)),
+                )
+                errors.extend(resp.errors)
+                for file in resp.files:
+                    record = {
+                        "path": file.file_path.relative_to(root).as_posix(),
+                        "language": info.language,
+                        "hash": file.content_hash,
+                        "symbols": file.symbols,
+                    }
+                    writer.write(record, "updated")
+    except (httpx.HTTPError, RpcError, OSError) as e:
+        errors.append(f"{info.language} {info.project_path}: {error_detail(e)}")
+
+
+@app.command(name="export")
+async def export(
+    path: Annotated[
+        Path | None,
+        cyclopts.Parameter(
+            help="Directory to index. Defaults to the project or current directory."
+        ),
+    ] = None,
+    /,
+    *,
+    output: Annotated[
+        Path,
+        cyclopts.Parameter(
+            name=["--output", "-o"],
+            help="File to write. A previous export of the same directory there is updated incrementally.",
+        ),
+    ] = Path("lsp-index.jsonl"),
+    project: op.ProjectOpt = None,
+) -> None:
+    """
+    Export the symbols of every source file in a project as JSON Lines.
+
+    The first line names the indexed directory and the fields of each symbol.
+    Every other line holds one file's path, language, content hash and symbols,
+    each a list of those fields; `parent` is the index of the enclosing symbol
+    in the file's list, or -1. Lines and characters are 1-based.
+
+    Files whose contents are unchanged since the previous export to the same
+    output are carried over without asking the language server again.
+    """
+
+    root = (path or project or Path.cwd()).resolve()
+    output = output.resolve()
+    previous = await anyio.to_thread.run_sync(read_index, output, root)
+
+    async with connect_manager() as manager:
+        created = await manager.post(
+            "/create/all",
+            CreateClientsResponse,
+            json=CreateClientsRequest(path=root, project_path=project),
+        )
+    for error in created.errors:
+        print(f"Warning: Failed to start server for {error}")
+    clients = created.clients
+    suffixes = sorted({s for client in clients for s in client.info.suffixes})
+    found = await anyio.to_thread.run_sync(iter_source_files, root, suffixes)
+    if not found:
+        print("Warning: No source files found")
+        return
+    hashes = await anyio.to_thread.run_sync(_hash_files, [p for p, _ in found])
+
+    errors: list[str] = []
+    # The previous export stays in place until the new one is complete.
+    temp = output.with_name(f".{output.name}.tmp")
+    try:
+        with temp.open("w", encoding="utf-8") as f:
+            writer = IndexWriter(f)
+            header = {
+                "version": INDEX_VERSION,
+                "root": root.as_posix(),
+                "fields": INDEX_FIELDS,
+            }
+            writer.write(header)
+            async with anyio.create_task_group() as tg:
+                for index, paths in assign_files(list(hashes), clients).items():
+                    language = clients[index].info.language
+                    changed = []
+                    for file_path in paths:
+                        record = previous.get(file_path.relative_to(root).as_posix())
+                        if (
+                            record is not None
+                            and record.get("hash") == hashes[file_path]
+                            and record.get("language") == language
+                        ):
+                            writer.write(record, "unchanged")
+                        else:
+                            changed.append(file_path)
+                    if changed:
+                        tg.start_soon(
+                            _index_files, clients[index], changed, root, writer, errors
+                        )
+        temp.replace(output)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+
+    for error in errors:
+        print(f"Warning: Cannot index {error}")
+    counts = writer.counts
+    print(
+        f"Success: Indexed {len(writer.written)} files ({counts['symbols']} symbols)"
+        f" to {output}: {counts['updated']} updated, {counts['unchanged']} unchanged,"
+        f" {len(previous.keys() - writer.written)} removed."
+    )
@@ -1,11 +1,14 @@
 from typing import Annotated
 
 import cyclopts
-from lsap.schema.locate import LocateRequest, LocateResponse
+from lsap.schema.locate import LocateRequest
 from pydantic import RootModel
 
+from lsp_cli.syntax.models import ApproximateLocateResponse
+
 from . import options as op
-from .utils import connect_server, create_locate
+from .connect import connect_server
+from .utils import APPROXIMATE_INFO, create_locate
 
 app = cyclopts.App(name="locate")
 
@@ -59,10 +62,12 @@ async def locate(
     async with connect_server(locate.file_path, project_path=project) as client:
         match await client.post(
             "/capability/locate",
-            RootModel[LocateResponse | None],
+            RootModel[ApproximateLocateResponse | None],
             json=LocateRequest(locate=locate),
         ):
-            case RootModel(root=LocateResponse() as resp):
+            case RootModel(root=ApproximateLocateResponse() as resp):
                 print(resp.format())
+                if resp.approximate:
+                    print(APPROXIMATE_INFO)
             case RootModel(root=None):
                 print("No location found.")
@@ -1,12 +1,27 @@
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Annotated
+
+import anyio
+import anyio.to_thread
 import cyclopts
-from lsap.schema.outline import OutlineRequest, OutlineResponse
+from lsap.schema.locate import SymbolScope
 from pydantic import RootModel
 
-from lsp_cli.cli.options import FilePathOpt
+from lsp_cli.exceptions import CapabilityCommandException
+from lsp_cli.manager.models import (
+    CreateClientsRequest,
+    CreateClientsResponse,
+    OptionalHoverOutlineRequest,
+)
+from lsp_cli.settings import settings
+from lsp_cli.syntax.models import ApproximateOutlineResponse
+from lsp_cli.utils.files import iter_source_files
 from lsp_cli.utils.locate import parse_symbol_scope
 
 from . import options as op
-from .utils import connect_server
+from .connect import connect_manager, connect_server, open_session
+from .utils import APPROXIMATE_INFO, display_path
 
 app = cyclopts.App(
     name="outline",
@@ -14,32 +29,155 @@ app = cyclopts.App(
 )
 
 
+def expand_paths(patterns: Sequence[str]) -> tuple[list[Path], list[Path]]:
+    """Files and directories named by `patterns`, expanding glob patterns."""
+    files: list[Path] = []
+    dirs: list[Path] = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.exists() or not any(c in pattern for c in "*?["):
+            matches = [path]
+        else:
+            root = Path(path.anchor) if path.is_absolute() else Path()
+            matches = sorted(root.glob(path.relative_to(root).as_posix()))
+        for match in matches:
+            match = match.resolve()
+            if match.is_dir():
+                dirs.append(match)
+            elif match.is_file():
+                files.append(match)
+            else:
+                raise FileNotFoundError(f"File not found: {match}")
+    return files, dirs
+
+
+def format_compact(resp: ApproximateOutlineResponse) -> str:
+    """The outline as one line per symbol, indented by nesting."""
+    header = f"## `{display_path(resp.file_path)}`"
+    if resp.approximate:
+        header += " (approximate)"
+    if not resp.items:
+        return f"{header}\nNo symbols found."
+
+    depth = min(len(item.path) for item in resp.items)
+    lines = [header]
+    for item in resp.items:
+        line = f":{item.range.start.line}" if item.range else ""
+        indent = "  " * (len(item.path) - depth)
+        lines.append(f"{indent}- `{item.name}` ({item.kind.value}){line}")
+    return "\n".join(lines)
+
+
+async def _source_files(directory: Path, project: Path | None) -> list[Path]:
+    """Source files of every language with a server for the directory."""
+    async with connect_manager() as manager:
+        created = await manager.post(
+            "/create/all",
+            CreateClientsResponse,
+            json=CreateClientsRequest(path=directory, project_path=project),
+        )
+    for error in created.errors:
+        print(f"Warning: Failed to start server for {error}")
+    suffixes = [s for client in created.clients for s in client.info.suffixes]
+    if not suffixes:
+        return []
+    files = await anyio.to_thread.run_sync(iter_source_files, directory, suffixes)
+    return [path for path, _ in files]
+
+
+async def outline_files(
+    files: Sequence[Path], scope: SymbolScope | None, project: Path | None
+) -> None:
+    """Print the compact outline of each file as soon as it is ready."""
+    limiter = anyio.CapacityLimiter(settings.outline_concurrency)
+
+    async def outline_file(path: Path) -> None:
+        async with limiter:
+            try:
+                async with connect_server(path, project_path=project) as client:
+                    match await client.post(
+                        "/capability/outline",
+                        RootModel[ApproximateOutlineResponse | None],
+                        json=OptionalHoverOutlineRequest(
+                            file_path=path, scope=scope, hover=False
+                        ),
+                    ):
+                        case RootModel(root=ApproximateOutlineResponse() as resp):
+                            print(format_compact(resp) + "\n")
+                        case _:
+                            print(f"Warning: No symbols found in {display_path(path)}")
+            except (CapabilityCommandException, RuntimeError) as e:
+                print(f"Warning: Cannot outline {display_path(path)}: {e}")
+
+    async with anyio.create_task_group() as tg:
+        for path in files:
+            tg.start_soon(outline_file, path)
+
+
 @app.default
 async def outline(
-    file_path: FilePathOpt,
+    paths: Annotated[
+        list[str],
+        cyclopts.Parameter(
+            name=["--file-path"],
+            help="Files, directories or glob patterns (e.g. 'src/**/*.py') to outline.",
+        ),
+    ],
     /,
     *,
     symbol: op.SymbolOpt = None,
+    max_files: Annotated[
+        int | None,
+        cyclopts.Parameter(
+            name=["--max-files"],
+            help="Max files to outline from directories and glob patterns.",
+            validator=op.positive_int_validator,
+        ),
+    ] = None,
     project: op.ProjectOpt = None,
 ) -> None:
     """
     Get the hierarchical symbol outline (classes, functions, etc.) for a specific file.
 
     If --symbol is provided, it must be a symbol path (e.g. MyClass or MyClass.my_method).
+
+    Given several files, directories or glob patterns, each file's outline is
+    printed in a compact form as soon as it is ready, without documentation.
     """
 
     parsed_scope = parse_symbol_scope(symbol) if symbol else None
+    files, dirs = expand_paths(paths)
+
+    if len(paths) == 1 and Path(paths[0]).is_file():
+        file_path = files[0]
+        async with connect_server(file_path, project_path=project) as client:
+            match await client.post(
+                "/capability/outline",
+                RootModel[ApproximateOutlineResponse | None],
+                json=OptionalHoverOutlineRequest(
+                    file_path=file_path,
+                    scope=parsed_scope,
+                ),
+            ):
+                case RootModel(root=ApproximateOutlineResponse() as resp):
+                    print(resp.format())
+                    if resp.approximate:
+                        print(APPROXIMATE_INFO)
+                case _:
+                    print("Warning: No symbols found")
+        return
 
-    async with connect_server(file_path, project_path=project) as client:
-        match await client.post(
-            "/capability/outline",
-            RootModel[OutlineResponse | None],
-            json=OutlineRequest(
-                file_path=file_path.resolve(),
-                scope=parsed_scope,
-            ),
-        ):
-            case RootModel(root=OutlineResponse() as resp):
-                print(resp.format())
-            case _:
-                print("Warning: No symbols found")
+    async with open_session():
+        for directory in dirs:
+            files.extend(await _source_files(directory, project))
+        files = list(dict.fromkeys(files))
+        limit = max_files if max_files is not None else settings.default_max_files
+        if limit is not None and len(files) > limit:
+            print(
+                f"Info: Outlining {limit} of {len(files)} files. Use --max-files to outline more.\n"
+            )
+            files = files[:limit]
+        if not files:
+            print("Warning: No source files found")
+            return
+        await outline_files(files, parsed_scope, project)
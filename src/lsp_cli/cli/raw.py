@@ -0,0 +1,104 @@
+import json
+from pathlib import Path
+from typing import Annotated, Any
+
+import cyclopts
+from pydantic import RootModel
+
+from . import options as op
+from .connect import connect_server
+
+app = cyclopts.App(
+    name="raw",
+    help="Send a raw JSON-RPC request or notification to the language server.",
+)
+
+
+def parse_params(params: str | None) -> dict[str, Any] | list[Any] | None:
+    if params is None:
+        return None
+    try:
+        value = json.loads(params)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid params JSON: {e}") from e
+    if not isinstance(value, dict | list):
+        raise TypeError("Params must be a JSON object or array")
+    return value
+
+
+def document_path(params: object) -> Path | None:
+    match params:
+        case {"textDocument": {"uri": str(uri)}} if uri.startswith("file:"):
+            return Path.from_uri(uri)
+    return None
+
+
+@app.default
+async def raw(
+    method: Annotated[
+        str,
+        cyclopts.Parameter(help="LSP method, e.g. 'textDocument/hover'."),
+    ],
+    params: Annotated[
+        str | None,
+        cyclopts.Parameter(help="Params as a JSON object or array."),
+    ] = None,
+    /,
+    *,
+    file_path: Annotated[
+        Path | None,
+        cyclopts.Parameter(
+            name=["--file-path"],
+            help="File whose server receives the message. Defaults to the "
+            "params' `textDocument.uri`, then the current directory.",
+            converter=op.path_converter,
+        ),
+    ] = None,
+    notify: Annotated[
+        bool,
+        cyclopts.Parameter(help="Send a notification, which has no response."),
+    ] = False,
+    project: op.ProjectOpt = None,
+) -> None:
+    """
+    Send a raw JSON-RPC message to the language server and print the result as JSON.
+
+    Nothing is post-processed, so any method the server supports can be used.
+    The document in the params' `textDocument.uri` is opened for the request.
+    """
+    # Imported here: the JSON-RPC models load the whole lsp_client package.
+    from lsp_cli.manager.jsonrpc import (
+        LspNotification,
+        LspRequest,
+        LspResponse,
+        NotificationPayload,
+        RequestPayload,
+    )
+
+    raw_params = parse_params(params)
+    path = file_path or document_path(raw_params) or project or Path.cwd()
+    message = NotificationPayload(method=method, jsonrpc="2.0")
+    if raw_params is not None:
+        # JSON-RPC allows params to be left out, but not to be null.
+        message["params"] = raw_params
+
+    async with connect_server(path, project_path=project) as client:
+        if notify:
+            await client.post(
+                "/lsp/notify",
+                RootModel[None],
+                json=LspNotification(payload=message),
+            )
+            return
+
+        resp = await client.post(
+            "/lsp/request",
+            LspResponse,
+            json=LspRequest(payload=RequestPayload(id=1, **message)),
+        )
+
+    match resp.payload:
+        case {"error": {"code": code, "message": message}}:
+            raise RuntimeError(f"{message} (code {code})")
+        case {"result": result}:
+            print(json.dumps(result, indent=2))
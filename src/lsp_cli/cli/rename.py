@@ -1,17 +1,25 @@
+import sys
 from pathlib import Path
 from typing import Annotated
 
 import cyclopts
 from lsap.schema.rename import (
     RenameExecuteRequest,
-    RenameExecuteResponse,
     RenamePreviewRequest,
     RenamePreviewResponse,
 )
 from pydantic import RootModel
 
+from lsp_cli.edits.exclude import absolute_patterns
+from lsp_cli.edits.models import (
+    RenameBatchRequest,
+    RenameBatchResponse,
+    ReportedRenameExecuteResponse,
+)
+
 from . import options as op
-from .utils import connect_server, create_locate
+from .connect import connect_server
+from .utils import create_locate
 
 app = cyclopts.App(name="rename", help="Rename a symbol at a specific location.")
 
@@ -55,7 +63,7 @@ async def execute(
         list[str] | None,
         cyclopts.Parameter(
             name="--exclude",
-            help="File paths or glob patterns to exclude from the rename operation. Can be specified multiple times.",
+            help="File paths or glob patterns, absolute or relative to the current directory, to exclude from the rename operation. A bare name matches at any depth, a directory matches everything in it. Can be specified multiple times.",
         ),
     ] = None,
     project: op.ProjectOpt = None,
@@ -64,19 +72,72 @@ async def execute(
     Execute a rename operation using the ID from a previous preview.
     """
 
-    # HACK convert glob to absolute path strings
-    exclude = [Path(glob).absolute().as_posix() for glob in (exclude or [])]
-
     async with connect_server(project or Path.cwd()) as client:
         match await client.post(
             "/capability/rename/execute",
-            RootModel[RenameExecuteResponse | None],
+            RootModel[ReportedRenameExecuteResponse | None],
             json=RenameExecuteRequest(
                 rename_id=rename_id,
-                exclude_files=exclude,
+                exclude_files=absolute_patterns(exclude or [], Path.cwd()),
             ),
         ):
-            case RootModel(root=RenameExecuteResponse() as resp):
+            case RootModel(root=ReportedRenameExecuteResponse() as resp):
                 print(resp.format())
+                if resp.report:
+                    print(f"\nInfo: {resp.report.format()}")
             case _:
                 raise RuntimeError("Failed to execute rename")
+
+
+def parse_batch(text: str) -> list[RenamePreviewRequest]:
+    """Parse `FILE SCOPE NEW_NAME` lines, skipping blank lines and `#` comments."""
+    renames = []
+    for n, line in enumerate(text.splitlines(), 1):
+        if not (line := line.strip()) or line.startswith("#"):
+            continue
+        match line.split():
+            case [file_path, scope, new_name]:
+                renames.append(
+                    RenamePreviewRequest(
+                        locate=create_locate(Path(file_path).resolve(), scope),
+                        new_name=new_name,
+                    )
+                )
+            case _:
+                raise ValueError(f"Line {n}: expected `FILE SCOPE NEW_NAME`: {line}")
+    return renames
+
+
+@app.command
+async def batch(
+    spec: Annotated[
+        Path,
+        cyclopts.Parameter(
+            help="File of renames, one `FILE SCOPE NEW_NAME` per line, or `-` for stdin. SCOPE is as for --scope, e.g. `MyClass.my_method`.",
+            allow_leading_hyphen=True,
+        ),
+    ],
+    /,
+    *,
+    project: op.ProjectOpt = None,
+) -> None:
+    """
+    Preview many renames at once, to execute together as one rename.
+
+    All renames are resolved against the current code and merged into a single
+    edit; renames whose edits overlap are reported instead.
+    """
+
+    text = sys.stdin.read() if spec == Path("-") else spec.read_text()
+    if not (renames := parse_batch(text)):
+        raise ValueError("No renames given")
+
+    async with connect_server(
+        renames[0].locate.file_path, project_path=project
+    ) as client:
+        resp = await client.post(
+            "/capability/rename/batch",
+            RenameBatchResponse,
+            json=RenameBatchRequest(renames=renames),
+        )
+    print(resp.format())
@@ -1,15 +1,24 @@
+from collections.abc import Sequence
 from pathlib import Path
 from typing import Annotated
 
+import anyio
 import cyclopts
+import httpx
 from lsap.schema.models import SymbolKind
-from lsap.schema.search import SearchRequest, SearchResponse
+from lsap.schema.search import SearchItem, SearchRequest, SearchResponse
 from pydantic import RootModel
 
+from lsp_cli.manager.models import (
+    CreateClientResponse,
+    CreateClientsRequest,
+    CreateClientsResponse,
+)
 from lsp_cli.settings import settings
+from lsp_cli.utils.rpc import RpcError
 
 from . import options as op
-from .utils import connect_server
+from .connect import connect_client, connect_manager, connect_server, error_detail
 
 app = cyclopts.App(
     name="search",
@@ -17,6 +26,127 @@ app = cyclopts.App(
 )
 
 
+class MergedSearchResponse(SearchResponse):
+    # Unknown if some server had more items than it was asked for.
+    total: int | None = None
+    # Merged results cannot be continued from a pagination ID.
+    pagination_id: str | None = None
+
+
+def match_rank(query: str, name: str) -> int:
+    """How closely `name` matches `query`, from 0 for an exact match."""
+    folded, query_folded = name.casefold(), query.casefold()
+    if name == query:
+        return 0
+    if folded == query_folded:
+        return 1
+    if name.startswith(query):
+        return 2
+    if folded.startswith(query_folded):
+        return 3
+    if query_folded in folded:
+        return 4
+    # Fuzzy matches, as servers find them.
+    return 5
+
+
+def merge_results(
+    query: str, results: Sequence[Sequence[SearchItem]]
+) -> list[SearchItem]:
+    """Items of several servers' results, deduplicated and ranked together.
+
+    Items are ranked by how closely they match the query. Items that match
+    equally keep the order their server found them in, interleaved.
+    """
+    seen: set[tuple[str, SymbolKind, Path, int | None]] = set()
+    ranked: list[tuple[tuple[int, int, int], SearchItem]] = []
+    for server, items in enumerate(results):
+        for position, item in enumerate(items):
+            key = (item.name, item.kind, item.file_path, item.line)
+            if key in seen:
+                continue
+            seen.add(key)
+            ranked.append(((match_rank(query, item.name), position, server), item))
+    ranked.sort(key=lambda r: r[0])
+    return [item for _, item in ranked]
+
+
+async def _search_server(
+    server: CreateClientResponse, req: SearchRequest
+) -> SearchResponse | None:
+    async with connect_client(server.uds_path, server.rpc_path) as (client, _):
+        resp = await client.post(
+            "/capability/search", RootModel[SearchResponse | None], json=req
+        )
+    if resp.root is None:
+        return None
+    # Paths are relative to each server's project, so they are made absolute.
+    root = server.info.project_path
+    return resp.root.model_copy(
+        update={
+            "items": [
+                item.model_copy(update={"file_path": root / item.file_path})
+                for item in resp.root.items
+            ]
+        }
+    )
+
+
+async def search_all(
+    path: Path, req: SearchRequest
+) -> tuple[MergedSearchResponse, list[str]]:
+    """Search the servers of every language of the project of `path` at once.
+
+    Each server is asked for no more items than the merged page needs, so the
+    total is only known if none of them had more. Servers that fail or do not
+    answer in time are left out, and described in the returned errors.
+    """
+    async with connect_manager() as manager:
+        created = await manager.post(
+            "/create/all",
+            CreateClientsResponse,
+            json=CreateClientsRequest(path=path.resolve()),
+        )
+
+    end = req.start_index + req.max_items if req.max_items is not None else None
+    server_req = req.model_copy(update={"max_items": end, "start_index": 0})
+    results: dict[int, SearchResponse] = {}
+    errors = list(created.errors)
+
+    async def search(index: int, server: CreateClientResponse) -> None:
+        info = server.info
+        with anyio.move_on_after(settings.search_timeout) as scope:
+            try:
+                if resp := await _search_server(server, server_req):
+                    results[index] = resp
+            except (httpx.HTTPError, RpcError, OSError) as e:
+                errors.append(f"{info.language} {info.project_path}: {error_detail(e)}")
+        if scope.cancelled_caught:
+            errors.append(
+                f"{info.language} {info.project_path}: "
+                f"no answer within {settings.search_timeout:g}s"
+            )
+
+    async with anyio.create_task_group() as tg:
+        for index, server in enumerate(created.clients):
+            tg.start_soon(search, index, server)
+
+    items = merge_results(req.query, [results[i].items for i in sorted(results)])
+    page = items[req.start_index : end]
+    truncated = any(resp.has_more for resp in results.values())
+    return (
+        MergedSearchResponse(
+            request=req,
+            items=page,
+            start_index=req.start_index,
+            max_items=req.max_items if req.max_items is not None else len(page),
+            total=None if truncated else len(items),
+            has_more=False,
+        ),
+        errors,
+    )
+
+
 @app.default
 async def search(
     query: Annotated[
@@ -31,6 +161,13 @@ async def search(
             help="Filter by symbol kind (e.g., 'class', 'function'). Can be specified multiple times.",
         ),
     ] = None,
+    all_languages: Annotated[
+        bool,
+        cyclopts.Parameter(
+            name=["--all-languages"],
+            help="Search the servers of every language whose project contains the project or current directory, starting them if needed.",
+        ),
+    ] = False,
     project: op.ProjectOpt = None,
     max_items: op.MaxItemsOpt = None,
     start_index: op.StartIndexOpt = 0,
@@ -40,21 +177,36 @@ async def search(
     Search for symbols across the entire workspace by name query.
     """
 
-    async with connect_server(project or Path.cwd()) as client:
-        effective_max_items = (
-            max_items if max_items is not None else settings.default_max_items
-        )
+    effective_max_items = (
+        max_items if max_items is not None else settings.default_max_items
+    )
+    req = SearchRequest(
+        query=query,
+        kinds=[SymbolKind(k) for k in kinds] if kinds else None,
+        max_items=effective_max_items,
+        start_index=start_index,
+        pagination_id=pagination_id,
+    )
+
+    if all_languages:
+        if pagination_id:
+            raise ValueError("--pagination-id cannot be used with --all-languages")
+        resp, errors = await search_all(project or Path.cwd(), req)
+        for error in errors:
+            print(f"Warning: Search failed for {error}")
+        if not resp.items:
+            print("Warning: No matches found")
+            return
+        print(resp.format())
+        if resp.total is None or resp.total > start_index + len(resp.items):
+            print(
+                "\nInfo: More results available. Use --start-index or --max-items to see more."
+            )
+        return
 
+    async with connect_server(project or Path.cwd()) as client:
         match await client.post(
-            "/capability/search",
-            RootModel[SearchResponse | None],
-            json=SearchRequest(
-                query=query,
-                kinds=[SymbolKind(k) for k in kinds] if kinds else None,
-                max_items=effective_max_items,
-                start_index=start_index,
-                pagination_id=pagination_id,
-            ),
+            "/capability/search", RootModel[SearchResponse | None], json=req
         ):
             case RootModel(root=SearchResponse() as resp) if resp.items:
                 print(resp.format())
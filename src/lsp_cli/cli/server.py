@@ -5,10 +5,12 @@ import cyclopts
 from pydantic import RootModel
 
 from lsp_cli.cli import options as op
-from lsp_cli.manager.manager import connect_manager
+from lsp_cli.cli.connect import connect_manager
 from lsp_cli.manager.models import (
     CreateClientRequest,
     CreateClientResponse,
+    CreateClientsRequest,
+    CreateClientsResponse,
     DeleteClientRequest,
     ManagedClientInfo,
     ManagedClientInfoList,
@@ -47,10 +49,41 @@ async def start_server(
     ],
     /,
     *,
+    subprojects: Annotated[
+        bool,
+        cyclopts.Parameter(
+            name=["--subprojects"],
+            help="For a directory, also start servers for the projects below it.",
+        ),
+    ] = False,
     project: op.ProjectOpt = None,
 ) -> None:
-    """Start a background LSP server for the project containing the specified path."""
+    """Start a background LSP server for the project containing the specified path.
+
+    For a directory, servers of every language whose project contains it are
+    started at once, e.g. Python and TypeScript for a directory with both a
+    `pyproject.toml` and a `package.json`.
+    """
     async with connect_manager() as client:
+        if path.is_dir():
+            created = await client.post(
+                "/create/all",
+                CreateClientsResponse,
+                json=CreateClientsRequest(
+                    path=path.resolve(), project_path=project, subprojects=subprojects
+                ),
+            )
+            if created.clients:
+                print(
+                    f"Success: Started {len(created.clients)} server(s) for {path.resolve()}"
+                )
+                print(ManagedClientInfo.format([c.info for c in created.clients]))
+            for error in created.errors:
+                print(f"Error: Failed to start server for {error}")
+            if not created.clients and not created.errors:
+                print(f"Warning: No LSP client found for path: {path.resolve()}")
+            return
+
         if resp := await client.post(
             "/create",
             CreateClientResponse,
@@ -94,7 +127,9 @@ async def stop_server(
         )
         if stopped := resp.root:
             for info in stopped:
-                print(f"Success: Stopped server for {info.project_path}")
+                print(
+                    f"Success: Stopped server for {info.project_path} ({info.language})"
+                )
         else:
             if all:
                 print("No servers running.")
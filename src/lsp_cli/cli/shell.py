@@ -0,0 +1,113 @@
+import shlex
+import sys
+import time
+from collections.abc import AsyncGenerator, Generator
+from contextlib import contextmanager, nullcontext, suppress
+from typing import Annotated
+
+import anyio
+import anyio.to_thread
+import cyclopts
+from cyclopts.exceptions import CycloptsError
+
+from lsp_cli.paths import SHELL_HISTORY_PATH
+
+from .connect import open_session
+
+app = cyclopts.App(
+    name="shell",
+    help="Run commands in one long-lived session, reusing its connections.",
+)
+
+PROMPT = "lsp> "
+EXIT_COMMANDS = frozenset({"exit", "quit"})
+HISTORY_LENGTH = 1000
+
+
+@contextmanager
+def history() -> Generator[None]:
+    try:
+        import readline
+    except ImportError:  # not available on Windows
+        yield
+        return
+
+    with suppress(OSError):
+        readline.read_history_file(SHELL_HISTORY_PATH)
+    readline.set_history_length(HISTORY_LENGTH)
+    try:
+        yield
+    finally:
+        with suppress(OSError):
+            SHELL_HISTORY_PATH.parent.mkdir(parents=True, exist_ok=True)
+            readline.write_history_file(SHELL_HISTORY_PATH)
+
+
+async def read_lines(interactive: bool) -> AsyncGenerator[str]:
+    while True:
+        # Waiting in a thread lets the session's connections keep running.
+        try:
+            line = await anyio.to_thread.run_sync(
+                input, PROMPT if interactive else "", abandon_on_cancel=True
+            )
+        except EOFError:
+            if interactive:
+                print()
+            return
+
+        if (line := line.strip()) and not line.startswith("#"):
+            yield line
+
+
+@app.default
+async def shell(
+    *,
+    timing: Annotated[
+        bool,
+        cyclopts.Parameter(help="Print how long each command took to stderr."),
+    ] = True,
+) -> None:
+    """
+    Start an interactive session that runs `lsp` subcommands in one process.
+
+    Each line is parsed exactly like the arguments of `lsp`, e.g.
+    `definition --file-path src/main.py --find "foo("`. The manager and server
+    connections are opened once and reused, so only the first command pays for
+    startup. Commands are also read from stdin when it is not a terminal.
+    Type `exit` or press Ctrl-D to quit.
+    """
+
+    # Imported lazily: the root app imports this module.
+    from lsp_cli.__main__ import app as root
+    from lsp_cli.__main__ import report_error
+
+    interactive = sys.stdin.isatty()
+
+    with history() if interactive else nullcontext():
+        async with open_session():
+            async for line in read_lines(interactive):
+                try:
+                    tokens = shlex.split(line)
+                except ValueError as e:
+                    print(f"Invalid command: {e}", file=sys.stderr)
+                    continue
+
+                if tokens[0] in EXIT_COMMANDS:
+                    break
+                if tokens[0] == "shell":
+                    print("Already in a shell session.", file=sys.stderr)
+                    continue
+
+                start = time.perf_counter()
+                try:
+                    # Rather than exiting with the command's result, as `lsp` does.
+                    await root.run_async(tokens, result_action="return_value")
+                except CycloptsError as e:
+                    print(e, file=sys.stderr)
+                except Exception as e:  # noqa: BLE001
+                    report_error(e)
+
+                if timing:
+                    sys.stdout.flush()
+                    elapsed = time.perf_counter() - start
+                    print(f"[{elapsed * 1000:.0f} ms]", file=sys.stderr)
@@ -3,7 +3,8 @@ from lsap.schema.symbol import SymbolRequest, SymbolResponse
 from pydantic import RootModel
 
 from . import options as op
-from .utils import connect_server, create_locate
+from .connect import connect_server
+from .utils import create_locate
 
 app = cyclopts.App(
     name="symbol",
@@ -0,0 +1,83 @@
+from pathlib import Path
+from typing import Annotated
+
+import cyclopts
+
+from lsp_cli.manager.models import UnusedRequest, UnusedResponse
+from lsp_cli.settings import settings
+
+from . import options as op
+from .connect import connect_server
+
+app = cyclopts.App(
+    name="unused",
+    help="Find symbols that nothing else refers to.",
+)
+
+# Files scanned per request, so results are printed as they are found and each
+# request is answered well within the timeout.
+UNUSED_BATCH_FILES = 8
+
+
+@app.default
+async def unused(
+    path: Annotated[
+        Path | None,
+        cyclopts.Parameter(
+            help="File or directory to scan. Defaults to the project, then the current directory.",
+            converter=op.path_converter,
+        ),
+    ] = None,
+    /,
+    *,
+    max_files: Annotated[
+        int | None,
+        cyclopts.Parameter(
+            name=["--max-files"],
+            help="Max files to scan.",
+            validator=op.positive_int_validator,
+        ),
+    ] = None,
+    project: op.ProjectOpt = None,
+) -> None:
+    """
+    Find top-level symbols and members of types that have no references from
+    outside of themselves, in a file or in every source file of a directory.
+
+    Results are printed a few files at a time. Symbols may still be used in
+    ways the language server cannot see, e.g. as entry points, through
+    reflection, or by overriding a method of a base class.
+    """
+
+    target = path or project or Path.cwd()
+    limit = max_files if max_files is not None else settings.default_max_files
+    errors: list[str] = []
+    found = checked = scanned = total = 0
+
+    async with connect_server(target, project_path=project) as client:
+        while limit is None or scanned < limit:
+            batch = (
+                UNUSED_BATCH_FILES
+                if limit is None
+                else min(UNUSED_BATCH_FILES, limit - scanned)
+            )
+            resp = await client.post(
+                "/capability/unused",
+                UnusedResponse,
+                json=UnusedRequest(path=target, start_file=scanned, max_files=batch),
+            )
+            if resp.items:
+                print(resp.format())
+            errors.extend(resp.errors)
+            found += len(resp.items)
+            checked += resp.checked_symbols
+            scanned += resp.scanned_files
+            total = resp.total_files
+            if not resp.scanned_files or scanned >= total:
+                break
+
+    for error in errors:
+        print(f"Warning: Cannot check {error}")
+    print(UnusedResponse.summary(found, checked, scanned, total))
+    if scanned < total:
+        print("\nInfo: Some files were not scanned. Raise --max-files to scan more.")
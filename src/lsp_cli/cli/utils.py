@@ -1,72 +1,13 @@
-from collections.abc import AsyncGenerator
-from contextlib import asynccontextmanager, suppress
 from pathlib import Path
 
-import httpx
 from lsap.schema.locate import Locate
 
-from lsp_cli.exceptions import CapabilityCommandException
-from lsp_cli.manager.manager import connect_manager
-from lsp_cli.manager.models import (
-    CreateClientRequest,
-    CreateClientResponse,
-    GetIDResponse,
-)
-from lsp_cli.settings import settings
-from lsp_cli.utils.http import AsyncHttpClient
 from lsp_cli.utils.locate import parse_scope
-from lsp_cli.utils.socket import wait_socket
-
-DEFAULT_HTTP_TIMEOUT = 60.0
-
-
-@asynccontextmanager
-async def connect_server(
-    path: Path, project_path: Path | None = None
-) -> AsyncGenerator[AsyncHttpClient]:
-    if not path.exists():
-        raise FileNotFoundError(f"File not found: {path}")
-
-    try:
-        async with connect_manager() as client:
-            resp = await client.post(
-                "/create",
-                CreateClientResponse,
-                json=CreateClientRequest(
-                    path=path.resolve(), project_path=project_path
-                ),
-            )
-            uds_path = resp.uds_path
-
-        await wait_socket(uds_path, timeout=10.0)
 
-        transport = httpx.AsyncHTTPTransport(uds=uds_path.as_posix())
-        async with AsyncHttpClient(
-            httpx.AsyncClient(
-                transport=transport,
-                base_url="http://localhost",
-                timeout=settings.warmup_time + DEFAULT_HTTP_TIMEOUT,
-            )
-        ) as client:
-            resp = await client.get("/client/id", GetIDResponse)
-            client_id = resp.id
-
-            try:
-                yield client
-            except httpx.HTTPStatusError as e:
-                detail = str(e)
-                with suppress(Exception):
-                    detail = e.response.json().get("detail", detail)
-                raise CapabilityCommandException(
-                    client_id=client_id, message=detail
-                ) from e
-            except Exception as e:
-                raise CapabilityCommandException(client_id=client_id) from e
-    except httpx.HTTPStatusError as e:
-        detail = str(e)
-        with suppress(Exception):
-            detail = e.response.json().get("detail", detail)
-        raise RuntimeError(detail) from e
+APPROXIMATE_INFO = (
+    "\nInfo: The language server is still warming up, so this is an approximate "
+    "answer from a syntactic parse."
+)
 
 
 def create_locate(
@@ -77,3 +18,12 @@ def create_locate(
         scope=parse_scope(scope) if scope else None,
         find=find,
     )
+
+
+def display_path(path: Path) -> str:
+    """`path` relative to the current directory if it is below it."""
+    return (
+        path.relative_to(Path.cwd()).as_posix()
+        if path.is_relative_to(Path.cwd())
+        else path.as_posix()
+    )
@@ -1,18 +1,114 @@
+import json
+import tomllib
+from collections.abc import Iterable
+from fnmatch import fnmatch
 from pathlib import Path
 from typing import NamedTuple
 
 from lsp_client.client import Client
 from lsp_client.clients.lang import lang_clients
+from lsp_client.protocol.lang import LanguageConfig
+
+from lsp_cli.settings import settings
+from lsp_cli.utils.files import iter_dirs
+
+# Files that mark the root of a workspace of several projects.
+MONOREPO_FILES = (
+    "pnpm-workspace.yaml",
+    "lerna.json",
+    "nx.json",
+    "turbo.json",
+    "rush.json",
+    "go.work",
+)
 
 
 class ClientTarget(NamedTuple):
     client_cls: type[Client]
     project_path: Path
+    # Whether `project_path` is a monorepo root shared by its sub-projects.
+    monorepo: bool = False
+
+
+def _matches(names: list[str], patterns: list[str]) -> bool:
+    return any(fnmatch(name, pattern) for pattern in patterns for name in names)
+
+
+def is_project_dir(names: list[str], lang_config: LanguageConfig) -> bool:
+    """Like `LanguageConfig.is_project_root`, given the names in the directory."""
+    return _matches(names, lang_config.project_files) and not _matches(
+        names, lang_config.exclude_files
+    )
+
+
+def _read_toml(path: Path) -> dict:
+    try:
+        return tomllib.loads(path.read_text())
+    except (OSError, UnicodeDecodeError, tomllib.TOMLDecodeError):
+        return {}
+
+
+def _read_json(path: Path) -> dict:
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def is_monorepo_root(path: Path) -> bool:
+    """Whether `path` declares a workspace of several projects."""
+    if any((path / name).is_file() for name in MONOREPO_FILES):
+        return True
+    # Missing files read as empty.
+    pyproject = _read_toml(path / "pyproject.toml")
+    return (
+        "workspace" in pyproject.get("tool", {}).get("uv", {})
+        or "workspace" in _read_toml(path / "Cargo.toml")
+        or "workspaces" in _read_json(path / "package.json")
+    )
+
+
+def find_monorepo_root(
+    project_path: Path, roots: Iterable[Path] = (), *, detect: bool = False
+) -> Path | None:
+    """Find the monorepo a project belongs to, if any.
+
+    Args:
+        project_path: The project root to find the monorepo of.
+        roots: Monorepo roots configured for the workspace. The nearest one
+            containing the project wins.
+        detect: Also look for the nearest ancestor that declares a workspace.
+    """
+    project_path = project_path.resolve()
+    configured = [
+        root
+        for root in (r.expanduser().resolve() for r in roots)
+        if project_path.is_relative_to(root)
+    ]
+    if configured:
+        return max(configured, key=lambda root: len(root.parts))
+    if detect:
+        for p in [project_path, *project_path.parents]:
+            if is_monorepo_root(p):
+                return p
+    return None
+
+
+def _target(client_cls: type[Client], root: Path) -> ClientTarget:
+    if monorepo := find_monorepo_root(
+        root, settings.monorepo_roots, detect=settings.monorepo_detect
+    ):
+        return ClientTarget(client_cls, monorepo, monorepo=True)
+    return ClientTarget(client_cls=client_cls, project_path=root)
 
 
 def find_target(path: Path) -> ClientTarget | None:
     """Identify the appropriate client and project root for a given path.
 
+    In monorepo mode, the project root is the monorepo root, so that every
+    sub-project shares one client per language.
+
     Args:
         path: The file or directory path to find a client for.
     """
@@ -21,21 +117,87 @@ def find_target(path: Path) -> ClientTarget | None:
     for client_cls in candidates:
         lang_config = client_cls.get_language_config()
         if root := lang_config.find_project_root(path):
-            return ClientTarget(client_cls=client_cls, project_path=root)
+            return _target(client_cls, root)
     return None
 
 
-def match_target(project_path: Path) -> ClientTarget | None:
-    """Identify the appropriate client for a given project root.
+def find_targets(
+    path: Path, max_targets: int, *, subprojects: bool = False
+) -> list[ClientTarget]:
+    """Identify the clients of every language whose project contains a path.
+
+    The project of `path` is the nearest one any language finds for it. Every
+    language with project files at `path` itself or at that project's root
+    gets a client there, e.g. Python and TypeScript for a directory with both
+    a `pyproject.toml` and a `package.json`.
 
     Args:
-        project_path: The directory path that is expected to be a project root.
+        path: The file or directory to find clients for.
+        max_targets: The most targets to return.
+        subprojects: Also give languages without a project there the outermost
+            projects below `path`, nearest first.
     """
-    candidates = lang_clients.values()
+    roots = [
+        root
+        for client_cls in lang_clients.values()
+        if (root := client_cls.get_language_config().find_project_root(path))
+    ]
+    candidates = [path] if path.is_dir() else []
+    if roots:
+        candidates.append(max(roots, key=lambda root: len(root.parts)))
 
-    for client_cls in candidates:
+    targets: dict[ClientTarget, None] = {}
+    below: list[type[Client]] = []
+    for client_cls in lang_clients.values():
         lang_config = client_cls.get_language_config()
-        if lang_config.is_project_root(project_path):
-            return ClientTarget(client_cls=client_cls, project_path=project_path)
+        if root := next(
+            (r for r in candidates if lang_config.is_project_root(r)), None
+        ):
+            targets[_target(client_cls, root)] = None
+        elif subprojects and path.is_dir():
+            below.append(client_cls)
 
-    return None
+    found: dict[type[Client], list[Path]] = {client_cls: [] for client_cls in below}
+    if below:
+        for directory, names in iter_dirs(path):
+            if len(targets) >= max_targets:
+                break
+            for client_cls in below:
+                if any(directory.is_relative_to(p) for p in found[client_cls]):
+                    continue
+                if is_project_dir(names, client_cls.get_language_config()):
+                    found[client_cls].append(directory)
+                    targets[_target(client_cls, directory)] = None
+    return list(targets)[:max_targets]
+
+
+def _handles(lang_config: LanguageConfig, path: Path | None) -> bool:
+    if path is None or not path.is_file():
+        return True
+    return any(path.name.endswith(suffix) for suffix in lang_config.suffixes)
+
+
+def match_targets(project_path: Path, path: Path | None = None) -> list[ClientTarget]:
+    """Identify the clients of every language a project root belongs to.
+
+    Args:
+        project_path: The directory path that is expected to be a project root.
+        path: A file in the project, to only match the languages it belongs to.
+    """
+    return [
+        ClientTarget(client_cls=client_cls, project_path=project_path)
+        for client_cls in lang_clients.values()
+        if _handles(lang_config := client_cls.get_language_config(), path)
+        and lang_config.is_project_root(project_path)
+    ]
+
+
+def match_target(project_path: Path, path: Path | None = None) -> ClientTarget | None:
+    """Identify the appropriate client for a given project root.
+
+    Args:
+        project_path: The directory path that is expected to be a project root.
+        path: A file in the project, to pick the client of its language.
+    """
+    targets = match_targets(project_path, path)
+    return targets[0] if targets else None
@@ -0,0 +1 @@
+"""Applying workspace edits, such as those of a rename, to the files on disk."""
@@ -0,0 +1,247 @@
+"""Apply the text edits of a workspace edit to many files at once.
+
+Each file is read, spliced and written to a temporary file next to it in a
+worker thread. The temporary files only replace the originals once all of them
+are written, and a journal of the replaced files restores them if a replacement
+fails, so an edit lands in every file or in none.
+
+Symlinks are written through to their targets. Files with other hard links, or
+whose owner cannot be given to the temporary file, are overwritten in place
+instead of replaced, so every link keeps seeing the same file.
+"""
+
+from __future__ import annotations
+
+import os
+import stat
+import tempfile
+from collections.abc import Sequence
+from contextlib import suppress
+from pathlib import Path
+
+import anyio
+import anyio.to_thread
+from attrs import define
+from loguru import logger
+from lsp_client import Client
+from lsp_client.exception import EditApplicationError, VersionMismatchError
+from lsp_client.utils.types import lsp_type
+from lsp_client.utils.workspace_edit import AnyTextEdit, apply_text_edits
+
+from .models import EditReport
+
+# Files read and written at once.
+WRITE_CONCURRENCY = 32
+
+
+@define
+class StagedFile:
+    uri: str
+    path: Path
+    # The file written, with symlinks resolved.
+    target: Path
+    temp: Path
+    # Copied over the target rather than replacing it.
+    in_place: bool
+    original: bytes
+    content: str
+    size: int
+
+
+def _write_temp(path: Path, data: bytes) -> Path:
+    """Write `data` to a synced temporary file next to `path`, with its mode.
+
+    The owner of `path` is kept too, where permitted.
+    """
+    fd, name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    temp = Path(name)
+    try:
+        st = path.stat()
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        temp.chmod(stat.S_IMODE(st.st_mode))
+        with suppress(PermissionError):
+            os.chown(temp, st.st_uid, st.st_gid)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+    return temp
+
+
+def _write_in_place(path: Path, data: bytes) -> None:
+    with path.open("r+b") as f:
+        f.write(data)
+        f.truncate()
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _keeps_identity(target: Path, temp: Path) -> bool:
+    """Whether replacing `target` with `temp` leaves its links and owner as is."""
+    st, temp_st = target.stat(), temp.stat()
+    return st.st_nlink == 1 and (st.st_uid, st.st_gid) == (
+        temp_st.st_uid,
+        temp_st.st_gid,
+    )
+
+
+def _stage(
+    uri: str,
+    path: Path,
+    text: str | None,
+    encoding: str,
+    edits: Sequence[AnyTextEdit],
+) -> StagedFile:
+    target = path.resolve()
+    original = target.read_bytes()
+    # Decoded without newline translation, so line endings are kept.
+    content = apply_text_edits(
+        original.decode(encoding) if text is None else text, edits
+    )
+    data = content.encode(encoding)
+    temp = _write_temp(target, data)
+    try:
+        in_place = not _keeps_identity(target, temp)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+    return StagedFile(uri, path, target, temp, in_place, original, content, len(data))
+
+
+def _discard(staged: Sequence[StagedFile]) -> None:
+    for file in staged:
+        file.temp.unlink(missing_ok=True)
+
+
+def _put(file: StagedFile) -> None:
+    if file.in_place:
+        _write_in_place(file.target, file.temp.read_bytes())
+        file.temp.unlink()
+    else:
+        file.temp.replace(file.target)
+
+
+def _restore(file: StagedFile) -> None:
+    if file.in_place:
+        _write_in_place(file.target, file.original)
+    else:
+        _write_temp(file.target, file.original).replace(file.target)
+
+
+def _commit(staged: Sequence[StagedFile]) -> None:
+    journal: list[StagedFile] = []
+    try:
+        for file in staged:
+            # A file overwritten in place may be left half written.
+            if file.in_place:
+                journal.append(file)
+            _put(file)
+            if not file.in_place:
+                journal.append(file)
+    except BaseException:
+        for file in reversed(journal):
+            try:
+                _restore(file)
+            except OSError:
+                logger.exception("Failed to restore {}", file.target)
+        _discard(staged)
+        raise
+
+    # The files themselves were synced when written; their renames are synced
+    # once per directory.
+    for directory in {file.target.parent for file in staged}:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def group_text_edits(
+    client: Client, edit: lsp_type.WorkspaceEdit
+) -> dict[str, list[AnyTextEdit]]:
+    """Text edits of `edit` by document, checking the versions of open documents."""
+    files: dict[str, list[AnyTextEdit]] = {}
+    if edit.document_changes:
+        for change in edit.document_changes:
+            if not isinstance(change, lsp_type.TextDocumentEdit):
+                raise EditApplicationError(
+                    message="Resource operations are applied by the client"
+                )
+            uri, version = change.text_document.uri, change.text_document.version
+            actual = client.get_document_state().get_version(uri)
+            if version is not None and actual is not None and actual != version:
+                raise VersionMismatchError(
+                    message=(
+                        f"Version mismatch for {uri}: expected {version}, got {actual}"
+                    ),
+                    uri=uri,
+                    expected_version=version,
+                    actual_version=actual,
+                )
+            files.setdefault(uri, []).extend(change.edits)
+    elif edit.changes:
+        for uri, edits in edit.changes.items():
+            files.setdefault(uri, []).extend(edits)
+    return files
+
+
+@define
+class WorkspaceEditApplier:
+    client: Client
+
+    async def _stage_file(
+        self,
+        uri: str,
+        edits: Sequence[AnyTextEdit],
+        limiter: anyio.CapacityLimiter,
+        staged: list[StagedFile],
+    ) -> None:
+        doc_state = self.client.get_document_state()
+        path = self.client.from_uri(uri, relative=False)
+        # Open documents may have changes that are not on disk yet.
+        text = doc_state.get_content(uri)
+        encoding = doc_state.get_encoding(uri, default="utf-8")
+        staged.append(
+            await anyio.to_thread.run_sync(
+                _stage, uri, path, text, encoding, edits, limiter=limiter
+            )
+        )
+
+    async def _sync(self, staged: Sequence[StagedFile]) -> None:
+        doc_state = self.client.get_document_state()
+        for file in staged:
+            if (version := doc_state.update_content(file.uri, file.content)) is None:
+                continue
+            await self.client.notify_text_document_changed(
+                file_path=file.path,
+                content_changes=[
+                    lsp_type.TextDocumentContentChangeWholeDocument(text=file.content)
+                ],
+                version=version,
+            )
+
+    async def apply(self, edit: lsp_type.WorkspaceEdit) -> EditReport:
+        start = anyio.current_time()
+        files = group_text_edits(self.client, edit)
+
+        staged: list[StagedFile] = []
+        limiter = anyio.CapacityLimiter(WRITE_CONCURRENCY)
+        try:
+            async with anyio.create_task_group() as tg:
+                for uri, edits in files.items():
+                    tg.start_soon(self._stage_file, uri, edits, limiter, staged)
+        except BaseException:
+            with anyio.CancelScope(shield=True):
+                await anyio.to_thread.run_sync(_discard, staged)
+            raise
+
+        await anyio.to_thread.run_sync(_commit, staged)
+        await self._sync(staged)
+        return EditReport(
+            files_written=len(staged),
+            bytes_written=sum(file.size for file in staged),
+            elapsed=anyio.current_time() - start,
+        )
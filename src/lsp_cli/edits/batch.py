@@ -0,0 +1,170 @@
+"""Many renames previewed together and applied as one edit.
+
+The renames are resolved concurrently against the same content, so their edits
+can be merged as long as they do not overlap. Edits that two renames agree on,
+e.g. where both rename the same symbol to the same name, are kept once.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import override
+
+import anyio
+from attrs import define, field
+from lsap.capability.abc import Capability
+from lsap.capability.rename import CachedRename
+from lsap.exception import NotFoundError
+from lsap.schema.rename import RenamePreviewRequest
+from lsap.utils.capability import ensure_capability
+from lsap.utils.document import DocumentReader
+from lsap.utils.id import generate_short_id
+from lsp_client.capability.request import WithRequestRename
+from lsp_client.exception import EditApplicationError, LSPError
+from lsp_client.utils.types import lsp_type
+from lsp_client.utils.uri import from_local_uri
+from lsp_client.utils.workspace_edit import (
+    AnyTextEdit,
+    get_edit_text,
+    iter_text_document_edits,
+)
+
+from .capability import StoredRenamePreviewCapability
+from .models import BatchRename, RenameBatchRequest, RenameBatchResponse
+from .upstream import file_changes, old_name
+
+# Renames resolved on the server at once.
+RENAME_CONCURRENCY = 8
+
+
+def _key(pos: lsp_type.Position) -> tuple[int, int]:
+    return pos.line, pos.character
+
+
+def merge_renames(renames: Sequence[CachedRename]) -> lsp_type.WorkspaceEdit:
+    """Merge the edits of `renames`, or raise if any of them overlap."""
+    files: dict[str, list[tuple[AnyTextEdit, int]]] = {}
+    versions: dict[str, int | None] = {}
+    for index, rename in enumerate(renames):
+        for change in rename.edit.document_changes or ():
+            if not isinstance(change, lsp_type.TextDocumentEdit):
+                raise EditApplicationError(
+                    message=f"Renaming `{rename.old_name}` moves files; "
+                    "rename it on its own"
+                )
+            versions.setdefault(change.text_document.uri, change.text_document.version)
+        for uri, edits in iter_text_document_edits(rename.edit):
+            files.setdefault(uri, []).extend((edit, index) for edit in edits)
+
+    conflicts: list[str] = []
+    merged: list[lsp_type.TextDocumentEdit] = []
+    for uri, edits in files.items():
+        edits.sort(key=lambda e: (_key(e[0].range.start), _key(e[0].range.end)))
+        kept: list[tuple[AnyTextEdit, int]] = []
+        for edit, index in edits:
+            if kept:
+                last, last_index = kept[-1]
+                if last.range == edit.range and get_edit_text(last) == get_edit_text(
+                    edit
+                ):
+                    continue
+                # Insertions at the same place overlap too: their order is unknown.
+                if _key(edit.range.start) < _key(last.range.end) or (
+                    last.range.start == edit.range.start
+                ):
+                    conflicts.append(
+                        f"{from_local_uri(uri)}:{edit.range.start.line + 1}: "
+                        f"`{renames[last_index].old_name}` → "
+                        f"`{renames[last_index].new_name}` and "
+                        f"`{renames[index].old_name}` → `{renames[index].new_name}`"
+                    )
+                    continue
+            kept.append((edit, index))
+        merged.append(
+            lsp_type.TextDocumentEdit(
+                text_document=lsp_type.OptionalVersionedTextDocumentIdentifier(
+                    uri=uri, version=versions.get(uri)
+                ),
+                edits=[edit for edit, _ in kept],
+            )
+        )
+
+    if conflicts:
+        raise EditApplicationError(message="Renames overlap:\n" + "\n".join(conflicts))
+    return lsp_type.WorkspaceEdit(document_changes=merged)
+
+
+@define
+class RenameBatchCapability(Capability[RenameBatchRequest, RenameBatchResponse]):
+    preview: StoredRenamePreviewCapability = field(kw_only=True)
+
+    async def _rename(self, req: RenamePreviewRequest) -> CachedRename:
+        if not (locate := await self.preview.locate(req)):
+            raise NotFoundError("nothing to rename there")
+        path, pos = locate.file_path, locate.position.to_lsp()
+        client = ensure_capability(self.client, WithRequestRename)
+        reader = DocumentReader(await self.client.read_file(path))
+
+        if not (prepare := await client.request_prepare_rename(path, pos)):
+            raise NotFoundError("the symbol there cannot be renamed")
+        name = old_name(reader, pos, prepare)
+        if not (edit := await client.request_rename_edits(path, pos, req.new_name)):
+            raise NotFoundError(f"renaming `{name}` changes nothing")
+        return CachedRename(edit=edit, old_name=name, new_name=req.new_name)
+
+    @override
+    async def __call__(self, req: RenameBatchRequest) -> RenameBatchResponse | None:
+        renames: dict[int, CachedRename] = {}
+        errors: dict[int, str] = {}
+        limiter = anyio.CapacityLimiter(RENAME_CONCURRENCY)
+
+        async def rename(index: int, item: RenamePreviewRequest) -> None:
+            async with limiter:
+                # Failures of locating the symbol, reading its file or naming
+                # it are reported per rename, like those of the server.
+                try:
+                    renames[index] = await self._rename(item)
+                except (LSPError, OSError, ValueError) as e:
+                    errors[index] = f"{item.locate.file_path} → {item.new_name}: {e}"
+
+        async with anyio.create_task_group() as tg:
+            for index, item in enumerate(req.renames):
+                tg.start_soon(rename, index, item)
+
+        # The batch is applied as a whole, so one failing rename fails it.
+        if errors:
+            raise NotFoundError(
+                "Cannot rename:\n" + "\n".join(errors[i] for i in sorted(errors))
+            )
+        resolved = [renames[i] for i in range(len(req.renames))]
+        edit = merge_renames(resolved)
+        rename_id = generate_short_id()
+        self.preview.previews.put(
+            rename_id,
+            CachedRename(
+                edit=edit,
+                old_name=", ".join(r.old_name for r in resolved),
+                new_name=", ".join(r.new_name for r in resolved),
+            ),
+        )
+
+        changes = await file_changes(self.preview, edit)
+        return RenameBatchResponse(
+            rename_id=rename_id,
+            renames=[
+                BatchRename(
+                    file_path=item.locate.file_path,
+                    old_name=r.old_name,
+                    new_name=r.new_name,
+                    occurrences=sum(
+                        len(edits) for _, edits in iter_text_document_edits(r.edit)
+                    ),
+                )
+                for item, r in zip(req.renames, resolved, strict=True)
+            ],
+            total_files=len(changes),
+            total_occurrences=sum(
+                len(edits) for _, edits in iter_text_document_edits(edit)
+            ),
+            changes=changes,
+        )
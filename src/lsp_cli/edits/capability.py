@@ -0,0 +1,113 @@
+from collections.abc import Callable
+from pathlib import Path
+from typing import override
+
+import attrs
+from attrs import define, field
+from lsap.capability.rename import RenameExecuteCapability, RenamePreviewCapability
+from lsap.schema.rename import (
+    RenameExecuteRequest,
+    RenamePreviewRequest,
+    RenamePreviewResponse,
+)
+from lsap.utils.capability import ensure_capability
+from lsp_client import Client
+from lsp_client.capability.request import WithRequestRename
+from lsp_client.utils.types import lsp_type
+from lsp_client.utils.workspace_edit import iter_text_document_edits
+
+from .apply import WorkspaceEditApplier
+from .exclude import ExcludeMatcher
+from .models import ReportedRenameExecuteResponse
+from .previews import PreviewStore
+from .upstream import file_changes, pop_cached_preview
+
+
+def exclude_from_edit(
+    client: Client, edit: lsp_type.WorkspaceEdit, excluded: Callable[[Path], bool]
+) -> lsp_type.WorkspaceEdit:
+    """A copy of `edit` without the changes to excluded files."""
+
+    def keep(*uris: str) -> bool:
+        return not any(excluded(client.from_uri(uri, relative=False)) for uri in uris)
+
+    if edit.document_changes:
+        changes = []
+        for change in edit.document_changes:
+            match change:
+                case lsp_type.TextDocumentEdit(text_document=doc):
+                    uris = (doc.uri,)
+                case lsp_type.RenameFile(old_uri=old_uri, new_uri=new_uri):
+                    uris = (old_uri, new_uri)
+                case lsp_type.CreateFile(uri=uri) | lsp_type.DeleteFile(uri=uri):
+                    uris = (uri,)
+            if keep(*uris):
+                changes.append(change)
+        return attrs.evolve(edit, document_changes=changes)
+    if edit.changes:
+        return attrs.evolve(
+            edit,
+            changes={uri: edits for uri, edits in edit.changes.items() if keep(uri)},
+        )
+    return edit
+
+
+@define
+class StoredRenamePreviewCapability(RenamePreviewCapability):
+    """Rename previews kept in `previews` rather than lsap's global cache."""
+
+    previews: PreviewStore = field(kw_only=True)
+
+    @override
+    async def __call__(self, req: RenamePreviewRequest) -> RenamePreviewResponse | None:
+        if (resp := await super().__call__(req)) is not None and (
+            cached := pop_cached_preview(resp.rename_id)
+        ):
+            self.previews.put(resp.rename_id, cached)
+        return resp
+
+
+@define
+class AtomicRenameExecuteCapability(RenameExecuteCapability):
+    """Rename execution that writes every file in one go, or none of them."""
+
+    previews: PreviewStore = field(kw_only=True)
+
+    @override
+    async def __call__(
+        self, req: RenameExecuteRequest
+    ) -> ReportedRenameExecuteResponse | None:
+        cached = self.previews.get(req.rename_id)
+        edit = cached.edit
+        if req.exclude_files:
+            root = self.client.from_uri(self.client.as_uri(Path()), relative=False)
+            edit = exclude_from_edit(
+                self.client, edit, ExcludeMatcher.compile(root, req.exclude_files)
+            )
+
+        changes = await file_changes(self, edit)
+        if edit.document_changes and not all(
+            isinstance(change, lsp_type.TextDocumentEdit)
+            for change in edit.document_changes
+        ):
+            # Files are created, renamed or deleted in order, which only the
+            # client does.
+            await ensure_capability(
+                self.client, WithRequestRename
+            ).apply_workspace_edit(edit)
+            report = None
+        else:
+            report = await WorkspaceEditApplier(self.client).apply(edit)
+        self.previews.discard(req.rename_id)
+
+        return ReportedRenameExecuteResponse(
+            request=req,
+            old_name=cached.old_name,
+            new_name=cached.new_name,
+            total_files=len(changes),
+            total_occurrences=sum(
+                len(edits) for _, edits in iter_text_document_edits(edit)
+            ),
+            changes=changes,
+            report=report,
+        )
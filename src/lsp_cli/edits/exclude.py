@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import glob
+import os
+import re
+from collections.abc import Iterable
+from pathlib import Path
+
+from attrs import frozen
+
+
+def _is_bare(pattern: str) -> bool:
+    return "/" not in pattern.replace("\\", "/").rstrip("/")
+
+
+def absolute_patterns(patterns: Iterable[str], cwd: Path) -> list[str]:
+    """Patterns with paths made absolute against `cwd`, leaving bare names."""
+    return [
+        pattern if _is_bare(pattern) else os.path.normpath(cwd / pattern)
+        for pattern in patterns
+    ]
+
+
+def _relative(root: Path, pattern: str) -> str:
+    """`pattern` relative to `root`, rejecting patterns outside of it."""
+    path = os.path.normpath(pattern.replace("\\", "/"))
+    if Path(path).is_absolute():
+        if not Path(path).is_relative_to(root):
+            raise ValueError(f"Exclude pattern is outside of {root}: {pattern}")
+        path = Path(path).relative_to(root).as_posix()
+    elif path == ".." or path.startswith("../"):
+        raise ValueError(f"Exclude pattern is outside of {root}: {pattern}")
+    # The root itself excludes everything.
+    return "**" if path == "." else path
+
+
+def _translate(root: Path, pattern: str) -> Iterable[str]:
+    pattern = pattern.replace("\\", "/")
+    # Like .gitignore: a bare name matches at any depth.
+    if _is_bare(pattern):
+        pattern = f"**/{pattern.rstrip('/')}"
+    else:
+        pattern = _relative(root, pattern)
+    # A pattern matches the path itself and, for directories, everything in it.
+    for p in (pattern, f"{pattern}/**"):
+        yield glob.translate(p, recursive=True, include_hidden=True, seps="/")
+
+
+@frozen
+class ExcludeMatcher:
+    """Glob patterns relative to a root, compiled into a single regex.
+
+    Absolute patterns are made relative to the root first, and patterns that
+    reach outside of it are rejected with a `ValueError`.
+    """
+
+    root: Path
+    regex: re.Pattern[str] | None
+
+    @classmethod
+    def compile(cls, root: Path, patterns: Iterable[str]) -> ExcludeMatcher:
+        regexes = [
+            r for pattern in patterns if pattern for r in _translate(root, pattern)
+        ]
+        return cls(root, re.compile("|".join(regexes)) if regexes else None)
+
+    def __call__(self, path: Path) -> bool:
+        if self.regex is None:
+            return False
+        rel = path.relative_to(self.root) if path.is_relative_to(self.root) else path
+        return self.regex.match(rel.as_posix()) is not None
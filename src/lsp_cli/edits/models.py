@@ -0,0 +1,78 @@
+from pathlib import Path
+
+from lsap.schema.rename import (
+    RenameExecuteResponse,
+    RenameFileChange,
+    RenamePreviewRequest,
+)
+from pydantic import BaseModel
+
+
+class EditReport(BaseModel):
+    files_written: int
+    bytes_written: int
+    elapsed: float
+
+    def format(self) -> str:
+        files = "file" if self.files_written == 1 else "files"
+        return (
+            f"Wrote {self.files_written} {files} ({self.bytes_written} bytes)"
+            f" in {self.elapsed:.2f}s"
+        )
+
+
+class ReportedRenameExecuteResponse(RenameExecuteResponse):
+    # Unset when the edit had resource operations and was applied by the client.
+    report: EditReport | None = None
+
+
+class RenameBatchRequest(BaseModel):
+    renames: list[RenamePreviewRequest]
+
+
+class BatchRename(BaseModel):
+    file_path: Path
+    old_name: str
+    new_name: str
+    occurrences: int
+
+
+class RenameBatchResponse(BaseModel):
+    rename_id: str
+    renames: list[BatchRename]
+    total_files: int
+    total_occurrences: int
+    changes: list[RenameFileChange]
+
+    def format(self) -> str:
+        lines = [
+            f"# Rename Batch Preview: {len(self.renames)} renames",
+            "",
+            f"ID: `{self.rename_id}`",
+            f"Summary: Affects {self.total_files} files and "
+            f"{self.total_occurrences} occurrences.",
+            "",
+        ]
+        lines.extend(
+            f"- `{r.old_name}` → `{r.new_name}` ({r.file_path}):"
+            f" {r.occurrences} occurrences"
+            for r in self.renames
+        )
+        for change in self.changes:
+            lines += ["", f"## `{change.file_path}`"]
+            for diff in change.diffs:
+                lines += [
+                    "",
+                    f"Line `{diff.line}`:",
+                    "```diff",
+                    f"- {diff.original}",
+                    f"+ {diff.modified}",
+                    "```",
+                ]
+        lines += [
+            "",
+            "---",
+            "> [!TIP]",
+            f"> To apply all renames at once, run `lsp rename execute {self.rename_id}`.",
+        ]
+        return "\n".join(lines)
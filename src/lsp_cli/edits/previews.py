@@ -0,0 +1,181 @@
+"""Rename previews held until they are executed, or given up on.
+
+Agents preview many renames and execute few, so previews must not pile up over
+a long session. A `PreviewStore` keeps each preview's edit in a compact form for
+a limited time, and evicts the least recently used ones past a byte budget.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from collections import OrderedDict
+
+from attrs import define, field, frozen
+from lsap.capability.rename import CachedRename
+from lsap.exception import NotFoundError
+from lsp_client.utils.types import lsp_type
+from lsp_client.utils.workspace_edit import get_edit_text, iter_text_document_edits
+
+# (start line, start character, end line, end character, new text)
+type CompactTextEdit = tuple[int, int, int, int, str]
+
+# Rough size of a compact edit apart from its text, and of a file apart from
+# its URI and edits.
+EDIT_OVERHEAD = 120
+FILE_OVERHEAD = 200
+
+
+@frozen
+class CompactFileEdit:
+    uri: str
+    version: int | None
+    edits: tuple[CompactTextEdit, ...]
+
+    @property
+    def size(self) -> int:
+        return (
+            FILE_OVERHEAD
+            + len(self.uri)
+            + sum(EDIT_OVERHEAD + len(e[4]) for e in self.edits)
+        )
+
+    def to_lsp(self) -> lsp_type.TextDocumentEdit:
+        return lsp_type.TextDocumentEdit(
+            text_document=lsp_type.OptionalVersionedTextDocumentIdentifier(
+                uri=self.uri, version=self.version
+            ),
+            edits=[
+                lsp_type.TextEdit(
+                    range=lsp_type.Range(
+                        start=lsp_type.Position(line=sl, character=sc),
+                        end=lsp_type.Position(line=el, character=ec),
+                    ),
+                    new_text=text,
+                )
+                for sl, sc, el, ec, text in self.edits
+            ],
+        )
+
+
+def _compact_file(
+    uri: str, version: int | None, edits: list[lsp_type.TextEdit]
+) -> CompactFileEdit:
+    return CompactFileEdit(
+        uri,
+        version,
+        tuple(
+            (
+                e.range.start.line,
+                e.range.start.character,
+                e.range.end.line,
+                e.range.end.character,
+                sys.intern(get_edit_text(e)),
+            )
+            for e in edits
+        ),
+    )
+
+
+@frozen
+class CompactEdit:
+    """A workspace edit of text edits only, as plain tuples."""
+
+    files: tuple[CompactFileEdit, ...]
+
+    @classmethod
+    def compact(cls, edit: lsp_type.WorkspaceEdit) -> CompactEdit | None:
+        """The compact form of `edit`, or None if it has resource operations."""
+        files = []
+        if edit.document_changes:
+            for change in edit.document_changes:
+                if not isinstance(change, lsp_type.TextDocumentEdit):
+                    return None
+                doc = change.text_document
+                files.append(_compact_file(doc.uri, doc.version, change.edits))
+        elif edit.changes:
+            files.extend(
+                _compact_file(uri, None, edits) for uri, edits in edit.changes.items()
+            )
+        return cls(tuple(files))
+
+    @property
+    def size(self) -> int:
+        return sum(file.size for file in self.files)
+
+    def to_lsp(self) -> lsp_type.WorkspaceEdit:
+        return lsp_type.WorkspaceEdit(
+            document_changes=[file.to_lsp() for file in self.files]
+        )
+
+
+def _estimate_size(edit: lsp_type.WorkspaceEdit) -> int:
+    return sum(
+        FILE_OVERHEAD
+        + len(uri)
+        + sum(EDIT_OVERHEAD + len(get_edit_text(e)) for e in edits)
+        for uri, edits in iter_text_document_edits(edit)
+    ) + FILE_OVERHEAD * len(edit.document_changes or ())
+
+
+@define
+class StoredPreview:
+    # Edits with resource operations are rare and kept as they are.
+    edit: CompactEdit | lsp_type.WorkspaceEdit
+    old_name: str
+    new_name: str
+    size: int
+    expires_at: float
+
+    def to_rename(self) -> CachedRename:
+        edit = self.edit.to_lsp() if isinstance(self.edit, CompactEdit) else self.edit
+        return CachedRename(edit=edit, old_name=self.old_name, new_name=self.new_name)
+
+
+@define
+class PreviewStore:
+    ttl: float
+    max_bytes: int
+    _previews: OrderedDict[str, StoredPreview] = field(factory=OrderedDict, init=False)
+    _bytes: int = field(default=0, init=False)
+
+    def _drop(self, rename_id: str) -> None:
+        if (preview := self._previews.pop(rename_id, None)) is not None:
+            self._bytes -= preview.size
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for rename_id in [
+            rid for rid, preview in self._previews.items() if preview.expires_at <= now
+        ]:
+            self._drop(rename_id)
+
+    def put(self, rename_id: str, rename: CachedRename) -> None:
+        self._expire()
+        edit = CompactEdit.compact(rename.edit) or rename.edit
+        size = edit.size if isinstance(edit, CompactEdit) else _estimate_size(edit)
+        self._drop(rename_id)
+        self._previews[rename_id] = StoredPreview(
+            edit,
+            rename.old_name,
+            rename.new_name,
+            size,
+            time.monotonic() + self.ttl,
+        )
+        self._bytes += size
+        # The newest preview is kept even if it alone is over budget.
+        while self._bytes > self.max_bytes and len(self._previews) > 1:
+            self._drop(next(iter(self._previews)))
+
+    def get(self, rename_id: str) -> CachedRename:
+        self._expire()
+        if (preview := self._previews.get(rename_id)) is None:
+            raise NotFoundError(
+                f"Rename preview {rename_id} has expired or does not exist; "
+                "run `lsp rename preview` again"
+            )
+        self._previews.move_to_end(rename_id)
+        return preview.to_rename()
+
+    def discard(self, rename_id: str) -> None:
+        self._drop(rename_id)
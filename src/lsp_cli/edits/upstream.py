@@ -0,0 +1,41 @@
+"""The private parts of lsap's rename capability that these edits build on.
+
+They are reached only through here, so a change upstream breaks one module and
+its tests rather than the commands using them.
+"""
+
+from lsap.capability.rename import (
+    CachedRename,
+    RenameExecuteCapability,
+    RenamePreviewCapability,
+    _get_old_name,
+    _preview_cache,
+)
+from lsap.schema.rename import RenameFileChange
+from lsap.utils.document import DocumentReader
+from lsp_client.utils.types import lsp_type
+
+
+def old_name(
+    reader: DocumentReader,
+    pos: lsp_type.Position,
+    prepare: lsp_type.PrepareRenameResult,
+) -> str:
+    """The name a rename at `pos` replaces, as `prepareRename` describes it.
+
+    Raises `ValueError` for results of an unknown form.
+    """
+    return _get_old_name(reader, pos, prepare)
+
+
+async def file_changes(
+    capability: RenamePreviewCapability | RenameExecuteCapability,
+    edit: lsp_type.WorkspaceEdit,
+) -> list[RenameFileChange]:
+    """The changes `edit` makes to each file, as a rename lists them."""
+    return await capability._to_changes(edit)
+
+
+def pop_cached_preview(rename_id: str) -> CachedRename | None:
+    """Take a preview out of lsap's process-wide cache."""
+    return _preview_cache.pop(rename_id)
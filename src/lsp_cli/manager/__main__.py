@@ -1,25 +1,72 @@
-from contextlib import suppress
+import os
+import socket
+from contextlib import AsyncExitStack, suppress
 
-import httpx
-import uvicorn
+import anyio
 
-from lsp_cli.manager.models import RootModel
-from lsp_cli.settings import MANAGER_UDS_PATH
-from lsp_cli.utils.uds import open_uds
+from lsp_cli.paths import (
+    MANAGER_LISTEN_LOCK_PATH,
+    MANAGER_LOCK_PATH,
+    MANAGER_READY_FD_ENV,
+    MANAGER_UDS_PATH,
+)
+from lsp_cli.utils.lock import file_lock, try_lock, wait_lock
+from lsp_cli.utils.socket import is_socket_alive
+from lsp_cli.utils.uds import listen_uds
 
-from .manager import anyio, app, connect_manager
+# How long a manager that finds the lock held waits for its holder to exit.
+LOCK_WAIT = 5.0
+
+
+def notify_ready() -> None:
+    """Signal the spawning CLI (if any) that the manager socket is listening."""
+    if (fd := os.environ.pop(MANAGER_READY_FD_ENV, None)) is None:
+        return
+    with suppress(OSError):
+        os.write(int(fd), b"1")
+    with suppress(OSError):
+        os.close(int(fd))
+
+
+async def listen_or_defer(stack: AsyncExitStack) -> socket.socket | None:
+    """Take the manager lock and listen on its socket, or defer to its holder.
+
+    Only one manager may own the socket. Managers take the lock and start
+    listening under the listen lock, so once that is free, a held manager lock
+    means its holder listens, or has stopped listening and is about to exit.
+    Readiness is signalled in the first case, and the lock taken over once the
+    holder exits in the second. If that takes too long, nothing is signalled,
+    so the spawning CLI sees EOF and checks again under its startup lock.
+
+    The lock and the socket are released when `stack` closes.
+    """
+    with anyio.move_on_after(LOCK_WAIT):
+        async with file_lock(MANAGER_LISTEN_LOCK_PATH):
+            if (lock_fd := try_lock(MANAGER_LOCK_PATH)) is None:
+                if await is_socket_alive(MANAGER_UDS_PATH):
+                    notify_ready()
+                    return None
+                lock_fd = await wait_lock(MANAGER_LOCK_PATH)
+            stack.callback(os.close, lock_fd)
+            return await stack.enter_async_context(listen_uds(MANAGER_UDS_PATH))
+    return None
 
 
 async def main() -> None:
-    # shutdown previous manager if exists
-    with suppress(httpx.ConnectError):
-        async with connect_manager(start=False) as client:
-            await client.post("/shutdown", RootModel[None])
+    async with AsyncExitStack() as stack:
+        if (sock := await listen_or_defer(stack)) is None:
+            return
+        notify_ready()
+
+        # The server stack is imported only after the socket is listening, so
+        # the spawning CLI can already send its request while these modules load.
+        import uvicorn
+
+        from .manager import app
 
-    async with open_uds(MANAGER_UDS_PATH):
-        config = uvicorn.Config(app, uds=str(MANAGER_UDS_PATH), loop="asyncio")
+        config = uvicorn.Config(app, loop="asyncio")
         server = uvicorn.Server(config)
-        await server.serve()
+        await server.serve(sockets=[sock])
 
 
 if __name__ == "__main__":
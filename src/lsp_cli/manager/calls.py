@@ -0,0 +1,159 @@
+"""Call hierarchy, expanded one level at a time for `lsp calls`.
+
+The located symbol is prepared into the server's call hierarchy items, and each
+request after that expands the nodes of one level into their callers or callees
+at once. Nodes carry the server's item, so expanding them needs no state here;
+the CLI remembers which nodes it has expanded, which also stops it at cycles.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from functools import cached_property
+
+import anyio
+import xxhash
+from attrs import define
+from cattrs.errors import BaseValidationError
+from lsap.capability.locate import LocateCapability
+from lsap.exception import NotFoundError
+from lsap.schema.locate import LocateRequest
+from lsap.schema.models import SymbolKind
+from lsap.utils.capability import ensure_capability
+from lsp_client import Client
+from lsp_client.capability.request import WithRequestCallHierarchy
+from lsp_client.exception import LSPError
+from lsp_client.jsonrpc.convert import converter
+from lsp_client.jsonrpc.id import jsonrpc_uuid
+from lsp_client.utils.types import lsp_type
+
+from lsp_cli.settings import settings
+
+from .models import (
+    CallDirection,
+    CallEdge,
+    CallNode,
+    CallsExpandRequest,
+    CallsResponse,
+)
+
+
+def to_node(client: Client, item: lsp_type.CallHierarchyItem) -> CallNode:
+    start = item.selection_range.start
+    return CallNode(
+        id=xxhash.xxh3_64_hexdigest(
+            f"{item.uri}:{start.line}:{start.character}:{item.name}"
+        ),
+        name=item.name,
+        kind=SymbolKind.from_lsp(item.kind).value,
+        file_path=client.from_uri(item.uri, relative=False),
+        line=start.line + 1,
+        detail=item.detail,
+        item=converter.unstructure(item),
+    )
+
+
+def to_item(node: CallNode) -> lsp_type.CallHierarchyItem:
+    """The server's item of a node, as sent back by the CLI."""
+    try:
+        return converter.structure(node.item, lsp_type.CallHierarchyItem)
+    except BaseValidationError as e:
+        raise ValueError(f"invalid call hierarchy item: {e}") from e
+
+
+async def request_calls(
+    client: Client, item: lsp_type.CallHierarchyItem, direction: CallDirection
+) -> list[tuple[lsp_type.CallHierarchyItem, Sequence[lsp_type.Range]]]:
+    """The items calling `item`, or called by it, with the ranges of the calls.
+
+    lsp_client only offers these requests for a position, preparing the
+    hierarchy again and merging the calls of every item found there, so a
+    given item is expanded with requests of its own.
+    """
+    if direction == "incoming":
+        incoming = await client.request(
+            lsp_type.CallHierarchyIncomingCallsRequest(
+                id=jsonrpc_uuid(),
+                params=lsp_type.CallHierarchyIncomingCallsParams(item=item),
+            ),
+            schema=lsp_type.CallHierarchyIncomingCallsResponse,
+        )
+        return [(call.from_, call.from_ranges) for call in incoming or ()]
+    outgoing = await client.request(
+        lsp_type.CallHierarchyOutgoingCallsRequest(
+            id=jsonrpc_uuid(),
+            params=lsp_type.CallHierarchyOutgoingCallsParams(item=item),
+        ),
+        schema=lsp_type.CallHierarchyOutgoingCallsResponse,
+    )
+    return [(call.to, call.from_ranges) for call in outgoing or ()]
+
+
+def _lines(ranges: Sequence[lsp_type.Range]) -> list[int]:
+    return sorted({r.start.line + 1 for r in ranges})
+
+
+@define
+class CallsPrepareCapability:
+    client: Client
+
+    @cached_property
+    def locate(self) -> LocateCapability:
+        return LocateCapability(self.client)
+
+    async def __call__(self, req: LocateRequest) -> CallsResponse:
+        if not (located := await self.locate(req)):
+            raise NotFoundError("no symbol found there")
+        client = ensure_capability(self.client, WithRequestCallHierarchy)
+        items = await client.prepare_call_hierarchy(
+            located.file_path, located.position.to_lsp()
+        )
+        return CallsResponse(nodes=[to_node(self.client, item) for item in items or ()])
+
+
+@define
+class CallsExpandCapability:
+    client: Client
+
+    async def _expand(
+        self, node: CallNode, direction: CallDirection
+    ) -> list[tuple[CallNode, CallEdge]]:
+        ensure_capability(self.client, WithRequestCallHierarchy)
+        linked = await request_calls(self.client, to_item(node), direction)
+
+        found = []
+        for other, ranges in linked:
+            reached = to_node(self.client, other)
+            caller, callee = (
+                (reached, node) if direction == "incoming" else (node, reached)
+            )
+            edge = CallEdge(caller=caller.id, callee=callee.id, lines=_lines(ranges))
+            found.append((reached, edge))
+        return found
+
+    async def __call__(self, req: CallsExpandRequest) -> CallsResponse:
+        expanded: dict[int, list[tuple[CallNode, CallEdge]]] = {}
+        errors: dict[int, str] = {}
+        limiter = anyio.CapacityLimiter(settings.calls_concurrency)
+
+        async def expand(index: int, node: CallNode) -> None:
+            async with limiter:
+                # One node failing, or sent back with an item that is no longer
+                # valid, leaves it unexpanded rather than failing the level.
+                try:
+                    expanded[index] = await self._expand(node, req.direction)
+                except (LSPError, ValueError) as e:
+                    errors[index] = f"{node.name} ({node.file_path}:{node.line}): {e}"
+
+        async with anyio.create_task_group() as tg:
+            for index, node in enumerate(req.nodes):
+                tg.start_soon(expand, index, node)
+
+        # Nodes reached from several nodes of the level are listed once.
+        found = [pair for i in sorted(expanded) for pair in expanded[i]]
+        nodes = {node.id: node for node, _ in found}
+        return CallsResponse(
+            nodes=list(nodes.values()),
+            edges=[edge for _, edge in found],
+            errors=[errors[i] for i in sorted(errors)],
+        )
@@ -1,5 +1,6 @@
-from typing import Self
+from typing import Final, Self
 
+import anyio
 from attrs import frozen
 from litestar import Controller, post
 from litestar.datastructures.state import State
@@ -16,59 +17,173 @@ from lsap.capability.reference import (
     ReferenceResponse,
 )
 from lsap.capability.rename import (
-    RenameExecuteCapability,
     RenameExecuteRequest,
-    RenameExecuteResponse,
-    RenamePreviewCapability,
     RenamePreviewRequest,
     RenamePreviewResponse,
 )
 from lsap.capability.search import SearchCapability, SearchRequest, SearchResponse
 from lsap.capability.symbol import SymbolCapability, SymbolRequest, SymbolResponse
 from lsp_client import Client
+from pydantic import BaseModel
+
+from lsp_cli.edits.batch import RenameBatchCapability
+from lsp_cli.edits.capability import (
+    AtomicRenameExecuteCapability,
+    StoredRenamePreviewCapability,
+)
+from lsp_cli.edits.models import (
+    RenameBatchRequest,
+    RenameBatchResponse,
+    ReportedRenameExecuteResponse,
+)
+from lsp_cli.edits.previews import PreviewStore
+from lsp_cli.settings import settings
+from lsp_cli.syntax.capability import (
+    FallbackCapability,
+    SyntacticLocateCapability,
+    SyntacticOutlineCapability,
+)
+
+from .calls import CallsExpandCapability, CallsPrepareCapability
+from .diagnostics import DiagnosticsCapability, DiagnosticsStore
+from .documents import CachedReferenceCapability, DocumentStore
+from .index import IndexCapability
+from .models import (
+    CallsExpandRequest,
+    CallsResponse,
+    DiagnosticsRequest,
+    DiagnosticsResponse,
+    IndexRequest,
+    IndexResponse,
+    OptionalHoverOutlineRequest,
+    UnusedRequest,
+    UnusedResponse,
+)
+from .outlines import OptionalHoverOutlineCapability
+from .unused import UnusedCapability
 
 
 @frozen
 class Capabilities:
+    calls_prepare: CallsPrepareCapability
+    calls_expand: CallsExpandCapability
     definition: DefinitionCapability
-    locate: LocateCapability
-    outline: OutlineCapability
+    diagnostics: DiagnosticsCapability
+    index: IndexCapability
+    locate: LocateCapability | FallbackCapability[LocateRequest, LocateResponse]
+    outline: OutlineCapability | FallbackCapability[OutlineRequest, OutlineResponse]
     reference: ReferenceCapability
-    rename_preview: RenamePreviewCapability
-    rename_execute: RenameExecuteCapability
+    rename_preview: StoredRenamePreviewCapability
+    rename_execute: AtomicRenameExecuteCapability
+    rename_batch: RenameBatchCapability
     search: SearchCapability
     symbol: SymbolCapability
+    unused: UnusedCapability
 
     @classmethod
-    def build(cls, client: Client) -> Self:
+    def build(
+        cls,
+        client: Client,
+        diagnostics: DiagnosticsStore,
+        documents: DocumentStore,
+        fallback_until: anyio.Event | None = None,
+    ) -> Self:
+        """Build the capabilities of a started client.
+
+        Given `fallback_until`, outline and locate are answered from a syntactic
+        parse where possible until it is set, e.g. while the server warms up.
+        """
+        locate = LocateCapability(client)
+        outline = OptionalHoverOutlineCapability(client)
+        if fallback_until is not None:
+            locate = FallbackCapability(
+                locate, SyntacticLocateCapability(client), fallback_until
+            )
+            outline = FallbackCapability(
+                outline, SyntacticOutlineCapability(client), fallback_until
+            )
+
+        previews = PreviewStore(
+            settings.rename_preview_ttl, settings.rename_preview_bytes
+        )
+        rename_preview = StoredRenamePreviewCapability(client, previews=previews)
         return cls(
+            calls_prepare=CallsPrepareCapability(client),
+            calls_expand=CallsExpandCapability(client),
             definition=DefinitionCapability(client),
-            locate=LocateCapability(client),
-            outline=OutlineCapability(client),
-            reference=ReferenceCapability(client),
-            rename_preview=RenamePreviewCapability(client),
-            rename_execute=RenameExecuteCapability(client),
+            diagnostics=DiagnosticsCapability(client, diagnostics, documents),
+            index=IndexCapability(client, documents),
+            locate=locate,
+            outline=outline,
+            reference=CachedReferenceCapability(client, documents=documents),
+            rename_preview=rename_preview,
+            rename_execute=AtomicRenameExecuteCapability(client, previews=previews),
+            rename_batch=RenameBatchCapability(client, preview=rename_preview),
             search=SearchCapability(client),
             symbol=SymbolCapability(client),
+            unused=UnusedCapability(client, documents),
         )
 
 
+# Route of each capability, with its `Capabilities` field and request model.
+# The RPC transport dispatches on these instead of going through Litestar.
+CAPABILITY_ROUTES: Final[dict[str, tuple[str, type[BaseModel]]]] = {
+    "/capability/calls/prepare": ("calls_prepare", LocateRequest),
+    "/capability/calls/expand": ("calls_expand", CallsExpandRequest),
+    "/capability/definition": ("definition", DefinitionRequest),
+    "/capability/diagnostics": ("diagnostics", DiagnosticsRequest),
+    "/capability/index": ("index", IndexRequest),
+    "/capability/locate": ("locate", LocateRequest),
+    "/capability/outline": ("outline", OptionalHoverOutlineRequest),
+    "/capability/reference": ("reference", ReferenceRequest),
+    "/capability/rename/preview": ("rename_preview", RenamePreviewRequest),
+    "/capability/rename/execute": ("rename_execute", RenameExecuteRequest),
+    "/capability/rename/batch": ("rename_batch", RenameBatchRequest),
+    "/capability/search": ("search", SearchRequest),
+    "/capability/symbol": ("symbol", SymbolRequest),
+    "/capability/unused": ("unused", UnusedRequest),
+}
+
+# Routes that need not wait for warmup with the syntactic fallback enabled.
+FALLBACK_ROUTES: Final = frozenset({"/capability/locate", "/capability/outline"})
+
+
 class CapabilityController(Controller):
     path = "/capability"
 
+    @post("/calls/prepare")
+    async def calls_prepare(self, data: LocateRequest, state: State) -> CallsResponse:
+        return await state.capabilities.calls_prepare(data)
+
+    @post("/calls/expand")
+    async def calls_expand(
+        self, data: CallsExpandRequest, state: State
+    ) -> CallsResponse:
+        return await state.capabilities.calls_expand(data)
+
     @post("/definition")
     async def definition(
         self, data: DefinitionRequest, state: State
     ) -> DefinitionResponse | None:
         return await state.capabilities.definition(data)
 
+    @post("/diagnostics")
+    async def diagnostics(
+        self, data: DiagnosticsRequest, state: State
+    ) -> DiagnosticsResponse:
+        return await state.capabilities.diagnostics(data)
+
+    @post("/index")
+    async def index(self, data: IndexRequest, state: State) -> IndexResponse:
+        return await state.capabilities.index(data)
+
     @post("/locate")
     async def locate(self, data: LocateRequest, state: State) -> LocateResponse | None:
         return await state.capabilities.locate(data)
 
     @post("/outline")
     async def outline(
-        self, data: OutlineRequest, state: State
+        self, data: OptionalHoverOutlineRequest, state: State
     ) -> OutlineResponse | None:
         return await state.capabilities.outline(data)
 
@@ -87,9 +202,15 @@ class CapabilityController(Controller):
     @post("/rename/execute")
     async def rename_execute(
         self, data: RenameExecuteRequest, state: State
-    ) -> RenameExecuteResponse | None:
+    ) -> ReportedRenameExecuteResponse | None:
         return await state.capabilities.rename_execute(data)
 
+    @post("/rename/batch")
+    async def rename_batch(
+        self, data: RenameBatchRequest, state: State
+    ) -> RenameBatchResponse | None:
+        return await state.capabilities.rename_batch(data)
+
     @post("/search")
     async def search(self, data: SearchRequest, state: State) -> SearchResponse | None:
         return await state.capabilities.search(data)
@@ -97,3 +218,7 @@ class CapabilityController(Controller):
     @post("/symbol")
     async def symbol(self, data: SymbolRequest, state: State) -> SymbolResponse | None:
         return await state.capabilities.symbol(data)
+
+    @post("/unused")
+    async def unused(self, data: UnusedRequest, state: State) -> UnusedResponse:
+        return await state.capabilities.unused(data)
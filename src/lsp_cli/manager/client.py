@@ -1,27 +1,49 @@
 from __future__ import annotations
 
-from collections.abc import AsyncGenerator
-from contextlib import asynccontextmanager
+import socket
+from collections.abc import AsyncGenerator, Generator
+from contextlib import asynccontextmanager, contextmanager
+from functools import partial
 from pathlib import Path
 
 import anyio
+import anyio.to_thread
 import asyncer
 import loguru
 import uvicorn
 import xxhash
+from anyio.abc import ByteStream, Listener
 from attrs import define, field
 from litestar import Controller, Litestar, Request, Response, get
 from litestar.datastructures import State
 from litestar.types import ASGIApp, Receive, Scope, Send
 from loguru import logger
+from lsp_client import Client
+from lsp_client.utils.workspace import Workspace
+from pydantic import BaseModel, ValidationError
 
 from lsp_cli.client import ClientTarget
-from lsp_cli.manager.capability import Capabilities, CapabilityController
-from lsp_cli.settings import RUNTIME_DIR, get_client_log_path, settings
+from lsp_cli.manager.capability import (
+    CAPABILITY_ROUTES,
+    FALLBACK_ROUTES,
+    Capabilities,
+    CapabilityController,
+)
+from lsp_cli.paths import RUNTIME_DIR, get_client_log_path
+from lsp_cli.settings import settings
 from lsp_cli.utils.logging import logging_filter
-from lsp_cli.utils.uds import open_uds
+from lsp_cli.utils.rpc import RpcConnection, RpcError, serve_rpc
+from lsp_cli.utils.uds import listen_uds, open_uds
 
+from .diagnostics import PUBLISH_DIAGNOSTICS, DiagnosticsStore
+from .documents import DocumentStore, caching_client
+from .jsonrpc import LspNotification, LspRequest, SubscribeRequest
 from .models import GetIDResponse, ManagedClientInfo
+from .monorepo import find_projects, monorepo_client, monorepo_workspace
+from .notifications import NotificationHub, publishing_client
+from .open_documents import OpenDocumentPool, pooling_client
+from .outlines import OutlineCache, outline_caching_client
+from .raw import LspController, forward_notification, forward_request
 
 
 def get_client_id(target: ClientTarget) -> str:
@@ -39,17 +61,52 @@ class ClientController(Controller):
         return GetIDResponse(id=managed_client.id)
 
 
+class ClientServer(uvicorn.Server):
+    """A uvicorn server stopped by its manager rather than by signals.
+
+    Each server replaces the process's signal handlers while serving and puts
+    back the ones it found when it exits. With clients starting and exiting in
+    any order, that could leave an exited client's handler installed in place of
+    the manager's.
+    """
+
+    @contextmanager
+    def capture_signals(self) -> Generator[None]:
+        yield
+
+
 @define
 class ManagedClient:
     target: ClientTarget
 
-    _server: uvicorn.Server = field(init=False)
+    # Unset until the client starts serving.
+    _server: ClientServer | None = field(default=None, init=False)
+    _client: Client = field(init=False)
+    _capabilities: Capabilities = field(init=False)
+    _notifications: NotificationHub = field(factory=NotificationHub, init=False)
+    _diagnostics: DiagnosticsStore = field(factory=DiagnosticsStore, init=False)
+    _documents: DocumentStore = field(
+        factory=lambda: DocumentStore(settings.document_cache_bytes), init=False
+    )
+    _outlines: OutlineCache = field(
+        factory=lambda: OutlineCache(settings.outline_cache_entries), init=False
+    )
+    _open_documents: OpenDocumentPool = field(
+        factory=lambda: OpenDocumentPool(settings.max_open_documents), init=False
+    )
+    # Projects sharing the client, when its target is a monorepo.
+    _projects: list[Path] = field(factory=list, init=False)
     _timeout_scope: anyio.CancelScope = field(init=False)
     _server_scope: anyio.CancelScope = field(init=False)
     _warmup_event: anyio.Event = field(init=False)
+    _started_event: anyio.Event = field(init=False)
+    # Set once the language server has started, or the client has exited.
+    _ready_event: anyio.Event = field(init=False)
+    _stopped_event: anyio.Event = field(init=False)
 
     _deadline: float = field(init=False)
     _should_exit: bool = False
+    _startup_error: Exception | None = field(default=None, init=False)
 
     _logger: loguru.Logger = field(init=False)
     _sink_id: int = field(init=False)
@@ -68,6 +125,11 @@ class ManagedClient:
     def __attrs_post_init__(self) -> None:
         self._deadline = anyio.current_time() + settings.idle_timeout
         self._warmup_event = anyio.Event()
+        self._started_event = anyio.Event()
+        self._ready_event = anyio.Event()
+        self._stopped_event = anyio.Event()
+        self._timeout_scope = anyio.CancelScope()
+        self._server_scope = anyio.CancelScope()
 
         self._setup_logger()
         self._logger.info("Client initialized")
@@ -80,6 +142,10 @@ class ManagedClient:
     def uds_path(self) -> Path:
         return RUNTIME_DIR / f"{self.id}.sock"
 
+    @property
+    def rpc_path(self) -> Path:
+        return RUNTIME_DIR / f"{self.id}.rpc.sock"
+
     @property
     def info(self) -> ManagedClientInfo:
         return ManagedClientInfo(
@@ -87,13 +153,39 @@ class ManagedClient:
             language=self.target.client_cls.get_language_config().kind.value,
             remaining_time=max(0.0, self._deadline - anyio.current_time()),
             is_warming_up=not self._warmup_event.is_set(),
+            open_documents=self._open_documents.count,
+            open_document_bytes=self._open_documents.size,
+            projects=len(self._projects),
+            suffixes=self.target.client_cls.get_language_config().suffixes,
         )
 
+    @property
+    def is_running(self) -> bool:
+        return not self._should_exit
+
+    @property
+    def startup_error(self) -> Exception | None:
+        """Why the language server failed to start, if it did."""
+        return self._startup_error
+
+    async def wait_ready(self) -> None:
+        """Wait until the language server has started, or the client exits."""
+        await self._ready_event.wait()
+
+    async def wait_stopped(self) -> None:
+        """Wait until the client has exited and its socket path is unlinked."""
+        await self._stopped_event.wait()
+
     def stop(self) -> None:
         self._logger.info("Stopping managed client")
         self._should_exit = True
-        self._server.should_exit = True
-        self._server_scope.cancel()
+        # Let uvicorn shut down gracefully: its lifespan (which owns the language
+        # server process) runs in a separate task and would leak if cancelled.
+        # A server not created yet starts out exiting instead.
+        if self._server is not None:
+            self._server.should_exit = True
+        # Open notification streams would otherwise hold up the graceful shutdown.
+        self._notifications.close()
         self._timeout_scope.cancel()
 
     def _reset_timeout(self) -> None:
@@ -107,9 +199,9 @@ class ManagedClient:
         self._warmup_event.set()
         self._logger.info("Warmup complete")
 
-    async def _timeout_loop(self) -> None:
+    async def _timeout_loop(self, server: uvicorn.Server) -> None:
         while not self._should_exit:
-            if self._server.should_exit:
+            if server.should_exit:
                 break
             remaining = self._deadline - anyio.current_time()
             if remaining <= 0:
@@ -118,19 +210,115 @@ class ManagedClient:
                 self._timeout_scope = scope
                 await anyio.sleep(remaining)
 
-        self._server.should_exit = True
-        self._server_scope.cancel()
+        server.should_exit = True
+        self._notifications.close()
 
-    async def _serve(self) -> None:
+    def _skips_warmup(self, route: str) -> bool:
+        # The id handshake needs nothing from the server. Fallback capabilities
+        # answer from a syntactic parse, or wait for warmup themselves.
+        return route == "/client/id" or (
+            settings.syntactic_fallback and route in FALLBACK_ROUTES
+        )
+
+    async def _push_notifications(
+        self, conn: RpcConnection, methods: list[str] | None
+    ) -> None:
+        with self._notifications.subscribe(methods) as notifications:
+            async for notification in notifications:
+                await conn.notify(notification["method"], notification.get("params"))
+
+    async def _subscribe(self, conn: RpcConnection, request: SubscribeRequest) -> None:
+        conn.start_soon(self._push_notifications, conn, request.methods)
+
+    async def _dispatch_rpc(
+        self, method: str, params: object, conn: RpcConnection
+    ) -> BaseModel | None:
+        # Same gates as the HTTP side: the lifespan and the warmup middleware.
+        await self._started_event.wait()
+        if not self._skips_warmup(method):
+            await self._warmup_event.wait()
+
+        match method:
+            case "/client/id":
+                return GetIDResponse(id=self.id)
+            case "/lsp/request":
+                request_cls, handler = (
+                    LspRequest,
+                    partial(forward_request, self._client),
+                )
+            case "/lsp/notify":
+                request_cls, handler = (
+                    LspNotification,
+                    partial(forward_notification, self._client),
+                )
+            case "/lsp/subscribe":
+                request_cls, handler = SubscribeRequest, partial(self._subscribe, conn)
+            case _ if route := CAPABILITY_ROUTES.get(method):
+                name, request_cls = route
+                handler = getattr(self._capabilities, name)
+            case _:
+                raise RpcError(404, f"Unknown method: {method}")
+
+        try:
+            request = request_cls.model_validate(params)
+        except ValidationError as e:
+            raise RpcError(400, str(e)) from e
+
+        try:
+            return await handler(request)
+        except Exception:
+            self._logger.exception("Unhandled exception in RPC")
+            raise
+
+    async def _serve(
+        self, sock: socket.socket, rpc_listener: Listener[ByteStream]
+    ) -> None:
         @asynccontextmanager
         async def lifespan(app: Litestar) -> AsyncGenerator[None]:
             app.state.managed_client = self
-            async with self.target.client_cls(
-                workspace=self.target.project_path,
-                request_timeout=120,
-            ) as client:
-                app.state.capabilities = Capabilities.build(client)
-                yield
+            client_cls = self.target.client_cls
+            client_cls = caching_client(client_cls, self._documents)
+            client_cls = pooling_client(client_cls, self._open_documents)
+            client_cls = outline_caching_client(client_cls, self._outlines)
+            client_cls = publishing_client(client_cls, self._notifications)
+            workspace: Path | Workspace = self.target.project_path
+            if self.target.monorepo:
+                root = self.target.project_path
+                self._projects = await anyio.to_thread.run_sync(
+                    find_projects, root, client_cls.get_language_config()
+                )
+                workspace = monorepo_workspace(root, self._projects)
+                client_cls = monorepo_client(client_cls, root)
+            try:
+                async with client_cls(
+                    workspace=workspace,
+                    request_timeout=120,
+                ) as client:
+                    self._client = client
+                    self._capabilities = Capabilities.build(
+                        client,
+                        self._diagnostics,
+                        self._documents,
+                        fallback_until=self._warmup_event
+                        if settings.syntactic_fallback
+                        else None,
+                    )
+                    app.state.client = client
+                    app.state.capabilities = self._capabilities
+                    app.state.notifications = self._notifications
+                    self._started_event.set()
+                    self._ready_event.set()
+                    yield
+            except Exception as e:
+                if not self._started_event.is_set():
+                    # The client's task group wraps the actual cause.
+                    cause = e
+                    while (
+                        isinstance(cause, ExceptionGroup) and len(cause.exceptions) == 1
+                    ):
+                        cause = cause.exceptions[0]
+                    self._startup_error = cause
+                raise
 
         def exception_handler(request: Request, exc: Exception) -> Response:
             self._logger.exception("Unhandled exception in Litestar: {}", exc)
@@ -142,31 +330,49 @@ class ManagedClient:
 
         def warmup_middleware(app: ASGIApp) -> ASGIApp:
             async def middleware(scope: Scope, receive: Receive, send: Send) -> None:
-                if scope["type"] == "http":
+                if scope["type"] == "http" and not self._skips_warmup(scope["path"]):
                     await self._warmup_event.wait()
                 await app(scope, receive, send)
 
             return middleware
 
         app = Litestar(
-            route_handlers=[CapabilityController, ClientController],
+            route_handlers=[CapabilityController, ClientController, LspController],
             lifespan=[lifespan],
             exception_handlers={Exception: exception_handler},
             middleware=[warmup_middleware],
         )
 
-        config = uvicorn.Config(app, uds=str(self.uds_path), loop="asyncio")
-        self._server = uvicorn.Server(config)
+        config = uvicorn.Config(app, loop="asyncio")
+        self._server = server = ClientServer(config)
+        server.should_exit = self._should_exit
 
-        with anyio.CancelScope() as scope:
+        with (
+            anyio.CancelScope() as scope,
+            # Subscribed before the language server starts, so nothing is missed.
+            self._notifications.subscribe([PUBLISH_DIAGNOSTICS]) as diagnostics,
+        ):
             self._server_scope = scope
             async with asyncer.create_task_group() as tg:
-                tg.soonify(self._timeout_loop)()
+                tg.soonify(self._timeout_loop)(server)
+                tg.soonify(self._diagnostics.collect)(diagnostics)
                 # We start the warmup task concurrently with the server.
                 # The warmup middleware will block incoming requests until the warmup task sets _warmup_event.
                 # This prevents "connection refused" while the client is warming up.
                 tg.soonify(self._warmup_task)()
-                await self._server.serve()
+                tg.soonify(serve_rpc)(
+                    rpc_listener,
+                    self._dispatch_rpc,
+                    shm_threshold=settings.shm_threshold,
+                )
+                try:
+                    await server.serve(sockets=[sock])
+                except SystemExit as e:
+                    # How uvicorn reports that the lifespan failed to start.
+                    raise RuntimeError(
+                        f"Language server failed to start: {self._startup_error}"
+                    ) from e
+                tg.cancel_scope.cancel()
 
     async def run(self) -> None:
         self._logger.info(
@@ -175,11 +381,20 @@ class ManagedClient:
             self.uds_path,
         )
 
-        async with open_uds(self.uds_path):
-            try:
-                await self._serve()
-            finally:
-                self._logger.info("Cleaning up client")
-                logger.remove(self._sink_id)
-                self._timeout_scope.cancel()
-                self._server_scope.cancel()
+        try:
+            async with (
+                listen_uds(self.uds_path) as sock,
+                open_uds(self.rpc_path),
+                await anyio.create_unix_listener(self.rpc_path) as rpc_listener,
+            ):
+                try:
+                    await self._serve(sock, rpc_listener)
+                finally:
+                    self._logger.info("Cleaning up client")
+                    logger.remove(self._sink_id)
+                    self._timeout_scope.cancel()
+                    self._server_scope.cancel()
+        finally:
+            self._should_exit = True
+            self._ready_event.set()
+            self._stopped_event.set()
@@ -0,0 +1,206 @@
+"""Diagnostics collected from the language server, answered without a round-trip.
+
+Servers push `textDocument/publishDiagnostics` for every document they check,
+e.g. the ones other commands open. These are kept per file, together with the
+document version and the file's mtime, so later queries for an unchanged file
+are answered from memory. Files not seen yet are pulled with
+`textDocument/diagnostic` where the server supports it, or else opened until
+the server publishes their diagnostics.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import anyio
+from anyio.streams.memory import MemoryObjectReceiveStream
+from attrs import define, field
+from loguru import logger
+from lsp_client import Client
+from lsp_client.capability.diagnostic import WithDocumentDiagnostic
+from lsp_client.jsonrpc.convert import converter
+from lsp_client.jsonrpc.types import RawNotification
+from lsp_client.utils.types import lsp_type
+from lsp_client.utils.uri import from_local_uri
+
+from lsp_cli.settings import settings
+from lsp_cli.utils.files import iter_source_files
+
+from .documents import DocumentStore
+from .models import (
+    Diagnostic,
+    DiagnosticSeverity,
+    DiagnosticsRequest,
+    DiagnosticsResponse,
+)
+
+PUBLISH_DIAGNOSTICS = lsp_type.TEXT_DOCUMENT_PUBLISH_DIAGNOSTICS
+
+SEVERITIES: dict[lsp_type.DiagnosticSeverity, DiagnosticSeverity] = {
+    lsp_type.DiagnosticSeverity.Error: "error",
+    lsp_type.DiagnosticSeverity.Warning: "warning",
+    lsp_type.DiagnosticSeverity.Information: "information",
+    lsp_type.DiagnosticSeverity.Hint: "hint",
+}
+
+
+def to_diagnostic(path: Path, diagnostic: lsp_type.Diagnostic) -> Diagnostic:
+    start = diagnostic.range.start
+    return Diagnostic(
+        file_path=path,
+        line=start.line + 1,
+        character=start.character + 1,
+        # Servers may leave it out; clients then decide, and errors are the safe bet.
+        severity=SEVERITIES.get(diagnostic.severity, "error"),
+        message=diagnostic.message,
+        source=diagnostic.source,
+        code=None if diagnostic.code is None else str(diagnostic.code),
+    )
+
+
+@define
+class DiagnosticsEntry:
+    mtime_ns: int
+    version: int | None
+    items: list[Diagnostic]
+
+
+@define
+class DiagnosticsStore:
+    _entries: dict[Path, DiagnosticsEntry] = field(factory=dict, init=False)
+    _updated: dict[Path, anyio.Event] = field(factory=dict, init=False)
+
+    def get(self, path: Path, mtime_ns: int) -> list[Diagnostic] | None:
+        """Diagnostics for the file, unless it changed since they were published."""
+        entry = self._entries.get(path)
+        if entry is None or entry.mtime_ns != mtime_ns:
+            return None
+        return entry.items
+
+    def update(
+        self,
+        path: Path,
+        mtime_ns: int,
+        version: int | None,
+        items: list[Diagnostic],
+    ) -> None:
+        if (entry := self._entries.get(path)) and entry.mtime_ns == mtime_ns:
+            if (
+                version is not None
+                and entry.version is not None
+                and version < entry.version
+            ):
+                return
+            # Servers that only check open documents retract their diagnostics
+            # this way when the document is closed, but the file is unchanged.
+            if version is None and entry.version is not None and not items:
+                return
+
+        self._entries[path] = DiagnosticsEntry(mtime_ns, version, items)
+        if event := self._updated.pop(path, None):
+            event.set()
+
+    def updated(self, path: Path) -> anyio.Event:
+        """An event set on the next update for the file."""
+        return self._updated.setdefault(path, anyio.Event())
+
+    def publish(self, notification: RawNotification) -> None:
+        params = converter.structure(
+            notification.get("params"), lsp_type.PublishDiagnosticsParams
+        )
+        if not params.uri.startswith("file:"):
+            return
+
+        path = from_local_uri(params.uri)
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._entries.pop(path, None)
+            return
+
+        items = [to_diagnostic(path, d) for d in params.diagnostics]
+        self.update(path, mtime_ns, params.version, items)
+
+    async def collect(
+        self, notifications: MemoryObjectReceiveStream[RawNotification]
+    ) -> None:
+        """Store published diagnostics until the stream ends."""
+        async for notification in notifications:
+            try:
+                self.publish(notification)
+            except Exception:  # noqa: BLE001
+                logger.exception("Invalid diagnostics notification")
+
+
+@define
+class DiagnosticsCapability:
+    client: Client
+    store: DiagnosticsStore
+    documents: DocumentStore
+
+    async def _check(self, path: Path, limiter: anyio.CapacityLimiter) -> None:
+        async with limiter:
+            mtime_ns = path.stat().st_mtime_ns
+            if isinstance(self.client, WithDocumentDiagnostic):
+                with anyio.fail_after(settings.diagnostics_timeout):
+                    diagnostics = await self.client.request_diagnostics(path)
+                if diagnostics is not None:
+                    items = [to_diagnostic(path, d) for d in diagnostics]
+                    self.store.update(path, mtime_ns, None, items)
+                return
+
+            updated = self.store.updated(path)
+            async with self.client.open_files(path):
+                with anyio.move_on_after(settings.diagnostics_timeout):
+                    await updated.wait()
+
+    async def _check_quietly(self, path: Path, limiter: anyio.CapacityLimiter) -> None:
+        # One file failing leaves it unchecked rather than failing them all.
+        try:
+            await self._check(path, limiter)
+        except Exception:  # noqa: BLE001
+            logger.exception("Failed to check {}", path)
+
+    async def __call__(self, req: DiagnosticsRequest) -> DiagnosticsResponse:
+        if req.path.is_dir():
+            suffixes = self.client.get_language_config().suffixes
+            files = await anyio.to_thread.run_sync(
+                iter_source_files, req.path, suffixes
+            )
+        else:
+            files = [(req.path, req.path.stat().st_mtime_ns)]
+
+        unseen = [
+            path for path, mtime_ns in files if self.store.get(path, mtime_ns) is None
+        ]
+        if req.max_files is not None:
+            unseen = unseen[: req.max_files]
+
+        limiter = anyio.CapacityLimiter(settings.diagnostics_concurrency)
+        async with anyio.create_task_group() as tg:
+            for path in unseen:
+                tg.start_soon(self._check_quietly, path, limiter)
+
+        items: list[Diagnostic] = []
+        checked = 0
+        for path, mtime_ns in files:
+            if (found := self.store.get(path, mtime_ns)) is None:
+                continue
+            checked += 1
+            if not found:
+                continue
+            # Servers count columns in UTF-16 code units, we count characters.
+            doc = await self.documents.get(path)
+            items.extend(
+                d.model_copy(
+                    update={
+                        "character": doc.to_character(d.line - 1, d.character - 1) + 1
+                    }
+                )
+                for d in found
+            )
+
+        items.sort(key=lambda d: (d.file_path, d.line, d.character))
+        return DiagnosticsResponse(
+            items=items, checked_files=checked, unchecked_files=len(files) - checked
+        )
@@ -0,0 +1,241 @@
+"""File contents shared by the capabilities of a client.
+
+Capabilities read the files they touch again for every request, and the
+reference capability once per hit. A `DocumentStore` keeps recently read files
+with an index of their line offsets, so unchanged files are neither read nor
+scanned again. Entries are checked against the file's mtime and size on every
+access, and evicted least recently used past a byte budget.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import re
+from array import array
+from collections import OrderedDict
+from functools import cached_property
+from pathlib import Path
+from typing import override
+
+import anyio
+from attrs import define, field
+from lsap.capability.reference import ReferenceCapability
+from lsap.schema.models import Location as LSAPLocation
+from lsap.schema.models import Position, Range, SymbolDetailInfo, SymbolKind
+from lsap.schema.reference import ReferenceItem
+from lsap.utils.capability import ensure_capability
+from lsap.utils.document import DocumentReader
+from lsap.utils.markdown import clean_hover_content
+from lsap.utils.symbol import symbol_at
+from lsp_client import Client
+from lsp_client.capability.request import WithRequestDocumentSymbol, WithRequestHover
+from lsp_client.utils.types import AnyPath
+from lsprotocol.types import Location
+from lsprotocol.types import Position as LSPPosition
+from lsprotocol.types import Range as LSPRange
+
+# Files this large are mapped rather than read into memory.
+MMAP_THRESHOLD = 1024 * 1024
+
+# Line terminators as LSP defines them.
+LINE_BREAK = re.compile(rb"\r\n|\r|\n")
+
+
+@define(eq=False)
+class Document:
+    """A file's bytes and line index; lines are only decoded when used."""
+
+    mtime_ns: int
+    size: int
+    data: bytes | mmap.mmap
+    line_starts: array[int]
+    """Byte offset of each line, plus the end of the file."""
+
+    @classmethod
+    def load(cls, path: Path) -> Document:
+        with path.open("rb") as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_size >= MMAP_THRESHOLD:
+                data: bytes | mmap.mmap = mmap.mmap(
+                    f.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            else:
+                data = f.read()
+
+        line_starts = array("q", [0])
+        line_starts.extend(m.end() for m in LINE_BREAK.finditer(data))
+        if line_starts[-1] != len(data):
+            line_starts.append(len(data))
+        return cls(stat.st_mtime_ns, stat.st_size, data, line_starts)
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_starts) - 1
+
+    def line(self, index: int) -> str:
+        """The line without its terminator, decoded on its own."""
+        if not 0 <= index < self.line_count:
+            return ""
+        raw = self.data[self.line_starts[index] : self.line_starts[index + 1]]
+        return raw.decode("utf-8", errors="replace").rstrip("\r\n")
+
+    @cached_property
+    def text(self) -> str:
+        """The decoded file, with newlines translated like `Path.read_text`."""
+        data = self.data if isinstance(self.data, bytes) else self.data[:]
+        return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+    @cached_property
+    def reader(self) -> DocumentReader:
+        """A reader shared by all requests, so its line index is built once."""
+        return DocumentReader(self.text)
+
+    def to_character(self, line: int, utf16_column: int) -> int:
+        """Convert an LSP column, in UTF-16 code units, to a character offset."""
+        text = self.line(line)
+        if text.isascii():
+            return utf16_column
+        units = 0
+        for index, char in enumerate(text):
+            if units >= utf16_column:
+                return index
+            units += 2 if ord(char) > 0xFFFF else 1
+        return len(text)
+
+    def to_utf16(self, line: int, character: int) -> int:
+        """Convert a character offset to an LSP column in UTF-16 code units."""
+        text = self.line(line)
+        if text.isascii():
+            return character
+        return sum(2 if ord(char) > 0xFFFF else 1 for char in text[:character])
+
+
+@define
+class DocumentStore:
+    max_bytes: int
+    _documents: OrderedDict[Path, Document] = field(factory=OrderedDict, init=False)
+    _bytes: int = field(default=0, init=False)
+
+    def _evict(self, path: Path) -> None:
+        if (doc := self._documents.pop(path, None)) is not None:
+            self._bytes -= doc.size
+
+    async def get(self, path: Path) -> Document:
+        stat = path.stat()
+        if (doc := self._documents.get(path)) is not None:
+            if (doc.mtime_ns, doc.size) == (stat.st_mtime_ns, stat.st_size):
+                self._documents.move_to_end(path)
+                return doc
+            self._evict(path)
+
+        doc = await anyio.to_thread.run_sync(Document.load, path)
+        if doc.size > self.max_bytes:
+            return doc
+
+        self._documents[path] = doc
+        self._bytes += doc.size
+        while self._bytes > self.max_bytes:
+            self._evict(next(iter(self._documents)))
+        return doc
+
+
+def caching_client(client_cls: type[Client], store: DocumentStore) -> type[Client]:
+    """Subclass `client_cls` to read files from `store`.
+
+    Documents open on the server are still read from the client's own state,
+    which may be ahead of the disk.
+    """
+
+    class CachingClient(client_cls):
+        @override
+        async def read_file(
+            self, file_path: AnyPath, *, encoding: str = "utf-8"
+        ) -> str:
+            uri = self.as_uri(file_path)
+            if (
+                encoding != "utf-8"
+                or self.get_document_state().get_content(uri) is not None
+            ):
+                return await super().read_file(file_path, encoding=encoding)
+            doc = await store.get(self.from_uri(uri, relative=False))
+            return doc.text
+
+    CachingClient.__name__ = CachingClient.__qualname__ = client_cls.__name__
+    return CachingClient
+
+
+@define
+class CachedReferenceCapability(ReferenceCapability):
+    """References whose code snippets are cut from shared documents.
+
+    `_process_reference` is a copy of lsap's own that reads through the
+    document store; the tests pin the upstream version it was copied from.
+    """
+
+    documents: DocumentStore = field(kw_only=True)
+
+    @override
+    async def _process_reference(
+        self,
+        loc: Location,
+        context_lines: int,
+        items: list[ReferenceItem],
+    ) -> None:
+        async with self.process_sem:
+            # Relative to the workspace, as lsap reports it.
+            file_path = self.client.from_uri(loc.uri)
+            # Unless edited in memory, open documents match the disk.
+            if self.client.get_document_state().get_version(loc.uri):
+                reader = DocumentReader(await self.client.read_file(file_path))
+            else:
+                reader = (
+                    await self.documents.get(
+                        self.client.from_uri(loc.uri, relative=False)
+                    )
+                ).reader
+
+            range = loc.range
+            context_range = LSPRange(
+                start=LSPPosition(
+                    line=max(0, range.start.line - context_lines), character=0
+                ),
+                end=LSPPosition(line=range.end.line + context_lines + 1, character=0),
+            )
+            if not (snippet := reader.read(context_range, trim_empty=True)):
+                return
+
+            symbol: SymbolDetailInfo | None = None
+            if (
+                symbols := await ensure_capability(
+                    self.client, WithRequestDocumentSymbol
+                ).request_document_symbol_list(file_path)
+            ) and (match := symbol_at(symbols, range.start)):
+                path, sym = match
+                symbol = SymbolDetailInfo(
+                    file_path=file_path,
+                    name=sym.name,
+                    path=path,
+                    kind=SymbolKind.from_lsp(sym.kind),
+                    detail=sym.detail,
+                    range=Range.from_lsp(sym.range),
+                )
+
+                if hover := await ensure_capability(
+                    self.client, WithRequestHover
+                ).request_hover(file_path, range.start):
+                    symbol.hover = clean_hover_content(hover.value)
+
+            items.append(
+                ReferenceItem(
+                    location=LSAPLocation(
+                        file_path=file_path,
+                        range=Range(
+                            start=Position.from_lsp(range.start),
+                            end=Position.from_lsp(range.end),
+                        ),
+                    ),
+                    code=snippet.content,
+                    symbol=symbol,
+                )
+            )
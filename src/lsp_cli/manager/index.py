@@ -0,0 +1,117 @@
+"""The symbols of many files at once, in a compact form for `lsp index export`.
+
+The CLI decides which files changed since its last export and sends them here
+in batches. Each file's symbols are requested with bounded concurrency and
+flattened into plain tuples, together with a hash of the contents they were
+requested for, so the next export can tell whether they are still current.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import anyio
+from attrs import define
+from lsap.schema.models import SymbolKind
+from lsap.utils.capability import ensure_capability
+from lsp_client import Client
+from lsp_client.capability.request import WithRequestDocumentSymbol
+from lsp_client.exception import LSPError
+from lsp_client.utils.types import lsp_type
+
+from lsp_cli.settings import settings
+from lsp_cli.utils.files import content_hash
+
+from .documents import Document, DocumentStore
+from .models import IndexedFile, IndexedSymbol, IndexRequest, IndexResponse
+from .outlines import DocumentSymbols
+
+
+def flatten_symbols(symbols: DocumentSymbols, doc: Document) -> list[IndexedSymbol]:
+    """`symbols` in document order, each pointing at its parent by index."""
+    flat: list[IndexedSymbol] = []
+
+    def add(
+        name: str,
+        kind: lsp_type.SymbolKind,
+        start: lsp_type.Position,
+        end_line: int,
+        parent: int,
+    ) -> int:
+        # Servers count columns in UTF-16 code units, we count characters.
+        character = doc.to_character(start.line, start.character)
+        flat.append(
+            (
+                name,
+                SymbolKind.from_lsp(kind).value,
+                start.line + 1,
+                character + 1,
+                end_line + 1,
+                parent,
+            )
+        )
+        return len(flat) - 1
+
+    def visit(nodes: list[lsp_type.DocumentSymbol], parent: int) -> None:
+        for node in nodes:
+            index = add(
+                node.name,
+                node.kind,
+                node.selection_range.start,
+                node.range.end.line,
+                parent,
+            )
+            visit(node.children or [], index)
+
+    for symbol in symbols:
+        match symbol:
+            case lsp_type.DocumentSymbol():
+                visit([symbol], -1)
+            case lsp_type.SymbolInformation(location=location):
+                # Flat symbols name their container, but cannot point at it.
+                add(
+                    symbol.name,
+                    symbol.kind,
+                    location.range.start,
+                    location.range.end.line,
+                    -1,
+                )
+    return flat
+
+
+@define
+class IndexCapability:
+    client: Client
+    documents: DocumentStore
+
+    async def _index(self, path: Path) -> IndexedFile:
+        doc = await self.documents.get(path)
+        client = ensure_capability(self.client, WithRequestDocumentSymbol)
+        symbols = await client.request_document_symbol(path) or []
+        return IndexedFile(
+            file_path=path,
+            content_hash=content_hash(doc.data),
+            symbols=flatten_symbols(symbols, doc),
+        )
+
+    async def __call__(self, req: IndexRequest) -> IndexResponse:
+        indexed: dict[int, IndexedFile] = {}
+        errors: dict[int, str] = {}
+        limiter = anyio.CapacityLimiter(settings.index_concurrency)
+
+        async def index(position: int, path: Path) -> None:
+            async with limiter:
+                # One file failing leaves it out rather than failing the batch.
+                try:
+                    indexed[position] = await self._index(path)
+                except (LSPError, OSError, UnicodeDecodeError) as e:
+                    errors[position] = f"{path}: {e}"
+
+        async with anyio.create_task_group() as tg:
+            for position, path in enumerate(req.files):
+                tg.start_soon(index, position, path)
+
+        return IndexResponse(
+            files=[indexed[i] for i in sorted(indexed)],
+            errors=[errors[i] for i in sorted(errors)],
+        )
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import NotRequired, TypedDict
+
+# Kept apart from `models`: importing lsp_client is too slow for the CLI side.
+from lsp_client.jsonrpc.id import ID
+from lsp_client.jsonrpc.types import RawParams, RawResponsePackage
+from pydantic import BaseModel
+
+
+class NotificationPayload(TypedDict):
+    method: str
+    # JSON-RPC allows params to be left out, but not to be null.
+    params: NotRequired[RawParams]
+    jsonrpc: str
+
+
+class RequestPayload(NotificationPayload):
+    id: ID | None
+
+
+class LspRequest(BaseModel):
+    payload: RequestPayload
+
+
+class LspResponse(BaseModel):
+    payload: RawResponsePackage
+
+
+class LspNotification(BaseModel):
+    payload: NotificationPayload
+
+
+class SubscribeRequest(BaseModel):
+    # Notification methods to receive, or all of them if unset.
+    methods: list[str] | None = None
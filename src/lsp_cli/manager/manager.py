@@ -1,16 +1,15 @@
 from __future__ import annotations
 
 import signal
-import subprocess
-import sys
 from collections.abc import AsyncGenerator, Iterable
 from contextlib import asynccontextmanager
+from functools import partial
 from pathlib import Path
 from typing import Final
 
 import anyio
+import anyio.to_thread
 import asyncer
-import httpx
 import loguru
 from attrs import define, field
 from litestar import Litestar, delete, get, post
@@ -18,19 +17,23 @@ from litestar.datastructures import State
 from litestar.exceptions import NotFoundException
 from loguru import logger
 
-from lsp_cli.client import ClientTarget, find_target, match_target
-from lsp_cli.settings import (
-    MANAGER_LOG_PATH,
-    MANAGER_UDS_PATH,
+from lsp_cli.client import (
+    ClientTarget,
+    find_target,
+    find_targets,
+    match_target,
+    match_targets,
 )
-from lsp_cli.utils.http import AsyncHttpClient
+from lsp_cli.paths import MANAGER_LOG_PATH
+from lsp_cli.settings import settings
 from lsp_cli.utils.logging import logging_filter
-from lsp_cli.utils.socket import is_socket_alive, wait_socket
 
 from .client import ManagedClient, get_client_id
 from .models import (
     CreateClientRequest,
     CreateClientResponse,
+    CreateClientsRequest,
+    CreateClientsResponse,
     DeleteClientRequest,
     ManagedClientInfo,
 )
@@ -39,6 +42,7 @@ from .models import (
 @define
 class Manager:
     _clients: dict[str, ManagedClient] = field(factory=dict, init=False)
+    _pending: dict[str, anyio.Event] = field(factory=dict, init=False)
     _tg: asyncer.TaskGroup = field(init=False)
     _logger: loguru.Logger = field(init=False)
     _sink_id: int = field(init=False)
@@ -61,7 +65,29 @@ class Manager:
     def _get_target(
         self, path: Path, project_path: Path | None = None
     ) -> ClientTarget | None:
-        return match_target(project_path) if project_path else find_target(path)
+        if project_path:
+            return match_target(project_path, path)
+        return find_target(path)
+
+    async def _get_targets(
+        self,
+        path: Path,
+        project_path: Path | None = None,
+        *,
+        subprojects: bool = False,
+    ) -> list[ClientTarget]:
+        if project_path:
+            return match_targets(project_path, path)
+        if path.is_dir():
+            return await anyio.to_thread.run_sync(
+                partial(
+                    find_targets,
+                    path,
+                    settings.max_discovered_clients,
+                    subprojects=subprojects,
+                )
+            )
+        return [target] if (target := find_target(path)) else []
 
     def _get_client(
         self, path: Path, project_path: Path | None = None
@@ -72,38 +98,125 @@ class Manager:
                 return client
         return None
 
-    async def create_client(self, path: Path, project_path: Path | None = None) -> Path:
-        if existing_client := self._get_client(path, project_path):
+    async def create_client(
+        self, path: Path, project_path: Path | None = None
+    ) -> ManagedClient:
+        """Return a running client for the path, starting one if needed.
+
+        Creation is single-flight per client ID: concurrent callers await the
+        same startup. The client is returned once its language server has started.
+        """
+        target = self._get_target(path, project_path)
+        if not target:
+            raise NotFoundException(f"No LSP client found for path: {path}")
+        return await self._create_client(target)
+
+    async def create_clients(
+        self,
+        path: Path,
+        project_path: Path | None = None,
+        *,
+        subprojects: bool = False,
+    ) -> tuple[list[ManagedClient], list[str]]:
+        """Return running clients for every language around the path.
+
+        These are the clients of every language of the project, if given, or
+        else of the project containing the path, as found by `find_targets`,
+        and those already running for the same project root. Given
+        `subprojects`, projects below the path and running clients for them
+        are included too. Clients are started concurrently; those that fail to
+        start are described in the returned errors instead.
+        """
+        targets = {
+            get_client_id(target): target
+            for target in await self._get_targets(
+                path, project_path, subprojects=subprojects
+            )
+        }
+        if not project_path:
+            roots = {path, *(target.project_path for target in targets.values())}
+            for client_id, client in self._clients.items():
+                running_path = client.target.project_path
+                if client.is_running and (
+                    running_path in roots
+                    or (subprojects and running_path.is_relative_to(path))
+                ):
+                    targets.setdefault(client_id, client.target)
+
+        clients: dict[str, ManagedClient] = {}
+        errors: list[str] = []
+
+        async def create(client_id: str, target: ClientTarget) -> None:
+            try:
+                clients[client_id] = await self._create_client(target)
+            except Exception as e:
+                self._logger.exception("Failed to start client: {}", client_id)
+                kind = target.client_cls.get_language_config().kind.value
+                errors.append(f"{kind} {target.project_path}: {e}")
+
+        async with anyio.create_task_group() as tg:
+            for client_id, target in targets.items():
+                tg.start_soon(create, client_id, target)
+        return [clients[i] for i in targets if i in clients], errors
+
+    async def _create_client(self, target: ClientTarget) -> ManagedClient:
+        client_id = get_client_id(target)
+        if pending := self._pending.get(client_id):
+            await pending.wait()
+        else:
+            self._pending[client_id] = pending = anyio.Event()
+            try:
+                await self._ensure_client(target)
+            finally:
+                del self._pending[client_id]
+                pending.set()
+
+        client = self._clients.get(client_id)
+        if client is None or not client.is_running:
+            raise RuntimeError(f"Failed to start client: {client_id}")
+        client._reset_timeout()
+        return client
+
+    async def _ensure_client(self, target: ClientTarget) -> None:
+        client_id = get_client_id(target)
+        if existing_client := self._clients.get(client_id):
             # Only reuse if client is not shutting down
-            if not existing_client._should_exit:
+            if existing_client.is_running:
                 self._logger.info(
-                    "Reusing existing client: {client_id}", client_id=existing_client.id
+                    "Reusing existing client: {client_id}", client_id=client_id
                 )
-                existing_client._reset_timeout()
-                return existing_client.uds_path
+                return
             self._logger.info(
                 "Existing client is shutting down, will create new one: {client_id}",
-                client_id=existing_client.id,
+                client_id=client_id,
             )
+            # Its socket path is only unlinked once it has fully stopped.
+            await existing_client.wait_stopped()
 
-        target = self._get_target(path, project_path)
-        if not target:
-            raise NotFoundException(f"No LSP client found for path: {path}")
-
-        client_id = get_client_id(target)
         self._logger.info("Creating new client: {client_id}", client_id=client_id)
         m_client = ManagedClient(target)
         self._clients[client_id] = m_client
         self._tg.soonify(self._run_client)(m_client)
-        return m_client.uds_path
+        await m_client.wait_ready()
+        if error := m_client.startup_error:
+            raise RuntimeError(
+                f"Failed to start client {client_id}: {error}"
+            ) from error
 
     async def _run_client(self, client: ManagedClient) -> None:
         try:
             self._logger.info("Running client: {client_id}", client_id=client.id)
             await client.run()
+        except anyio.get_cancelled_exc_class():
+            raise
+        except BaseException:
+            # Anything escaping a client would cancel the task group, and with it
+            # every other client and the manager itself.
+            self._logger.exception("Client failed: {client_id}", client_id=client.id)
         finally:
             self._logger.info("Removing client: {client_id}", client_id=client.id)
-            self._clients.pop(client.id, None)
+            if self._clients.get(client.id) is client:
+                del self._clients[client.id]
 
     async def delete_client(
         self,
@@ -114,8 +227,13 @@ class Manager:
         clients: Iterable[ManagedClient] = []
         if all:
             clients = self._clients.values()
-        elif path and (client := self._get_client(path, project_path)):
-            clients = [client]
+        elif path:
+            # Every language's client, for directories with several.
+            clients = [
+                client
+                for target in await self._get_targets(path, project_path)
+                if (client := self._clients.get(get_client_id(target)))
+            ]
 
         for client in clients:
             self._logger.info("Stopping client: {client_id}", client_id=client.id)
@@ -139,16 +257,27 @@ class Manager:
         try:
             async with asyncer.create_task_group() as tg:
                 self._tg = tg
-                yield self
+                try:
+                    yield self
+                finally:
+                    # Otherwise the task group would wait on running clients forever
+                    for client in self._clients.values():
+                        client.stop()
         finally:
             self._logger.info("Shutting down manager")
 
 
 @asynccontextmanager
 async def lifespan(app: Litestar) -> AsyncGenerator[None]:
-    async with Manager().run() as manager:
-        app.state.manager = manager
-        yield
+    try:
+        async with Manager().run() as manager:
+            app.state.manager = manager
+            yield
+    except BaseException:
+        # uvicorn would keep serving without the manager, holding its lock and
+        # failing every request. Exit instead, so that the next CLI starts a new one.
+        signal.raise_signal(signal.SIGINT)
+        raise
 
 
 def get_manager(state: State) -> Manager:
@@ -162,11 +291,29 @@ async def create_client_handler(
     data: CreateClientRequest, state: State
 ) -> CreateClientResponse:
     manager = get_manager(state)
-    uds_path = await manager.create_client(data.path, project_path=data.project_path)
+    client = await manager.create_client(data.path, project_path=data.project_path)
+    return CreateClientResponse(
+        uds_path=client.uds_path, info=client.info, rpc_path=client.rpc_path
+    )
 
-    if info := manager.inspect_client(data.path, project_path=data.project_path):
-        return CreateClientResponse(uds_path=uds_path, info=info)
-    raise RuntimeError("Failed to create client")
+
+@post("/create/all", status_code=201)
+async def create_clients_handler(
+    data: CreateClientsRequest, state: State
+) -> CreateClientsResponse:
+    manager = get_manager(state)
+    clients, errors = await manager.create_clients(
+        data.path, project_path=data.project_path, subprojects=data.subprojects
+    )
+    return CreateClientsResponse(
+        clients=[
+            CreateClientResponse(
+                uds_path=client.uds_path, info=client.info, rpc_path=client.rpc_path
+            )
+            for client in clients
+        ],
+        errors=errors,
+    )
 
 
 @delete("/delete", status_code=200)
@@ -197,38 +344,10 @@ async def shutdown_handler(state: State) -> None:
 app: Final = Litestar(
     route_handlers=[
         create_client_handler,
+        create_clients_handler,
         delete_client_handler,
         list_clients_handler,
         shutdown_handler,
     ],
     lifespan=[lifespan],
 )
-
-
-async def start_manager() -> None:
-    await anyio.open_process(
-        (sys.executable, "-m", "lsp_cli.manager"),
-        stdin=subprocess.DEVNULL,
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-        start_new_session=True,
-    )
-
-    await wait_socket(MANAGER_UDS_PATH, timeout=10.0)
-
-
-@asynccontextmanager
-async def connect_manager(start: bool = True) -> AsyncGenerator[AsyncHttpClient]:
-    if start and not await is_socket_alive(MANAGER_UDS_PATH):
-        await start_manager()
-
-    transport = httpx.AsyncHTTPTransport(uds=str(MANAGER_UDS_PATH), retries=5)
-
-    async with AsyncHttpClient(
-        httpx.AsyncClient(
-            transport=transport,
-            base_url="http://localhost",
-            timeout=30.0,
-        )
-    ) as client:
-        yield client
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Any, Literal
 
-from lsp_client.jsonrpc.types import RawNotification, RawRequest, RawResponsePackage
+from lsap.schema.outline import OutlineRequest
 from pydantic import BaseModel, RootModel
 
 
@@ -11,18 +12,37 @@ class ManagedClientInfo(BaseModel):
     language: str
     remaining_time: float
     is_warming_up: bool = False
+    # Documents held open on the language server, and their size on disk.
+    open_documents: int = 0
+    open_document_bytes: int = 0
+    # Projects sharing the client from the monorepo at `project_path`.
+    projects: int = 0
+    # File suffixes of the client's language.
+    suffixes: list[str] = []
 
     @classmethod
     def format(cls, infos: list[ManagedClientInfo]) -> str:
         lines = []
         for info in infos:
             status = " (warming up)" if info.is_warming_up else ""
+            if info.projects:
+                status += f" [monorepo, {_count(info.projects, 'project')}]"
+            if info.open_documents:
+                status += (
+                    f" [{_count(info.open_documents, 'open document')},"
+                    f" {info.open_document_bytes / 1024:.1f} KiB]"
+                )
             lines.append(
                 f"{info.language:<10} {info.project_path} ({info.remaining_time:.1f}s){status}"
             )
         return "\n".join(lines)
 
 
+class OptionalHoverOutlineRequest(OutlineRequest):
+    # Hovers take a request per symbol, so outlines of many files leave them out.
+    hover: bool = True
+
+
 class ManagedClientInfoList(RootModel[list[ManagedClientInfo]]):
     root: list[ManagedClientInfo]
 
@@ -35,6 +55,22 @@ class CreateClientRequest(BaseModel):
 class CreateClientResponse(BaseModel):
     uds_path: Path
     info: ManagedClientInfo
+    # Socket of the framed RPC transport, unset by managers that predate it.
+    rpc_path: Path | None = None
+
+
+class CreateClientsRequest(BaseModel):
+    # A directory to start a client for every language around.
+    path: Path
+    project_path: Path | None = None
+    # Also start clients for the projects below the directory.
+    subprojects: bool = False
+
+
+class CreateClientsResponse(BaseModel):
+    clients: list[CreateClientResponse]
+    # Clients that failed to start, with why.
+    errors: list[str] = []
 
 
 class DeleteClientRequest(BaseModel):
@@ -47,17 +83,155 @@ class DeleteClientResponse(BaseModel):
     info: ManagedClientInfo
 
 
-class LspRequest(BaseModel):
-    payload: RawRequest
+class GetIDResponse(BaseModel):
+    id: str
 
 
-class LspResponse(BaseModel):
-    payload: RawResponsePackage
+def _count(n: int, noun: str) -> str:
+    return f"{n} {noun}" if n == 1 else f"{n} {noun}s"
 
 
-class LspNotification(BaseModel):
-    payload: RawNotification
+type DiagnosticSeverity = Literal["error", "warning", "information", "hint"]
 
 
-class GetIDResponse(BaseModel):
+class DiagnosticsRequest(BaseModel):
+    # A file, or a directory to check every source file of the language in.
+    path: Path
+    # Files the store has no diagnostics for yet that are checked, or all of them.
+    max_files: int | None = None
+
+
+class Diagnostic(BaseModel):
+    file_path: Path
+    # 1-based, like compiler output.
+    line: int
+    character: int
+    severity: DiagnosticSeverity
+    message: str
+    source: str | None = None
+    code: str | None = None
+
+
+class DiagnosticsResponse(BaseModel):
+    items: list[Diagnostic]
+    checked_files: int
+    # Files left out by `max_files`, or that the server did not answer for in time.
+    unchecked_files: int = 0
+
+    def format(self) -> str:
+        lines = []
+        for d in self.items:
+            origin = " ".join(filter(None, (d.source, d.code)))
+            suffix = f" [{origin}]" if origin else ""
+            message = d.message.replace("\n", "\n    ")
+            lines.append(
+                f"{d.file_path}:{d.line}:{d.character}: {d.severity}: {message}{suffix}"
+            )
+
+        errors = sum(d.severity == "error" for d in self.items)
+        warnings = sum(d.severity == "warning" for d in self.items)
+        summary = (
+            f"{_count(errors, 'error')}, {_count(warnings, 'warning')}"
+            f" in {_count(self.checked_files, 'file')}"
+        )
+        if self.unchecked_files:
+            summary += f" ({_count(self.unchecked_files, 'file')} not checked)"
+        lines.append(summary)
+        return "\n".join(lines)
+
+
+# Name, kind, 1-based line and character of the name, 1-based last line, and
+# the index of the enclosing symbol in the file's list, or -1 at the top level.
+type IndexedSymbol = tuple[str, str, int, int, int, int]
+
+
+class IndexRequest(BaseModel):
+    files: list[Path]
+
+
+class IndexedFile(BaseModel):
+    file_path: Path
+    # Hash of the contents the symbols were requested for.
+    content_hash: str
+    symbols: list[IndexedSymbol]
+
+
+class IndexResponse(BaseModel):
+    files: list[IndexedFile]
+    # Files whose symbols could not be requested, with why.
+    errors: list[str] = []
+
+
+type CallDirection = Literal["incoming", "outgoing"]
+
+
+class CallNode(BaseModel):
+    # Stable across requests, so the CLI can tell nodes it has seen.
     id: str
+    name: str
+    kind: str
+    file_path: Path
+    # 1-based line of the name.
+    line: int
+    detail: str | None = None
+    # The server's item, sent back as is to expand the node.
+    item: dict[str, Any]
+
+
+class CallEdge(BaseModel):
+    caller: str
+    callee: str
+    # 1-based lines of the calls in the caller's file.
+    lines: list[int]
+
+
+class CallsExpandRequest(BaseModel):
+    nodes: list[CallNode]
+    direction: CallDirection
+
+
+class CallsResponse(BaseModel):
+    nodes: list[CallNode]
+    edges: list[CallEdge] = []
+    # Nodes whose calls could not be requested, with why.
+    errors: list[str] = []
+
+
+class UnusedRequest(BaseModel):
+    # A file, or a directory to scan every source file of the language in.
+    path: Path
+    # Files of a directory scanned by this request, in walk order, so that a
+    # large one is scanned a page at a time.
+    start_file: int = 0
+    max_files: int | None = None
+
+
+class UnusedSymbol(BaseModel):
+    file_path: Path
+    # Dotted path of the symbol in its file, e.g. `MyClass.method`.
+    name: str
+    kind: str
+    # 1-based line of the name.
+    line: int
+
+
+class UnusedResponse(BaseModel):
+    items: list[UnusedSymbol]
+    checked_symbols: int
+    scanned_files: int
+    total_files: int
+    # Files whose symbols could not be checked, with why.
+    errors: list[str] = []
+
+    def format(self) -> str:
+        return "\n".join(
+            f"{s.file_path}:{s.line}: {s.kind} `{s.name}` has no references"
+            for s in self.items
+        )
+
+    @staticmethod
+    def summary(found: int, checked: int, scanned: int, total: int) -> str:
+        files = _count(scanned, "file")
+        if scanned < total:
+            files = f"{scanned} of {_count(total, 'file')}"
+        return f"{found} of {_count(checked, 'symbol')} unused in {files}"
@@ -0,0 +1,67 @@
+"""One language server shared by the projects of a monorepo.
+
+The server is started at the monorepo root with a workspace folder for each
+project of its language, so it indexes their shared dependencies once. Paths
+stay relative to the monorepo root, as they would be to a single project root.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import override
+
+from lsp_client import Client
+from lsp_client.protocol.lang import LanguageConfig
+from lsp_client.utils.types import AnyPath
+from lsp_client.utils.uri import from_local_uri
+from lsp_client.utils.workspace import (
+    WORKSPACE_ROOT_DIR,
+    Workspace,
+    WorkspaceFolder,
+)
+
+from lsp_cli.client import is_project_dir
+from lsp_cli.utils.files import iter_dirs
+
+
+def find_projects(root: Path, lang_config: LanguageConfig) -> list[Path]:
+    """Project roots of the language below `root`, outermost first."""
+    return [
+        directory
+        for directory, names in iter_dirs(root)
+        if is_project_dir(names, lang_config)
+    ]
+
+
+def monorepo_workspace(root: Path, projects: list[Path]) -> Workspace:
+    """The workspace of `root`, with a folder named by its path for each project."""
+    workspace = Workspace(
+        {WORKSPACE_ROOT_DIR: WorkspaceFolder(uri=root.as_uri(), name=root.name)}
+    )
+    for project in projects:
+        name = project.relative_to(root).as_posix()
+        workspace[name] = WorkspaceFolder(uri=project.as_uri(), name=name)
+    return workspace
+
+
+def monorepo_client(client_cls: type[Client], root: Path) -> type[Client]:
+    """Subclass `client_cls` to resolve relative paths against `root`.
+
+    Clients with several workspace folders otherwise expect relative paths to
+    start with a folder name.
+    """
+
+    class MonorepoClient(client_cls):
+        @override
+        def as_uri(self, file_path: AnyPath) -> str:
+            return super().as_uri(root / file_path)
+
+        @override
+        def from_uri(self, uri: str, *, relative: bool = True) -> Path:
+            path = from_local_uri(uri)
+            if relative and path.is_relative_to(root):
+                return path.relative_to(root)
+            return path
+
+    MonorepoClient.__name__ = MonorepoClient.__qualname__ = client_cls.__name__
+    return MonorepoClient
@@ -0,0 +1,100 @@
+"""Fan-out of language server notifications to subscribers."""
+
+from __future__ import annotations
+
+from collections.abc import Generator, Iterable
+from contextlib import contextmanager
+
+import anyio
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+from attrs import define, field
+from loguru import logger
+from lsp_client import Client
+from lsp_client.jsonrpc.types import RawNotification
+from lsp_client.server.types import ServerRequest
+
+# Notifications queued per subscriber before new ones are dropped for it.
+SUBSCRIBER_BUFFER = 1024
+
+
+@define
+class NotificationHub:
+    _subscribers: dict[
+        MemoryObjectSendStream[RawNotification], frozenset[str] | None
+    ] = field(factory=dict, init=False)
+    _closed: bool = field(default=False, init=False)
+
+    def publish(self, notification: RawNotification) -> None:
+        method = notification["method"]
+        for send, methods in list(self._subscribers.items()):
+            if methods is not None and method not in methods:
+                continue
+            try:
+                send.send_nowait(notification)
+            except anyio.WouldBlock:
+                # A slow subscriber must not hold up the language server.
+                logger.warning("Subscriber is lagging, dropped {}", method)
+            except anyio.BrokenResourceError:
+                del self._subscribers[send]
+
+    @contextmanager
+    def subscribe(
+        self, methods: Iterable[str] | None = None
+    ) -> Generator[MemoryObjectReceiveStream[RawNotification]]:
+        """Receive the notifications with the given methods, or all of them.
+
+        The stream ends when the hub is closed.
+        """
+        send, receive = anyio.create_memory_object_stream[RawNotification](
+            SUBSCRIBER_BUFFER
+        )
+        if self._closed:
+            send.close()
+        else:
+            self._subscribers[send] = frozenset(methods) if methods else None
+
+        try:
+            with receive:
+                yield receive
+        finally:
+            self._subscribers.pop(send, None)
+            send.close()
+
+    def close(self) -> None:
+        """End all subscriptions, so open streams do not hold up shutdown."""
+        self._closed = True
+        for send in self._subscribers:
+            send.close()
+        self._subscribers.clear()
+
+
+def publishing_client(client_cls: type[Client], hub: NotificationHub) -> type[Client]:
+    """Subclass `client_cls` to also publish every server notification to `hub`.
+
+    Notifications are taken off the server's channel before the client
+    dispatches them to its own hooks, so methods the client has no hook for
+    (e.g. `$/progress`) are published too.
+    """
+
+    async def pump(
+        receiver: MemoryObjectReceiveStream[ServerRequest],
+        send: MemoryObjectSendStream[ServerRequest],
+    ) -> None:
+        async with send:
+            async for request in receiver:
+                # Server requests come paired with their response channel.
+                if not isinstance(request, tuple):
+                    hub.publish(request)
+                await send.send(request)
+
+    class PublishingClient(client_cls):
+        async def _dispatch_server_requests(
+            self, receiver: MemoryObjectReceiveStream[ServerRequest]
+        ) -> None:
+            send, tee = anyio.create_memory_object_stream[ServerRequest]()
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(pump, receiver, send)
+                await super()._dispatch_server_requests(tee)
+
+    PublishingClient.__name__ = PublishingClient.__qualname__ = client_cls.__name__
+    return PublishingClient
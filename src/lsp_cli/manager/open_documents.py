@@ -0,0 +1,133 @@
+"""Documents kept open on the language server between requests.
+
+lsp_client opens the files a request needs and closes them once it is done, so
+each request sends their full text again and the server analyses them afresh.
+An `OpenDocumentPool` keeps recently used documents open instead, closing the
+least recently used idle ones past a cap, and reopening idle ones changed on
+disk so the server never works from stale text.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import override
+
+import asyncer
+from attrs import define, field
+from lsp_client import Client
+from lsp_client.utils.types import AnyPath
+from lsp_client.utils.uri import from_local_uri
+
+
+@define
+class OpenDocument:
+    mtime_ns: int
+    size: int
+    users: int = 0
+
+
+@define
+class OpenDocumentPool:
+    max_documents: int
+    _documents: OrderedDict[str, OpenDocument] = field(factory=OrderedDict, init=False)
+
+    @property
+    def count(self) -> int:
+        return len(self._documents)
+
+    @property
+    def size(self) -> int:
+        """Bytes of the open documents, as last read from disk."""
+        return sum(doc.size for doc in self._documents.values())
+
+    def stale(self, uris: list[str]) -> list[str]:
+        """Forget the idle documents among `uris` that changed on disk."""
+        stale = []
+        for uri in uris:
+            if (doc := self._documents.get(uri)) is None or doc.users:
+                continue
+            try:
+                stat = from_local_uri(uri).stat()
+            except OSError:
+                pass
+            else:
+                if (doc.mtime_ns, doc.size) == (stat.st_mtime_ns, stat.st_size):
+                    continue
+            del self._documents[uri]
+            stale.append(uri)
+        return stale
+
+    def acquire(self, uris: list[str]) -> list[str]:
+        """Mark `uris` as in use, returning those the pool did not hold yet."""
+        added = []
+        for uri in uris:
+            if (doc := self._documents.get(uri)) is None:
+                try:
+                    stat = from_local_uri(uri).stat()
+                except OSError:
+                    continue
+                doc = self._documents[uri] = OpenDocument(
+                    stat.st_mtime_ns, stat.st_size
+                )
+                added.append(uri)
+            doc.users += 1
+            self._documents.move_to_end(uri)
+        return added
+
+    def release(self, uris: list[str]) -> list[str]:
+        """Mark `uris` as no longer in use, returning the documents to close."""
+        for uri in uris:
+            if (doc := self._documents.get(uri)) is not None:
+                doc.users -= 1
+                self._documents.move_to_end(uri)
+
+        # Documents in use stay open even past the cap.
+        excess = len(self._documents) - self.max_documents
+        evicted = []
+        for uri, doc in self._documents.items():
+            if len(evicted) >= excess:
+                break
+            if not doc.users:
+                evicted.append(uri)
+        for uri in evicted:
+            del self._documents[uri]
+        return evicted
+
+
+def pooling_client(client_cls: type[Client], pool: OpenDocumentPool) -> type[Client]:
+    """Subclass `client_cls` to keep the documents it opens in `pool`.
+
+    The pool holds one reference on each of its documents in the client's own
+    reference counts, so they stay open when requests are done with them.
+    """
+
+    class PoolingClient(client_cls):
+        async def _close_documents(self, uris: list[str]) -> None:
+            closed = self.get_document_state().close(uris)
+            async with asyncer.create_task_group() as tg:
+                for uri in closed:
+                    tg.soonify(self.notify_text_document_closed)(from_local_uri(uri))
+
+        @override
+        @asynccontextmanager
+        async def open_files(self, *file_paths: AnyPath) -> AsyncGenerator[None]:
+            if not self.sync_file or not file_paths:
+                async with super().open_files(*file_paths):
+                    yield
+                return
+
+            uris = list(dict.fromkeys(self.as_uri(path) for path in file_paths))
+            await self._close_documents(pool.stale(uris))
+            async with super().open_files(*file_paths):
+                # Already open, so this only takes the pool's reference.
+                await self.get_document_state().open(pool.acquire(uris))
+                try:
+                    yield
+                finally:
+                    # Documents of this request are closed by `super()` if evicted.
+                    await self._close_documents(pool.release(uris))
+
+    PoolingClient.__name__ = PoolingClient.__qualname__ = client_cls.__name__
+    return PoolingClient
@@ -0,0 +1,115 @@
+"""Document symbols cached by the content they were computed from.
+
+Symbol scopes are resolved from the document's symbols before the request they
+scope runs, and references look up the symbol around each hit, so the same
+files' symbols are requested over and over. An `OutlineCache` keeps the last
+result for each document with a hash of its content, and answers from it while
+the content is unchanged.
+
+Outlines of many files leave out each symbol's hover, which would otherwise
+take a request per symbol.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Sequence
+from contextvars import ContextVar
+from typing import override
+
+import xxhash
+from attrs import define, field
+from lsap.capability.outline import OutlineCapability
+from lsap.schema.models import SymbolDetailInfo
+from lsap.schema.outline import OutlineRequest, OutlineResponse
+from lsp_client import Client
+from lsp_client.capability.request import WithRequestDocumentSymbol
+from lsp_client.utils.types import AnyPath, lsp_type
+
+from .models import OptionalHoverOutlineRequest
+
+type DocumentSymbols = (
+    Sequence[lsp_type.SymbolInformation] | Sequence[lsp_type.DocumentSymbol]
+)
+
+# Whether the outline being resolved fills in hovers. The hover tasks inherit it.
+_hover: ContextVar[bool] = ContextVar("hover", default=True)
+
+
+@define
+class OutlineEntry:
+    content_hash: int
+    symbols: DocumentSymbols
+
+
+@define
+class OutlineCache:
+    max_entries: int
+    _entries: OrderedDict[str, OutlineEntry] = field(factory=OrderedDict, init=False)
+
+    def get(self, uri: str, content: str) -> DocumentSymbols | None:
+        entry = self._entries.get(uri)
+        if entry is None or entry.content_hash != xxhash.xxh3_64_intdigest(content):
+            return None
+        self._entries.move_to_end(uri)
+        return entry.symbols
+
+    def put(self, uri: str, content: str, symbols: DocumentSymbols) -> None:
+        self._entries[uri] = OutlineEntry(xxhash.xxh3_64_intdigest(content), symbols)
+        self._entries.move_to_end(uri)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def outline_caching_client(
+    client_cls: type[Client], cache: OutlineCache
+) -> type[Client]:
+    """Subclass `client_cls` to answer document symbol requests from `cache`.
+
+    The content is read the way the server sees it: from memory for open
+    documents, from disk otherwise.
+    """
+    if not issubclass(client_cls, WithRequestDocumentSymbol):
+        return client_cls
+
+    class OutlineCachingClient(client_cls):
+        @override
+        async def request_document_symbol(
+            self, file_path: AnyPath
+        ) -> DocumentSymbols | None:
+            uri = self.as_uri(file_path)
+            # Opening first reopens documents kept open that changed on disk, so
+            # their content in memory is current.
+            async with self.open_files(file_path):
+                content = await self.read_file(file_path)
+                if (symbols := cache.get(uri, content)) is not None:
+                    return list(symbols)
+                symbols = await super().request_document_symbol(file_path)
+            if symbols is None:
+                return None
+            cache.put(uri, content, symbols)
+            return list(symbols)
+
+    OutlineCachingClient.__name__ = OutlineCachingClient.__qualname__ = (
+        client_cls.__name__
+    )
+    return OutlineCachingClient
+
+
+@define
+class OptionalHoverOutlineCapability(OutlineCapability):
+    """Outlines that leave out hovers when the request asks to."""
+
+    @override
+    async def __call__(self, req: OutlineRequest) -> OutlineResponse | None:
+        hover = not isinstance(req, OptionalHoverOutlineRequest) or req.hover
+        token = _hover.set(hover)
+        try:
+            return await super().__call__(req)
+        finally:
+            _hover.reset(token)
+
+    @override
+    async def _fill_hover(self, item: SymbolDetailInfo, pos: lsp_type.Position) -> None:
+        if _hover.get():
+            await super()._fill_hover(item, pos)
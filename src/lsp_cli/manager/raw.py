@@ -0,0 +1,88 @@
+import json
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import Any
+
+import anyio
+from litestar import Controller, get, post
+from litestar.datastructures.state import State
+from litestar.response import Stream
+from lsp_client import Client
+from lsp_client.jsonrpc.id import jsonrpc_uuid
+from lsp_client.jsonrpc.types import RawNotification, RawParams, RawRequest
+from lsp_client.utils.uri import from_local_uri
+
+from .jsonrpc import LspNotification, LspRequest, LspResponse, NotificationPayload
+from .notifications import NotificationHub
+
+
+@asynccontextmanager
+async def open_document(
+    client: Client, params: RawParams | None
+) -> AsyncGenerator[None]:
+    """Keep the document a request refers to open while it runs.
+
+    Most servers only answer `textDocument/*` requests for open documents.
+    """
+    match params:
+        case {"textDocument": {"uri": str(uri)}} if uri.startswith("file:"):
+            async with client.open_files(from_local_uri(uri)):
+                yield
+        case _:
+            yield
+
+
+def to_raw(payload: NotificationPayload) -> dict[str, Any]:
+    """The message to send for a payload, leaving out params it left out."""
+    raw: dict[str, Any] = {"method": payload["method"], "jsonrpc": "2.0"}
+    if "params" in payload:
+        raw["params"] = payload["params"]
+    return raw
+
+
+async def forward_request(client: Client, request: LspRequest) -> LspResponse:
+    payload = request.payload
+    # The caller's id may collide with the client's own in-flight requests.
+    raw = RawRequest(**to_raw(payload), id=jsonrpc_uuid())
+    async with open_document(client, payload.get("params")):
+        with anyio.fail_after(client.request_timeout):
+            resp = await client.get_server().request(raw)
+    return LspResponse(payload={**resp, "id": payload["id"]})
+
+
+async def forward_notification(client: Client, notification: LspNotification) -> None:
+    raw = RawNotification(**to_raw(notification.payload))
+    with anyio.fail_after(client.request_timeout):
+        await client.get_server().notify(raw)
+
+
+async def stream_notifications(
+    hub: NotificationHub, methods: list[str] | None
+) -> AsyncGenerator[bytes]:
+    with hub.subscribe(methods) as notifications:
+        async for notification in notifications:
+            yield json.dumps(notification, separators=(",", ":")).encode() + b"\n"
+
+
+class LspController(Controller):
+    """Raw JSON-RPC passthrough to the language server, bypassing capabilities."""
+
+    path = "/lsp"
+
+    @post("/request")
+    async def request(self, data: LspRequest, state: State) -> LspResponse:
+        return await forward_request(state.client, data)
+
+    @post("/notify")
+    async def notify(self, data: LspNotification, state: State) -> None:
+        await forward_notification(state.client, data)
+
+    @get("/notifications")
+    async def notifications(
+        self, state: State, method: list[str] | None = None
+    ) -> Stream:
+        """Stream server notifications as NDJSON, optionally only some methods."""
+        return Stream(
+            stream_notifications(state.notifications, method),
+            media_type="application/x-ndjson",
+        )
@@ -0,0 +1,251 @@
+"""Symbols that nothing outside of themselves refers to, for `lsp unused`.
+
+Every top-level symbol of a file and every member of its types is looked up
+with `textDocument/references`, a few at a time. References inside the symbol
+itself, such as recursive calls, do not count, and one reference from outside
+is enough to tell the symbol is used. Only that reference is kept: while the
+file is unchanged and the file it was found in is too, the symbol is known to
+be used without asking the server again. Symbols found unused are always asked
+about again, since any edit elsewhere may start using them.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+import anyio
+from attrs import define, field, frozen
+from lsap.schema.models import SymbolKind
+from lsap.utils.capability import ensure_capability
+from lsp_client import Client
+from lsp_client.capability.request import (
+    WithRequestDocumentSymbol,
+    WithRequestReferences,
+)
+from lsp_client.exception import LSPError
+from lsp_client.utils.types import lsp_type
+
+from lsp_cli.settings import settings
+from lsp_cli.utils.files import content_hash, iter_source_files
+
+from .documents import DocumentStore
+from .models import UnusedRequest, UnusedResponse, UnusedSymbol
+from .outlines import DocumentSymbols
+
+# Symbols whose members are looked up, and that are not reported themselves if
+# they only group other symbols.
+TYPE_KINDS = frozenset(
+    {
+        lsp_type.SymbolKind.Class,
+        lsp_type.SymbolKind.Interface,
+        lsp_type.SymbolKind.Struct,
+        lsp_type.SymbolKind.Enum,
+    }
+)
+GROUP_KINDS = frozenset(
+    {
+        lsp_type.SymbolKind.File,
+        lsp_type.SymbolKind.Module,
+        lsp_type.SymbolKind.Namespace,
+        lsp_type.SymbolKind.Package,
+    }
+)
+
+
+@frozen
+class Candidate:
+    # Dotted path of the symbol in its file.
+    name: str
+    kind: lsp_type.SymbolKind
+    # Where its name is, and the range of its body.
+    position: lsp_type.Position
+    range: lsp_type.Range
+
+
+def _implicit(name: str) -> bool:
+    # e.g. Python's `__init__` or `__eq__`, which are called by the language.
+    return name.startswith("__") and name.endswith("__")
+
+
+def iter_candidates(symbols: DocumentSymbols) -> Iterator[Candidate]:
+    """Top-level symbols and members of types, in document order."""
+
+    def visit(
+        nodes: Sequence[lsp_type.DocumentSymbol], prefix: str
+    ) -> Iterator[Candidate]:
+        for node in nodes:
+            name = f"{prefix}{node.name}"
+            if (
+                node.kind not in GROUP_KINDS
+                and node.kind != lsp_type.SymbolKind.Constructor
+                and not _implicit(node.name)
+            ):
+                yield Candidate(name, node.kind, node.selection_range.start, node.range)
+            if node.kind in TYPE_KINDS or node.kind in GROUP_KINDS:
+                yield from visit(node.children or (), f"{name}.")
+
+    for symbol in symbols:
+        match symbol:
+            case lsp_type.DocumentSymbol():
+                yield from visit([symbol], "")
+            case lsp_type.SymbolInformation(location=location) if (
+                symbol.kind not in GROUP_KINDS and not _implicit(symbol.name)
+            ):
+                # Flat symbols have no separate range for their name.
+                yield Candidate(
+                    symbol.name, symbol.kind, location.range.start, location.range
+                )
+
+
+def _contains(outer: lsp_type.Range, inner: lsp_type.Range) -> bool:
+    def key(pos: lsp_type.Position) -> tuple[int, int]:
+        return pos.line, pos.character
+
+    return key(outer.start) <= key(inner.start) and key(inner.end) <= key(outer.end)
+
+
+@frozen
+class Witness:
+    """The file a reference to a symbol was found in, as it was then."""
+
+    path: Path
+    mtime_ns: int
+    size: int
+
+    @classmethod
+    def of(cls, path: Path) -> Witness:
+        stat = path.stat()
+        return cls(path, stat.st_mtime_ns, stat.st_size)
+
+    def holds(self) -> bool:
+        try:
+            return self == Witness.of(self.path)
+        except OSError:
+            return False
+
+
+@define
+class FileReferences:
+    content_hash: str
+    # Reference from outside of each used symbol, by the position of its name.
+    used: dict[tuple[int, int], Witness] = field(factory=dict)
+
+
+@define
+class ReferenceCache:
+    max_files: int
+    _files: OrderedDict[Path, FileReferences] = field(factory=OrderedDict, init=False)
+
+    def get(self, path: Path, content_hash: str) -> FileReferences:
+        """The references known for `path` with this content, maybe none yet."""
+        entry = self._files.get(path)
+        if entry is None or entry.content_hash != content_hash:
+            entry = self._files[path] = FileReferences(content_hash)
+        self._files.move_to_end(path)
+        while len(self._files) > self.max_files:
+            self._files.popitem(last=False)
+        return entry
+
+
+@define
+class UnusedCapability:
+    client: Client
+    documents: DocumentStore
+    cache: ReferenceCache = field(
+        factory=lambda: ReferenceCache(settings.unused_cache_files)
+    )
+
+    async def _is_used(
+        self, path: Path, candidate: Candidate, refs: FileReferences
+    ) -> bool:
+        key = (candidate.position.line, candidate.position.character)
+        if (witness := refs.used.get(key)) is not None and witness.holds():
+            return True
+
+        client = ensure_capability(self.client, WithRequestReferences)
+        uri = self.client.as_uri(path)
+        for location in (
+            await client.request_references(
+                path, candidate.position, include_declaration=False
+            )
+            or ()
+        ):
+            if location.uri == uri and _contains(candidate.range, location.range):
+                continue
+            try:
+                witness = Witness.of(self.client.from_uri(location.uri, relative=False))
+            except OSError:
+                # The server may not know yet that the file was deleted.
+                continue
+            refs.used[key] = witness
+            return True
+        refs.used.pop(key, None)
+        return False
+
+    async def _candidates(self, path: Path) -> tuple[FileReferences, list[Candidate]]:
+        doc = await self.documents.get(path)
+        refs = self.cache.get(path, content_hash(doc.data))
+        client = ensure_capability(self.client, WithRequestDocumentSymbol)
+        symbols = await client.request_document_symbol(path) or []
+        return refs, list(iter_candidates(symbols))
+
+    async def __call__(self, req: UnusedRequest) -> UnusedResponse:
+        if req.path.is_dir():
+            suffixes = self.client.get_language_config().suffixes
+            found = await anyio.to_thread.run_sync(
+                iter_source_files, req.path, suffixes
+            )
+            files = [path for path, _ in found]
+        else:
+            files = [req.path]
+        end = req.start_file + req.max_files if req.max_files is not None else None
+        page = files[req.start_file : end]
+
+        limiter = anyio.CapacityLimiter(settings.unused_concurrency)
+        scanned: dict[int, tuple[Path, FileReferences, list[Candidate]]] = {}
+        unused: dict[tuple[int, int], UnusedSymbol] = {}
+        errors: dict[tuple[int, int], str] = {}
+
+        # One file or symbol failing leaves it out rather than failing the page.
+        async def scan(index: int, path: Path) -> None:
+            async with limiter:
+                try:
+                    refs, candidates = await self._candidates(path)
+                    scanned[index] = path, refs, candidates
+                except (LSPError, OSError, UnicodeDecodeError) as e:
+                    errors[index, -1] = f"{path}: {e}"
+
+        async def check(index: int, position: int) -> None:
+            path, refs, candidates = scanned[index]
+            candidate = candidates[position]
+            async with limiter:
+                try:
+                    used = await self._is_used(path, candidate, refs)
+                except (LSPError, OSError) as e:
+                    errors[index, position] = f"{path}: `{candidate.name}`: {e}"
+                    return
+            if not used:
+                unused[index, position] = UnusedSymbol(
+                    file_path=path,
+                    name=candidate.name,
+                    kind=SymbolKind.from_lsp(candidate.kind).value,
+                    line=candidate.position.line + 1,
+                )
+
+        async with anyio.create_task_group() as tg:
+            for index, path in enumerate(page):
+                tg.start_soon(scan, index, path)
+        async with anyio.create_task_group() as tg:
+            for index, (_, _, candidates) in scanned.items():
+                for position in range(len(candidates)):
+                    tg.start_soon(check, index, position)
+
+        return UnusedResponse(
+            items=[unused[key] for key in sorted(unused)],
+            checked_symbols=sum(len(c) for _, _, c in scanned.values()),
+            scanned_files=len(page),
+            total_files=len(files),
+            errors=[errors[key] for key in sorted(errors)],
+        )
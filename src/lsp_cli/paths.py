@@ -0,0 +1,39 @@
+# Kept free of heavy imports: the `lsp` shim reads these before importing the CLI.
+
+from pathlib import Path
+
+from platformdirs import (
+    user_config_dir,
+    user_log_dir,
+    user_runtime_dir,
+    user_state_dir,
+)
+
+APP_NAME = "lsp-cli"
+CONFIG_PATH = Path(user_config_dir(APP_NAME)) / "config.toml"
+RUNTIME_DIR = Path(user_runtime_dir(APP_NAME))
+LOG_DIR = Path(user_log_dir(APP_NAME))
+STATE_DIR = Path(user_state_dir(APP_NAME))
+SHELL_HISTORY_PATH = STATE_DIR / "shell_history"
+MANAGER_LOG_PATH = LOG_DIR / "manager.log"
+CLIENT_LOG_DIR = LOG_DIR / "clients"
+MANAGER_UDS_PATH = RUNTIME_DIR / "manager.sock"
+# Held by the running manager for its whole lifetime.
+MANAGER_LOCK_PATH = RUNTIME_DIR / "manager.lock"
+# Held while a manager takes the manager lock and starts listening.
+MANAGER_LISTEN_LOCK_PATH = RUNTIME_DIR / "manager.listen.lock"
+# Serializes CLI processes that find no manager and want to spawn one.
+MANAGER_STARTUP_LOCK_PATH = RUNTIME_DIR / "manager.startup.lock"
+ZYGOTE_UDS_PATH = RUNTIME_DIR / "zygote.sock"
+# Held by the running zygote for its whole lifetime.
+ZYGOTE_LOCK_PATH = RUNTIME_DIR / "zygote.lock"
+ZYGOTE_LOG_PATH = LOG_DIR / "zygote.log"
+
+# Write end of the pipe a spawned manager uses to signal that its socket is listening.
+MANAGER_READY_FD_ENV = "LSP_MANAGER_READY_FD"
+
+
+def get_client_log_path(client_id: str | None) -> Path:
+    if client_id:
+        return CLIENT_LOG_DIR / f"{client_id}.log"
+    return CLIENT_LOG_DIR
@@ -1,7 +1,6 @@
 from pathlib import Path
 from typing import Final, Literal
 
-from platformdirs import user_config_dir, user_log_dir, user_runtime_dir
 from pydantic_settings import (
     BaseSettings,
     PydanticBaseSettingsSource,
@@ -9,31 +8,60 @@ from pydantic_settings import (
     TomlConfigSettingsSource,
 )
 
-APP_NAME = "lsp-cli"
-CONFIG_PATH = Path(user_config_dir(APP_NAME)) / "config.toml"
-RUNTIME_DIR = Path(user_runtime_dir(APP_NAME))
-LOG_DIR = Path(user_log_dir(APP_NAME))
-MANAGER_LOG_PATH = LOG_DIR / "manager.log"
-CLIENT_LOG_DIR = LOG_DIR / "clients"
-MANAGER_UDS_PATH = RUNTIME_DIR / "manager.sock"
-
-
-def get_client_log_path(client_id: str | None) -> Path:
-    if client_id:
-        return CLIENT_LOG_DIR / f"{client_id}.log"
-    return CLIENT_LOG_DIR
-
+from lsp_cli.paths import CONFIG_PATH
 
 LogLevel = Literal["TRACE", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+Transport = Literal["http", "rpc"]
 
 
 class Settings(BaseSettings):
     idle_timeout: int = 600
     warmup_time: float = 5.0
     log_level: LogLevel = "INFO"
+    # How the CLI talks to language server clients; the manager is always HTTP.
+    transport: Transport = "http"
+    # RPC results of this many bytes or more are passed through shared memory.
+    shm_threshold: int | None = 1024 * 1024
+    # Files checked at once by `lsp diagnostics`, and how long to wait for each.
+    diagnostics_concurrency: int = 8
+    diagnostics_timeout: float = 10.0
+    # Files outlined at once by `lsp outline` given several files or a directory.
+    outline_concurrency: int = 8
+    # Files whose symbols each client requests at once for `lsp index export`.
+    index_concurrency: int = 8
+    # Nodes `lsp calls` expands at once, and lists at most by default.
+    calls_concurrency: int = 8
+    calls_max_nodes: int = 100
+    # Symbols `lsp unused` finds the references of at once, and files whose
+    # symbols each client remembers a reference from outside of.
+    unused_concurrency: int = 8
+    unused_cache_files: int = 4096
+    # Bytes of file contents each client keeps for its capabilities to share.
+    document_cache_bytes: int = 64 * 1024 * 1024
+    # Documents whose symbols each client keeps while their content is unchanged.
+    outline_cache_entries: int = 512
+    # Documents kept open on the language server between requests.
+    max_open_documents: int = 64
+    # How long rename previews can be executed, and the bytes they may take.
+    rename_preview_ttl: float = 900.0
+    rename_preview_bytes: int = 16 * 1024 * 1024
+    # Answer outline and locate from a syntactic parse during warmup, where one
+    # exists for the language. Results are marked approximate.
+    syntactic_fallback: bool = False
+    # Directories whose projects share one language server per language, and
+    # whether to also treat directories declaring a workspace of projects (e.g.
+    # with `pnpm-workspace.yaml` or `go.work`) as such.
+    monorepo_roots: list[Path] = []
+    monorepo_detect: bool = False
+    # Language servers started at most for a directory with projects of several
+    # languages, e.g. by `lsp search --all-languages`.
+    max_discovered_clients: int = 8
+    # How long `lsp search --all-languages` waits for each language server.
+    search_timeout: float = 10.0
 
     # UX improvements
     default_max_items: int | None = 20
+    default_max_files: int | None = 200
     model_config = SettingsConfigDict(
         env_prefix="LSP_",
         toml_file=CONFIG_PATH,
@@ -0,0 +1,39 @@
+"""Syntactic parsers that answer structural queries without a language server.
+
+They only see a single file, so their results are approximate: there is no
+type information, and symbols are named as written. They are used while the
+language server is still warming up.
+"""
+
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Protocol
+
+from lsprotocol.types import DocumentSymbol
+
+
+class SyntaxParser(Protocol):
+    def parse(self, source: str) -> list[DocumentSymbol]:
+        """Return the document symbols of the source, or raise `SyntaxError`."""
+        ...
+
+
+_parsers: dict[str, SyntaxParser] = {}
+
+
+def register_parser(suffixes: Iterable[str], parser: SyntaxParser) -> None:
+    for suffix in suffixes:
+        _parsers[suffix] = parser
+
+
+def get_parser(path: Path) -> SyntaxParser | None:
+    return _parsers.get(path.suffix)
+
+
+def _register_builtin_parsers() -> None:
+    from .python import PythonParser
+
+    register_parser([".py", ".pyi"], PythonParser())
+
+
+_register_builtin_parsers()
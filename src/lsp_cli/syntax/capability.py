@@ -0,0 +1,133 @@
+from pathlib import Path
+from typing import override
+
+import anyio
+from attrs import define
+from loguru import logger
+from lsap.capability.abc import Capability
+from lsap.capability.locate import LocateCapability, ScopeInfo
+from lsap.capability.outline import OutlineCapability
+from lsap.schema.locate import LocateRequest, SymbolScope
+from lsap.schema.models import Position
+from lsap.schema.outline import OutlineRequest
+from lsap.schema.types import SymbolPath
+from lsap.utils.document import DocumentReader
+from lsap.utils.symbol import iter_symbols
+from lsprotocol.types import DocumentSymbol
+from pydantic import BaseModel
+
+from . import get_parser
+from .models import ApproximateLocateResponse, ApproximateOutlineResponse
+
+
+def parse_symbols(path: Path, source: str) -> list[DocumentSymbol] | None:
+    """Symbols of the file, or None if no parser supports it or it does not parse."""
+    if (parser := get_parser(path)) is None:
+        return None
+    try:
+        return parser.parse(source)
+    except SyntaxError as e:
+        logger.debug("Cannot parse {}: {}", path, e)
+        return None
+
+
+@define
+class SyntacticOutlineCapability(OutlineCapability):
+    """Outline from a syntactic parse, without hover information."""
+
+    @override
+    async def __call__(self, req: OutlineRequest) -> ApproximateOutlineResponse | None:
+        source = await self.client.read_file(req.file_path)
+        if (symbols := parse_symbols(req.file_path, source)) is None:
+            return None
+
+        symbols_iter: list[tuple[SymbolPath, DocumentSymbol]] = []
+        if req.scope:
+            target_path = req.scope.symbol_path
+            for path, symbol in iter_symbols(symbols):
+                if path != target_path:
+                    continue
+                if req.top:
+                    symbols_iter.extend(self._iter_top_symbols([symbol], path[:-1]))
+                else:
+                    symbols_iter.extend(
+                        self._iter_filtered_symbols([symbol], None, path[:-1])
+                    )
+            # The parser may have missed it, e.g. if it is defined dynamically.
+            if not symbols_iter:
+                return None
+        elif req.top:
+            symbols_iter.extend(self._iter_top_symbols(symbols))
+        else:
+            symbols_iter.extend(self._iter_filtered_symbols(symbols))
+
+        return ApproximateOutlineResponse(
+            file_path=req.file_path,
+            items=[
+                self._make_item(req.file_path, path, symbol)
+                for path, symbol in symbols_iter
+            ],
+            approximate=True,
+        )
+
+
+@define
+class SyntacticLocateCapability(LocateCapability):
+    """Locate with symbol scopes resolved from a syntactic parse.
+
+    Line scopes and plain text patterns never need the server, so they are
+    resolved exactly.
+    """
+
+    @override
+    async def __call__(self, req: LocateRequest) -> ApproximateLocateResponse | None:
+        locate = req.locate
+        if not isinstance(locate.scope, SymbolScope):
+            if resp := await super().__call__(req):
+                return ApproximateLocateResponse(
+                    file_path=resp.file_path, position=resp.position
+                )
+            return None
+
+        source = await self.client.read_file(locate.file_path)
+        if (symbols := parse_symbols(locate.file_path, source)) is None:
+            return None
+        target_path = locate.scope.symbol_path
+        symbol = next(
+            (s for path, s in iter_symbols(symbols) if path == target_path), None
+        )
+        if symbol is None:
+            return None
+
+        reader = DocumentReader(source)
+        info = ScopeInfo(symbol.range, symbol.selection_range.start)
+        if pos := (
+            self._find_position(locate.find, info.range, reader)
+            if locate.find
+            else self._default_position(locate.scope, info, reader)
+        ):
+            return ApproximateLocateResponse(
+                file_path=locate.file_path,
+                position=Position.from_lsp(pos),
+                approximate=True,
+            )
+        return None
+
+
+@define
+class FallbackCapability[Req: BaseModel, Resp: BaseModel]:
+    """Answer from `fallback` until `ready` is set, then from `capability`.
+
+    Requests the fallback cannot answer wait for `ready` instead.
+    """
+
+    capability: Capability[Req, Resp]
+    fallback: Capability[Req, Resp]
+    ready: anyio.Event
+
+    async def __call__(self, req: Req) -> Resp | None:
+        if not self.ready.is_set():
+            if (resp := await self.fallback(req)) is not None:
+                return resp
+            await self.ready.wait()
+        return await self.capability(req)
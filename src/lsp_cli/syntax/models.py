@@ -0,0 +1,13 @@
+from lsap.schema.locate import LocateResponse
+from lsap.schema.outline import OutlineResponse
+
+# Responses of the capabilities a syntactic parser can answer. The language
+# server's own responses parse as these too, with `approximate` unset.
+
+
+class ApproximateOutlineResponse(OutlineResponse):
+    approximate: bool = False
+
+
+class ApproximateLocateResponse(LocateResponse):
+    approximate: bool = False
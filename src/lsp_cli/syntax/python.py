@@ -0,0 +1,159 @@
+import ast
+import re
+from collections.abc import Iterator, Sequence
+from typing import Literal
+
+from attrs import define
+from lsprotocol.types import DocumentSymbol, Position, Range, SymbolKind
+
+type Parent = Literal["module", "class", "function"]
+
+type Definition = ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef
+
+
+def _iter_statements(body: Sequence[ast.stmt]) -> Iterator[ast.stmt]:
+    """Statements of a block, including those of nested `if`/`try`/`with` blocks."""
+    for stmt in body:
+        match stmt:
+            case ast.If() | ast.For() | ast.AsyncFor() | ast.While():
+                yield from _iter_statements(stmt.body)
+                yield from _iter_statements(stmt.orelse)
+            case ast.With() | ast.AsyncWith():
+                yield from _iter_statements(stmt.body)
+            case ast.Try() | ast.TryStar():
+                yield from _iter_statements(stmt.body)
+                for handler in stmt.handlers:
+                    yield from _iter_statements(handler.body)
+                yield from _iter_statements(stmt.orelse)
+                yield from _iter_statements(stmt.finalbody)
+            case _:
+                yield stmt
+
+
+def _iter_names(target: ast.expr) -> Iterator[ast.Name]:
+    match target:
+        case ast.Name():
+            yield target
+        case ast.Tuple(elts=elts) | ast.List(elts=elts):
+            for elt in elts:
+                yield from _iter_names(elt)
+        case ast.Starred(value=value):
+            yield from _iter_names(value)
+
+
+@define
+class _SymbolBuilder:
+    # Source lines as bytes: `ast` columns are UTF-8 byte offsets.
+    lines: list[bytes]
+
+    def position(self, lineno: int, col_offset: int) -> Position:
+        line = self.lines[lineno - 1] if lineno <= len(self.lines) else b""
+        character = len(line[:col_offset].decode("utf-8", errors="replace"))
+        return Position(line=lineno - 1, character=character)
+
+    def range(self, node: ast.stmt | ast.expr) -> Range:
+        return Range(
+            start=self.position(node.lineno, node.col_offset),
+            end=self.position(
+                node.end_lineno or node.lineno, node.end_col_offset or node.col_offset
+            ),
+        )
+
+    def definition_range(self, node: Definition) -> Range:
+        # The symbol spans its decorators, whose nodes start after the `@`.
+        start = min(
+            (
+                self.position(d.lineno, max(d.col_offset - 1, 0))
+                for d in node.decorator_list
+            ),
+            key=lambda p: (p.line, p.character),
+            default=self.position(node.lineno, node.col_offset),
+        )
+        return Range(start=start, end=self.range(node).end)
+
+    def name_range(self, node: Definition) -> Range:
+        line = self.lines[node.lineno - 1]
+        pattern = rb"(?:async\s+)?(?:def|class)\s+(%s)\b" % re.escape(
+            node.name.encode()
+        )
+        if m := re.compile(pattern).match(line, node.col_offset):
+            return Range(
+                start=self.position(node.lineno, m.start(1)),
+                end=self.position(node.lineno, m.end(1)),
+            )
+        return self.range(node)
+
+    def symbols(self, body: Sequence[ast.stmt], parent: Parent) -> list[DocumentSymbol]:
+        symbols: list[DocumentSymbol] = []
+        for stmt in _iter_statements(body):
+            match stmt:
+                case ast.ClassDef():
+                    bases = [ast.unparse(b) for b in (*stmt.bases, *stmt.keywords)]
+                    symbols.append(
+                        DocumentSymbol(
+                            name=stmt.name,
+                            kind=SymbolKind.Class,
+                            range=self.definition_range(stmt),
+                            selection_range=self.name_range(stmt),
+                            detail=f"({', '.join(bases)})" if bases else None,
+                            children=self.symbols(stmt.body, "class"),
+                        )
+                    )
+                case ast.FunctionDef() | ast.AsyncFunctionDef():
+                    detail = f"({ast.unparse(stmt.args)})"
+                    if stmt.returns:
+                        detail += f" -> {ast.unparse(stmt.returns)}"
+                    symbols.append(
+                        DocumentSymbol(
+                            name=stmt.name,
+                            kind=SymbolKind.Method
+                            if parent == "class"
+                            else SymbolKind.Function,
+                            range=self.definition_range(stmt),
+                            selection_range=self.name_range(stmt),
+                            detail=detail,
+                            children=self.symbols(stmt.body, "function"),
+                        )
+                    )
+                # Locals are left out, like the children of functions in outlines.
+                case ast.Assign() | ast.AnnAssign() if parent != "function":
+                    targets = (
+                        stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+                    )
+                    annotation = (
+                        ast.unparse(stmt.annotation)
+                        if isinstance(stmt, ast.AnnAssign)
+                        else None
+                    )
+                    symbols.extend(
+                        DocumentSymbol(
+                            name=name.id,
+                            kind=SymbolKind.Constant
+                            if name.id.isupper()
+                            else SymbolKind.Variable,
+                            range=self.range(stmt),
+                            selection_range=self.range(name),
+                            detail=annotation,
+                        )
+                        for target in targets
+                        for name in _iter_names(target)
+                    )
+                case ast.TypeAlias(name=ast.Name() as name) if parent != "function":
+                    symbols.append(
+                        DocumentSymbol(
+                            name=name.id,
+                            kind=SymbolKind.Variable,
+                            range=self.range(stmt),
+                            selection_range=self.range(name),
+                        )
+                    )
+        return symbols
+
+
+class PythonParser:
+    """Document symbols of Python source, built from the stdlib `ast`."""
+
+    def parse(self, source: str) -> list[DocumentSymbol]:
+        tree = ast.parse(source)
+        lines = source.encode().splitlines(keepends=True)
+        return _SymbolBuilder(lines).symbols(tree.body, "module")
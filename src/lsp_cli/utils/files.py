@@ -0,0 +1,56 @@
+"""Walking a source tree, skipping what is never source code of its own."""
+
+import os
+from collections import deque
+from collections.abc import Buffer, Iterator, Sequence
+from contextlib import suppress
+from pathlib import Path
+
+import xxhash
+
+# Directories never searched for projects or source files: dependencies and
+# build output. Hidden directories such as `.git` or `.venv` are skipped too.
+SKIPPED_DIRS = frozenset(
+    {"node_modules", "target", "build", "dist", "out", "vendor", "__pycache__"}
+)
+
+
+def _searched(name: str) -> bool:
+    return not name.startswith(".") and name not in SKIPPED_DIRS
+
+
+def iter_dirs(root: Path) -> Iterator[tuple[Path, list[str]]]:
+    """Directories below `root` with the names in them, shallowest first."""
+    queue = deque([root])
+    while queue:
+        directory = queue.popleft()
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError:
+            continue
+        if directory != root:
+            yield directory, [e.name for e in entries]
+        queue.extend(
+            Path(e.path)
+            for e in entries
+            if e.is_dir(follow_symlinks=False) and _searched(e.name)
+        )
+
+
+def iter_source_files(root: Path, suffixes: Sequence[str]) -> list[tuple[Path, int]]:
+    """Source files under `root` with their mtime, skipping hidden and build dirs."""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if _searched(d))
+        for name in sorted(filenames):
+            if name.endswith(tuple(suffixes)):
+                path = Path(dirpath, name)
+                # e.g. a dangling symlink
+                with suppress(FileNotFoundError):
+                    files.append((path, path.stat().st_mtime_ns))
+    return files
+
+
+def content_hash(data: Buffer) -> str:
+    """A fast hash of file contents, to tell whether they changed."""
+    return xxhash.xxh3_64_hexdigest(data)
@@ -0,0 +1,57 @@
+import fcntl
+import os
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import anyio
+import anyio.to_thread
+
+
+def _open_lock_file(path: Path) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+
+
+def try_lock(path: Path) -> int | None:
+    """Try to take an exclusive lock on `path` without blocking.
+
+    Returns the locked file descriptor, which holds the lock until it is
+    closed (or the process exits), or None if another process holds it.
+    """
+    fd = _open_lock_file(path)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+async def wait_lock(path: Path) -> int:
+    """Take an exclusive lock on `path`, waiting until its holder releases it.
+
+    Returns the locked file descriptor, like `try_lock`. Waiting happens in a
+    worker thread, so the caller is woken by the kernel as soon as the lock is
+    free.
+    """
+    fd = _open_lock_file(path)
+    try:
+        await anyio.to_thread.run_sync(
+            fcntl.flock, fd, fcntl.LOCK_EX, abandon_on_cancel=True
+        )
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+@asynccontextmanager
+async def file_lock(path: Path, timeout: float | None = None) -> AsyncGenerator[None]:
+    """Hold an exclusive lock on `path` for the duration of the context."""
+    with anyio.fail_after(timeout):
+        fd = await wait_lock(path)
+    try:
+        yield
+    finally:
+        os.close(fd)
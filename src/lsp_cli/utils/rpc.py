@@ -0,0 +1,379 @@
+"""Length-prefixed JSON frames over a UDS stream.
+
+A lighter alternative to HTTP for calls from the CLI to a client. Each frame
+is a 4-byte big-endian length followed by a JSON object. Requests carry an
+`id` that their response echoes, so one connection can have many requests in
+flight and responses may arrive in any order:
+
+    {"id": 1, "method": "/capability/definition", "params": {...}}
+    {"id": 1, "result": {...}}
+    {"id": 1, "error": {"status": 404, "detail": "..."}}
+
+Results of `shm_threshold` bytes or more are written to a memfd instead, which
+is passed along with the frame (SCM_RIGHTS) and mapped by the receiver:
+
+    {"id": 1, "result_size": 52428800}
+
+The memfd is anonymous: it is freed once both ends have closed it, even if the
+receiver exits before reading it.
+
+The server may also push notifications, which have no `id` and get no reply:
+
+    {"method": "textDocument/publishDiagnostics", "params": {...}}
+
+Methods are named after the HTTP routes they mirror.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import mmap
+import os
+import struct
+from collections import deque
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextlib import asynccontextmanager, suppress
+from pathlib import Path
+from typing import Any, Self
+
+import anyio
+from anyio import AsyncContextManagerMixin
+from anyio.abc import ByteStream, Listener, TaskGroup, UNIXSocketStream
+from anyio.streams.buffered import BufferedByteReceiveStream
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+from attrs import define, field
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 256 * 1024 * 1024
+RECEIVE_SIZE = 64 * 1024
+MAX_FDS = 4
+# Pushed notifications queued on the client before new ones are dropped.
+NOTIFICATION_BUFFER = 1024
+
+CONNECTION_ERRORS = (OSError, anyio.BrokenResourceError, anyio.ClosedResourceError)
+
+type Frame = dict[str, Any]
+type Dispatch = Callable[[str, Any, RpcConnection], Awaitable[Any]]
+
+
+class RpcError(Exception):
+    """An error response, with the status code the HTTP API would have used."""
+
+    def __init__(self, status: int, detail: str) -> None:
+        super().__init__(f"{status}: {detail}")
+        self.status = status
+        self.detail = detail
+
+
+def pack_frame(body: bytes) -> bytes:
+    return HEADER.pack(len(body)) + body
+
+
+async def send_frame(stream: ByteStream, frame: Frame) -> None:
+    await stream.send(pack_frame(json.dumps(frame, separators=(",", ":")).encode()))
+
+
+@define
+class FdReceiveBuffer:
+    """Buffered reads that keep the descriptors passed along with the data."""
+
+    stream: UNIXSocketStream
+    fds: deque[int] = field(factory=deque, init=False)
+    _buffer: bytearray = field(factory=bytearray, init=False)
+
+    async def receive_exactly(self, nbytes: int) -> bytes:
+        while len(self._buffer) < nbytes:
+            try:
+                data, fds = await self.stream.receive_fds(RECEIVE_SIZE, MAX_FDS)
+            except anyio.EndOfStream:
+                if self._buffer:
+                    raise anyio.IncompleteRead from None
+                raise
+            self.fds.extend(fds)
+            self._buffer += data
+
+        data = bytes(self._buffer[:nbytes])
+        del self._buffer[:nbytes]
+        return data
+
+    def close_fds(self) -> None:
+        while self.fds:
+            os.close(self.fds.popleft())
+
+
+async def recv_frame(
+    reader: BufferedByteReceiveStream | FdReceiveBuffer,
+) -> Frame | None:
+    """Read the next frame, or return None if the peer closed between frames."""
+    try:
+        header = await reader.receive_exactly(HEADER.size)
+    except (anyio.IncompleteRead, anyio.EndOfStream):
+        return None
+
+    (size,) = HEADER.unpack(header)
+    if size > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame too large: {size} bytes")
+    return json.loads(await reader.receive_exactly(size))
+
+
+def write_memfd(data: bytes) -> int:
+    fd = os.memfd_create("lsp-cli-result", os.MFD_CLOEXEC)
+    try:
+        with open(fd, "wb", closefd=False) as f:
+            f.write(data)
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+def read_memfd(fd: int, size: int) -> bytes:
+    """Read and close a memfd received from the peer.
+
+    The payload is copied out of the mapping once, since pydantic only parses
+    `bytes`, `bytearray` or `str`; the hand-off saves streaming it through the
+    socket, not this copy.
+    """
+    try:
+        if size == 0:
+            return b""
+        with mmap.mmap(fd, size, prot=mmap.PROT_READ) as mapped:
+            return mapped[:]
+    finally:
+        os.close(fd)
+
+
+@define
+class RpcConnection:
+    """Server end of one connection, passed to `dispatch` with each request."""
+
+    stream: ByteStream
+    shm_threshold: int | None
+    _background: TaskGroup
+    _send_lock: anyio.Lock = field(factory=anyio.Lock, init=False)
+
+    async def send(self, frame: Frame) -> None:
+        async with self._send_lock:
+            await send_frame(self.stream, frame)
+
+    async def notify(self, method: str, params: object) -> None:
+        """Push a frame without an id, which the peer does not answer."""
+        await self.send({"method": method, "params": params})
+
+    def start_soon(self, func: Callable[..., Awaitable[object]], *args: object) -> None:
+        """Run a task until the peer disconnects, e.g. to push notifications."""
+        self._background.start_soon(func, *args)
+
+    async def reply(self, call_id: object, result: object) -> None:
+        body = to_json(result)
+        if (
+            self.shm_threshold is not None
+            and len(body) >= self.shm_threshold
+            and isinstance(self.stream, UNIXSocketStream)
+            and hasattr(os, "memfd_create")
+        ):
+            frame = {"id": call_id, "result_size": len(body)}
+            header = pack_frame(json.dumps(frame, separators=(",", ":")).encode())
+            fd = write_memfd(body)
+            try:
+                async with self._send_lock:
+                    await self.stream.send_fds(header, [fd])
+            finally:
+                os.close(fd)
+        else:
+            frame_id = json.dumps(call_id).encode()
+            async with self._send_lock:
+                await self.stream.send(
+                    pack_frame(b'{"id":%s,"result":%s}' % (frame_id, body))
+                )
+
+
+async def _handle(conn: RpcConnection, dispatch: Dispatch, frame: Frame) -> None:
+    call_id = frame.get("id")
+    error: Frame | None = None
+    try:
+        result = await dispatch(frame["method"], frame.get("params"), conn)
+    except RpcError as e:
+        error = {"status": e.status, "detail": e.detail}
+    except Exception as e:  # noqa: BLE001
+        error = {"status": 500, "detail": str(e)}
+
+    # The peer may have gone away while the request was running.
+    with suppress(*CONNECTION_ERRORS):
+        if error is not None:
+            await conn.send({"id": call_id, "error": error})
+        else:
+            await conn.reply(call_id, result)
+
+
+async def _serve_connection(
+    dispatch: Dispatch, shm_threshold: int | None, stream: ByteStream
+) -> None:
+    # A broken connection must only end itself, never the listener.
+    with suppress(*CONNECTION_ERRORS, ValueError):
+        async with (
+            stream,
+            anyio.create_task_group() as tg,
+            anyio.create_task_group() as background,
+        ):
+            conn = RpcConnection(stream, shm_threshold, background)
+            reader = BufferedByteReceiveStream(stream)
+            while (frame := await recv_frame(reader)) is not None:
+                tg.start_soon(_handle, conn, dispatch, frame)
+            background.cancel_scope.cancel()
+
+
+async def serve_rpc(
+    listener: Listener[ByteStream],
+    dispatch: Dispatch,
+    *,
+    shm_threshold: int | None,
+) -> None:
+    """Serve connections from the listener until cancelled.
+
+    Each request runs in its own task. `dispatch` receives the method, params
+    and connection of a request and returns its result. Raise `RpcError` to
+    answer with a specific status; any other exception becomes a 500 error.
+    Results of at least `shm_threshold` bytes are handed off through a memfd,
+    or never if it is None.
+    """
+    await listener.serve(
+        lambda stream: _serve_connection(dispatch, shm_threshold, stream)
+    )
+
+
+@define
+class PendingCall:
+    """A request waiting for its reply, and the memfd passed along with it."""
+
+    done: anyio.Event = field(factory=anyio.Event)
+    # Unset if the connection closed first.
+    reply: Frame | None = None
+    # Owned by the call until it reads it, so a caller giving up after the reply
+    # arrived still closes it.
+    fd: int | None = None
+
+    def close_fd(self) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+@define
+class RpcClient(AsyncContextManagerMixin):
+    """Pipelining client with the same call interface as `AsyncHttpClient`."""
+
+    stream: UNIXSocketStream
+    timeout: float | None = None
+
+    _ids: itertools.count[int] = field(factory=itertools.count, init=False)
+    _pending: dict[int, PendingCall] = field(factory=dict, init=False)
+    _send_lock: anyio.Lock = field(factory=anyio.Lock, init=False)
+    _closed: bool = field(default=False, init=False)
+    _notify_send: MemoryObjectSendStream[Frame] = field(init=False)
+    _notify_receive: MemoryObjectReceiveStream[Frame] = field(init=False)
+
+    def __attrs_post_init__(self) -> None:
+        self._notify_send, self._notify_receive = anyio.create_memory_object_stream[
+            Frame
+        ](NOTIFICATION_BUFFER)
+
+    def notifications(self) -> MemoryObjectReceiveStream[Frame]:
+        """Frames pushed by the server, ending when the connection closes."""
+        return self._notify_receive
+
+    def _push(self, frame: Frame) -> None:
+        # Nobody is reading them fast enough; replies must not wait.
+        with suppress(anyio.WouldBlock):
+            self._notify_send.send_nowait(frame)
+
+    def _deliver(self, frame: Frame, fd: int | None) -> bool:
+        """Hand a reply to its caller, unless it has given up waiting."""
+        if (call := self._pending.pop(frame.get("id", -1), None)) is None:
+            return False
+        call.reply, call.fd = frame, fd
+        call.done.set()
+        return True
+
+    async def _read_loop(self) -> None:
+        reader = FdReceiveBuffer(self.stream)
+        try:
+            while (frame := await recv_frame(reader)) is not None:
+                if "id" not in frame:
+                    self._push(frame)
+                    continue
+                # The descriptor is attached to the first byte of its frame.
+                fd = reader.fds.popleft() if "result_size" in frame else None
+                if not self._deliver(frame, fd) and fd is not None:
+                    os.close(fd)
+        except (*CONNECTION_ERRORS, ValueError, IndexError):
+            pass
+        finally:
+            # Wake up every caller still waiting, without a reply.
+            self._closed = True
+            for call in self._pending.values():
+                call.done.set()
+            self._pending.clear()
+            self._notify_send.close()
+            reader.close_fds()
+
+    async def request[T: BaseModel](
+        self,
+        method: str,
+        resp_schema: type[T],
+        *,
+        json: BaseModel | None = None,
+    ) -> T:
+        if self._closed:
+            raise ConnectionError("RPC connection closed")
+
+        call_id = next(self._ids)
+        self._pending[call_id] = call = PendingCall()
+        frame: Frame = {
+            "id": call_id,
+            "method": method,
+            "params": json.model_dump(exclude_none=True, mode="json") if json else None,
+        }
+        try:
+            with anyio.fail_after(self.timeout):
+                async with self._send_lock:
+                    await send_frame(self.stream, frame)
+                await call.done.wait()
+            if (reply := call.reply) is None:
+                raise ConnectionError("RPC connection closed")
+            fd, call.fd = call.fd, None
+        finally:
+            self._pending.pop(call_id, None)
+            # A reply may have arrived just as the call timed out or was cancelled.
+            call.close_fd()
+
+        if fd is not None:
+            return resp_schema.model_validate_json(read_memfd(fd, reply["result_size"]))
+        if error := reply.get("error"):
+            raise RpcError(error["status"], error["detail"])
+        return resp_schema.model_validate(reply.get("result"))
+
+    async def get[T: BaseModel](self, url: str, resp_schema: type[T]) -> T:
+        return await self.request(url, resp_schema)
+
+    async def post[T: BaseModel](
+        self, url: str, resp_schema: type[T], *, json: BaseModel | None = None
+    ) -> T:
+        return await self.request(url, resp_schema, json=json)
+
+    @asynccontextmanager
+    async def __asynccontextmanager__(self) -> AsyncGenerator[Self]:
+        async with self.stream, anyio.create_task_group() as tg:
+            tg.start_soon(self._read_loop)
+            try:
+                yield self
+            finally:
+                tg.cancel_scope.cancel()
+
+
+async def connect_rpc(uds_path: Path, timeout: float | None = None) -> RpcClient:
+    stream = await anyio.connect_unix(uds_path)
+    return RpcClient(stream, timeout=timeout)
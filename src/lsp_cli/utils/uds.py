@@ -1,9 +1,12 @@
+import socket
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 import anyio
 
+UDS_BACKLOG = 2048
+
 
 @asynccontextmanager
 async def open_uds(uds_path: Path) -> AsyncGenerator[Path]:
@@ -13,5 +16,20 @@ async def open_uds(uds_path: Path) -> AsyncGenerator[Path]:
     try:
         yield uds_path
     finally:
-        with anyio.CancelScope(shield=True):
-            await path.unlink(missing_ok=True)
+        # Unlink synchronously: on SIGINT shutdown the asyncio runner cancels the
+        # main task, and an awaited unlink would be interrupted.
+        uds_path.unlink(missing_ok=True)
+
+
+@asynccontextmanager
+async def listen_uds(uds_path: Path) -> AsyncGenerator[socket.socket]:
+    """Bind and listen on a UDS before any server is attached to it.
+
+    Peers can connect as soon as this yields; their connections wait in the
+    backlog until the server starts accepting on the returned socket.
+    """
+    async with open_uds(uds_path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(uds_path.as_posix())
+            sock.listen(UDS_BACKLOG)
+            yield sock
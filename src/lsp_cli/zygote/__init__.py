@@ -0,0 +1,97 @@
+"""Wire protocol between the `lsp` shim and the resident zygote.
+
+The zygote is a long-lived process that has already imported the whole CLI.
+The shim sends it one request per invocation: a JSON payload with argv, cwd
+and environment, plus its stdio file descriptors. The zygote forks a worker
+that adopts them, sends back its pid, runs the command and finally sends its
+exit code.
+
+Only the standard library may be imported here: the shim loads this module
+on every invocation.
+"""
+
+import json
+import os
+import socket
+import struct
+import sys
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+# Set to a truthy value to route `lsp` invocations through the zygote.
+ZYGOTE_ENV = "LSP_ZYGOTE"
+
+STDIO_FDS = (0, 1, 2)
+
+# Sent instead of a worker pid when the shim has to run the command itself.
+FALLBACK = -1
+
+_SIZE = struct.Struct("!I")
+_INT = struct.Struct("!i")
+
+
+def is_enabled(env: Mapping[str, str]) -> bool:
+    return env.get(ZYGOTE_ENV, "").lower() in {"1", "true", "yes", "on"}
+
+
+def env_fingerprint(env: Mapping[str, str]) -> dict[str, str]:
+    """The part of the environment that is read at import time.
+
+    Settings and directory paths are resolved when the zygote imports the CLI,
+    so a worker only behaves like a fresh process if these variables match.
+    """
+    return {
+        key: value
+        for key, value in env.items()
+        if key.startswith(("LSP_", "XDG_")) or key == "HOME"
+    }
+
+
+def runtime_stamp() -> list[str]:
+    """Identifies the interpreter and installation a process runs from."""
+    return [sys.executable, str(Path(__file__).parent.parent)]
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes | None:
+    buf = bytearray()
+    while len(buf) < size:
+        if not (chunk := sock.recv(size - len(buf))):
+            return None
+        buf += chunk
+    return bytes(buf)
+
+
+def send_request(sock: socket.socket, request: Mapping[str, Any]) -> None:
+    payload = json.dumps(request).encode()
+    socket.send_fds(sock, [_SIZE.pack(len(payload))], STDIO_FDS)
+    sock.sendall(payload)
+
+
+def recv_request(sock: socket.socket) -> tuple[dict[str, Any], list[int]] | None:
+    header, fds, _, _ = socket.recv_fds(sock, _SIZE.size, len(STDIO_FDS))
+    try:
+        if len(header) < _SIZE.size:
+            header += _recv_exact(sock, _SIZE.size - len(header)) or b""
+        if len(header) == _SIZE.size and len(fds) == len(STDIO_FDS):
+            (size,) = _SIZE.unpack(header)
+            if (payload := _recv_exact(sock, size)) is not None:
+                return json.loads(payload), fds
+    except BaseException:
+        for fd in fds:
+            os.close(fd)
+        raise
+
+    for fd in fds:
+        os.close(fd)
+    return None
+
+
+def send_int(sock: socket.socket, value: int) -> None:
+    sock.sendall(_INT.pack(value))
+
+
+def recv_int(sock: socket.socket) -> int | None:
+    if (data := _recv_exact(sock, _INT.size)) is None:
+        return None
+    return _INT.unpack(data)[0]
@@ -0,0 +1,190 @@
+import os
+import signal
+import socket
+import sys
+from contextlib import suppress
+from typing import Any, NoReturn
+
+from loguru import logger
+
+from lsp_cli.paths import (
+    CONFIG_PATH,
+    ZYGOTE_LOCK_PATH,
+    ZYGOTE_LOG_PATH,
+    ZYGOTE_UDS_PATH,
+)
+from lsp_cli.utils.lock import try_lock
+from lsp_cli.utils.uds import UDS_BACKLOG
+
+from . import (
+    FALLBACK,
+    STDIO_FDS,
+    env_fingerprint,
+    recv_request,
+    runtime_stamp,
+    send_int,
+)
+
+# A client that connects but never finishes its request must not stall the zygote.
+REQUEST_TIMEOUT = 5.0
+
+
+def _config_mtime() -> int | None:
+    try:
+        return CONFIG_PATH.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _reopen_stdio() -> None:
+    # The inherited stream objects now write to the caller's stdio, but their
+    # buffering was chosen for the zygote's /dev/null.
+    line_buffered = 1
+    sys.stdin = open(0, closefd=False)  # noqa: SIM115
+    sys.stdout = open(  # noqa: SIM115
+        1, "w", buffering=line_buffered if os.isatty(1) else -1, closefd=False
+    )
+    sys.stderr = open(  # noqa: SIM115
+        2, "w", buffering=line_buffered, errors="backslashreplace", closefd=False
+    )
+
+
+def _run_worker(
+    conn: socket.socket, request: dict[str, Any], fds: list[int], lock_fd: int
+) -> NoReturn:
+    """Take over the caller's stdio, cwd, environment and argv, then run the command."""
+    from lsp_cli.__main__ import run as run_cli
+
+    code = 1
+    try:
+        os.close(lock_fd)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        for target, fd in zip(STDIO_FDS, fds, strict=True):
+            os.dup2(fd, target)
+            os.close(fd)
+        _reopen_stdio()
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.argv = request["argv"]
+
+        send_int(conn, os.getpid())
+        run_cli()
+        code = 0
+    except SystemExit as e:
+        match e.code:
+            case int() as code:
+                pass
+            case None:
+                code = 0
+            case message:
+                print(message, file=sys.stderr)
+    except KeyboardInterrupt:
+        code = 130
+    except Exception:  # noqa: BLE001
+        logger.exception("Worker failed")
+    finally:
+        # Flushes messages still queued by the enqueued stderr sink.
+        logger.remove()
+        with suppress(OSError, ValueError):
+            sys.stdout.flush()
+            sys.stderr.flush()
+        with suppress(OSError):
+            send_int(conn, code)
+        os._exit(code)
+
+
+def serve(listener: socket.socket, lock_fd: int) -> None:
+    fingerprint = env_fingerprint(os.environ)
+    stamp = runtime_stamp()
+    config_mtime = _config_mtime()
+
+    while True:
+        try:
+            conn, _ = listener.accept()
+        except TimeoutError:
+            logger.info("Idle timeout reached, exiting")
+            return
+
+        with conn:
+            conn.settimeout(REQUEST_TIMEOUT)
+            try:
+                received = recv_request(conn)
+            except (OSError, ValueError) as e:
+                logger.warning("Invalid request: {}", e)
+                continue
+            if received is None:
+                continue
+
+            request, fds = received
+            try:
+                if _config_mtime() != config_mtime:
+                    # Settings were loaded before the config changed: let the
+                    # next invocation start a fresh zygote.
+                    logger.info("Config file changed, exiting")
+                    send_int(conn, FALLBACK)
+                    return
+                if (
+                    env_fingerprint(request["env"]) != fingerprint
+                    or request["stamp"] != stamp
+                ):
+                    send_int(conn, FALLBACK)
+                    continue
+
+                if os.fork() == 0:
+                    listener.close()
+                    conn.settimeout(None)
+                    _run_worker(conn, request, fds, lock_fd)
+            except OSError as e:
+                logger.warning("Failed to start worker: {}", e)
+                with suppress(OSError):
+                    send_int(conn, FALLBACK)
+            finally:
+                for fd in fds:
+                    os.close(fd)
+
+
+def preload() -> None:
+    """Import everything a command may need once, before any worker is forked."""
+    from lsp_cli.__main__ import load_commands
+
+    # Commands are loaded lazily by the CLI, so each worker would import its own.
+    load_commands()
+
+
+def main() -> None:
+    if (lock_fd := try_lock(ZYGOTE_LOCK_PATH)) is None:
+        return
+
+    logger.remove()
+    ZYGOTE_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    logger.add(
+        ZYGOTE_LOG_PATH,
+        format="{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}",
+        level="INFO",
+    )
+
+    preload()
+    from lsp_cli.settings import settings
+
+    # Workers are reaped automatically.
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    ZYGOTE_UDS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    ZYGOTE_UDS_PATH.unlink(missing_ok=True)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+            listener.bind(str(ZYGOTE_UDS_PATH))
+            listener.listen(UDS_BACKLOG)
+            listener.settimeout(settings.idle_timeout)
+            logger.info("Zygote listening at {}", ZYGOTE_UDS_PATH)
+            serve(listener, lock_fd)
+    finally:
+        # Unlink before releasing the lock, so a successor never loses its socket.
+        ZYGOTE_UDS_PATH.unlink(missing_ok=True)
+        os.close(lock_fd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Entry point of the `lsp` command.
+
+With `LSP_ZYGOTE` set, the command runs in a worker forked from the resident
+zygote, which skips interpreter startup costs beyond this module's imports.
+Otherwise, or whenever the zygote cannot serve the request, it runs in this
+process as usual.
+"""
+
+import os
+import signal
+import socket
+import sys
+from contextlib import suppress
+from pathlib import Path
+from types import FrameType
+
+from lsp_cli.paths import ZYGOTE_UDS_PATH
+
+from . import FALLBACK, is_enabled, recv_int, runtime_stamp, send_request
+
+
+def spawn_zygote() -> None:
+    import subprocess
+
+    subprocess.Popen(
+        (sys.executable, "-m", "lsp_cli.zygote"),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def run_in_zygote(argv: list[str]) -> int | None:
+    """Run the command in a zygote worker and return its exit code.
+
+    Returns None if the command has to run in this process instead. A zygote
+    is spawned in the background when none is running, for later invocations.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(ZYGOTE_UDS_PATH))
+        except OSError:
+            spawn_zygote()
+            return None
+
+        send_request(
+            sock,
+            {
+                "argv": argv,
+                "cwd": str(Path.cwd()),
+                "env": dict(os.environ),
+                "stamp": runtime_stamp(),
+            },
+        )
+        if (pid := recv_int(sock)) in (None, FALLBACK):
+            return None
+
+        def forward(signum: int, frame: FrameType | None) -> None:
+            with suppress(ProcessLookupError):
+                os.kill(pid, signum)
+
+        for signum in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+            signal.signal(signum, forward)
+
+        code = recv_int(sock)
+        # The connection closes when the worker exits, after its output is flushed.
+        while sock.recv(1024):
+            pass
+        return 1 if code is None else code
+
+
+def run() -> None:
+    if is_enabled(os.environ) and (code := run_in_zygote(sys.argv)) is not None:
+        sys.exit(code)
+
+    from lsp_cli.__main__ import run as run_cli
+
+    run_cli()
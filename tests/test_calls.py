@@ -0,0 +1,158 @@
+from pathlib import Path
+from typing import Any, cast
+
+import pytest
+from lsp_client import Client
+from lsp_client.jsonrpc.convert import converter
+from lsprotocol.types import (
+    CallHierarchyIncomingCall,
+    CallHierarchyIncomingCallsRequest,
+    CallHierarchyItem,
+    CallHierarchyOutgoingCall,
+    CallHierarchyOutgoingCallsRequest,
+    Position,
+    Range,
+    SymbolKind,
+)
+
+from lsp_cli.cli.calls import CallEntry, CallLevel, format_level, walk_calls
+from lsp_cli.manager import calls
+from lsp_cli.manager.calls import CallsExpandCapability, request_calls, to_node
+from lsp_cli.manager.models import (
+    CallEdge,
+    CallNode,
+    CallsExpandRequest,
+    CallsResponse,
+)
+
+# Outgoing calls: main → a, b; a → b; b → a.
+GRAPH = {"main": ["a", "b"], "a": ["b"], "b": ["a"]}
+
+
+def _node(name: str) -> CallNode:
+    return CallNode(
+        id=name, name=name, kind="function", file_path=Path("/x.py"), line=1, item={}
+    )
+
+
+async def _expand(nodes: list[CallNode]) -> CallsResponse:
+    edges = [
+        CallEdge(caller=node.id, callee=callee, lines=[2])
+        for node in nodes
+        for callee in GRAPH[node.id]
+    ]
+    return CallsResponse(
+        nodes=[_node(edge.callee) for edge in edges],
+        edges=edges,
+    )
+
+
+async def _walk(depth: int, max_nodes: int) -> list[CallLevel]:
+    levels = walk_calls(_expand, [_node("main")], "outgoing", depth, max_nodes, [])
+    return [level async for level in levels]
+
+
+def _summary(level: CallLevel) -> list[tuple[str, str, bool]]:
+    return [(e.parent.name, e.node.name, e.seen) for e in level.entries]
+
+
+@pytest.mark.asyncio
+async def test_nodes_are_expanded_once():
+    levels = await _walk(depth=5, max_nodes=10)
+    assert [_summary(level) for level in levels] == [
+        [("main", "a", False), ("main", "b", False)],
+        [("a", "b", True), ("b", "a", True)],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_the_walk_stops_at_the_node_budget():
+    [level] = await _walk(depth=5, max_nodes=2)
+    assert level.truncated
+    assert _summary(level) == [("main", "a", False)]
+
+
+def test_format_level(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir("/")
+    main, a = _node("main"), _node("a")
+    level = CallLevel(
+        2,
+        [
+            CallEntry(a, main, [3], seen=False),
+            CallEntry(main, a, [5, 8], seen=True),
+        ],
+    )
+    assert format_level(level, "incoming") == (
+        "## Depth 2\n"
+        "- `a` (function) `x.py:1`, calls `main` at line 3\n"
+        "- `main` (function) `x.py:1`, calls `a` at lines 5, 8 (listed above)"
+    )
+    assert format_level(CallLevel(1, []), "outgoing") == "## Depth 1\nNo calls found."
+
+
+def _range(line: int) -> Range:
+    return Range(
+        start=Position(line=line, character=4), end=Position(line=line, character=8)
+    )
+
+
+def _item(name: str, line: int) -> CallHierarchyItem:
+    return CallHierarchyItem(
+        name=name,
+        kind=SymbolKind.Function,
+        uri="file:///x.py",
+        range=_range(line),
+        selection_range=_range(line),
+    )
+
+
+class FakeClient:
+    """Answers that `caller` calls every item, from line 9, and calls `callee`."""
+
+    def __init__(self) -> None:
+        self.sent: list[Any] = []
+
+    def from_uri(self, uri: str, relative: bool = True) -> Path:
+        return Path("/x.py")
+
+    async def request(self, req: Any, schema: Any) -> Any:
+        self.sent.append(req)
+        if isinstance(req, CallHierarchyIncomingCallsRequest):
+            return [
+                CallHierarchyIncomingCall(
+                    from_=_item("caller", 8), from_ranges=[_range(9)]
+                )
+            ]
+        return [
+            CallHierarchyOutgoingCall(to=_item("callee", 20), from_ranges=[_range(3)])
+        ]
+
+
+@pytest.mark.asyncio
+async def test_calls_of_an_item_are_requested_for_it():
+    client = FakeClient()
+    item = _item("main", 2)
+    [(caller, ranges)] = await request_calls(cast(Client, client), item, "incoming")
+    [(callee, _)] = await request_calls(cast(Client, client), item, "outgoing")
+    assert (caller.name, ranges, callee.name) == ("caller", [_range(9)], "callee")
+    incoming, outgoing = client.sent
+    assert isinstance(incoming, CallHierarchyIncomingCallsRequest)
+    assert isinstance(outgoing, CallHierarchyOutgoingCallsRequest)
+    assert incoming.params.item == outgoing.params.item == item
+
+
+@pytest.mark.asyncio
+async def test_nodes_with_invalid_items_fail_alone(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(calls, "ensure_capability", lambda client, _: client)
+    client = cast(Client, FakeClient())
+    main = to_node(client, _item("main", 2))
+    assert main.item == converter.unstructure(_item("main", 2))
+    forged = main.model_copy(update={"id": "forged", "item": {"name": "main"}})
+
+    resp = await CallsExpandCapability(client)(
+        CallsExpandRequest(nodes=[forged, main], direction="incoming")
+    )
+    assert [node.name for node in resp.nodes] == ["caller"]
+    assert [(e.callee, e.lines) for e in resp.edges] == [(main.id, [10])]
+    [error] = resp.errors
+    assert error.startswith("main (/x.py:3): invalid call hierarchy item")
@@ -5,7 +5,9 @@ This tests actual CLI command execution to verify that the server
 management system works correctly in real-world usage scenarios.
 """
 
+import json
 import subprocess
+import tempfile
 import time
 from pathlib import Path
 
@@ -259,3 +261,134 @@ class TestConnectionReliability:
         # Subsequent commands should work
         result = self.run_lsp_command("server", "list")
         assert result.returncode == 0, f"Manager not responding: {result.stderr}"
+
+
+class TestConcurrentStartup(BaseLSPTest):
+    """Test that a burst of cold CLI invocations elects a single manager."""
+
+    @pytest.fixture
+    def runtime_dir(self, monkeypatch):
+        """A runtime directory of its own, so no other manager is involved."""
+        # Short, since socket paths are limited to ~100 bytes.
+        with tempfile.TemporaryDirectory(prefix="lsp-") as path:
+            monkeypatch.setenv("XDG_RUNTIME_DIR", path)
+            yield path
+
+    def processes(self, pattern, runtime_dir):
+        result = subprocess.run(
+            ["pgrep", "-f", pattern], capture_output=True, text=True
+        )
+        env = f"XDG_RUNTIME_DIR={runtime_dir}".encode()
+        pids = []
+        for pid in result.stdout.split():
+            try:
+                environ = Path(f"/proc/{pid}/environ").read_bytes()
+            except OSError:
+                continue
+            if env in environ.split(b"\0"):
+                pids.append(pid)
+        return pids
+
+    def test_concurrent_cold_start(self, test_project_file, runtime_dir):
+        """Test that 50 concurrent invocations start one manager and one server."""
+        import concurrent.futures
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=50) as executor:
+            futures = [
+                executor.submit(
+                    self.run_lsp_command,
+                    "server",
+                    "start",
+                    str(test_project_file),
+                    timeout=120,
+                )
+                for _ in range(50)
+            ]
+            results = [f.result() for f in futures]
+
+        try:
+            failures = [r.stderr for r in results if r.returncode != 0]
+            assert not failures, f"Some concurrent starts failed: {failures}"
+
+            managers = self.processes(r"python.* -m lsp_cli\.manager$", runtime_dir)
+            assert len(managers) == 1
+            servers = self.processes("basedpyright-langserver", runtime_dir)
+            assert len(servers) == 1
+
+            result = self.run_lsp_command("server", "list")
+            assert result.returncode == 0, f"Command failed: {result.stderr}"
+            assert len(result.stdout.strip().splitlines()) == 1
+        finally:
+            # Only the manager of this runtime directory.
+            self.run_lsp_command("server", "shutdown")
+
+
+class TestShell:
+    """Test running several commands through one `lsp shell` session."""
+
+    def test_shell_runs_piped_commands(self, test_project_file):
+        """Test that piped commands all run, and bad lines do not end the session."""
+        commands = "\n".join(
+            [
+                f"server start {test_project_file}",
+                "# comments and blank lines are skipped",
+                "",
+                "bogus",
+                'outline "unclosed',
+                f"outline {test_project_file}",
+                "server list",
+            ]
+        )
+        result = subprocess.run(
+            ["uv", "run", "lsp", "shell"],
+            input=commands + "\n",
+            capture_output=True,
+            text=True,
+            timeout=60,
+            cwd=Path(__file__).parent.parent,
+        )
+        assert result.returncode == 0, f"Command failed: {result.stderr}"
+        assert "Success" in result.stdout
+        assert "Unknown command" in result.stderr
+        assert "Invalid command" in result.stderr
+        # One timing line per executed command
+        assert result.stderr.count(" ms]") == 4
+
+
+class TestRaw(BaseLSPTest):
+    """Test raw JSON-RPC passthrough with `lsp raw`."""
+
+    def test_raw_request_returns_json_result(self, test_project_file):
+        """Test that a raw request is forwarded and its result printed as JSON."""
+        params = json.dumps({"textDocument": {"uri": test_project_file.as_uri()}})
+        result = self.run_lsp_command(
+            "raw", "textDocument/documentSymbol", params, timeout=60
+        )
+        assert result.returncode == 0, f"Command failed: {result.stderr}"
+        assert isinstance(json.loads(result.stdout), list)
+
+    def test_raw_request_reports_server_errors(self, test_project_file):
+        """Test that a JSON-RPC error from the server is reported."""
+        result = self.run_lsp_command(
+            "raw",
+            "textDocument/doesNotExist",
+            "{}",
+            "--file-path",
+            str(test_project_file),
+        )
+        assert "An error occurred" in result.stderr
+
+    def test_raw_rejects_invalid_params(self):
+        """Test that malformed params JSON is rejected before connecting."""
+        result = self.run_lsp_command("raw", "workspace/symbol", "{")
+        assert "Invalid params JSON" in result.stderr
+
+
+class TestDiagnostics(BaseLSPTest):
+    """Test `lsp diagnostics`."""
+
+    def test_diagnostics_reports_summary(self, test_project_file):
+        """Test that diagnostics for a file end with a summary line."""
+        result = self.run_lsp_command("diagnostics", str(test_project_file), timeout=60)
+        assert result.returncode == 0, f"Command failed: {result.stderr}"
+        assert "in 1 file" in result.stdout.splitlines()[-1]
@@ -2,7 +2,14 @@ from pathlib import Path
 
 import pytest
 
-from lsp_cli.client import find_target
+from lsp_cli.client import (
+    find_monorepo_root,
+    find_target,
+    find_targets,
+    match_target,
+    match_targets,
+)
+from lsp_cli.settings import settings
 
 
 @pytest.fixture
@@ -81,3 +88,98 @@ def test_find_no_client():
     path = Path("/tmp/nonexistent_project_12345/file.txt")
     target = find_target(path)
     assert target is None
+
+
+def _make_monorepo(root: Path) -> None:
+    (root / "pnpm-workspace.yaml").write_text("packages:\n  - packages/*\n")
+    for name in ("a", "b"):
+        package = root / "packages" / name
+        package.mkdir(parents=True)
+        (package / "pyproject.toml").write_text(f'[project]\nname = "{name}"\n')
+        (package / "main.py").write_text("x = 1\n")
+
+
+def test_find_monorepo_root(tmp_path):
+    _make_monorepo(tmp_path)
+    project = tmp_path / "packages" / "a"
+
+    assert find_monorepo_root(project) is None
+    assert find_monorepo_root(project, detect=True) == tmp_path.resolve()
+    # Configured roots win over detected ones, the nearest first.
+    assert (
+        find_monorepo_root(project, [tmp_path, tmp_path / "packages"])
+        == (tmp_path / "packages").resolve()
+    )
+    assert find_monorepo_root(project, [tmp_path / "other"]) is None
+
+
+def test_find_target_in_monorepo(tmp_path, monkeypatch):
+    _make_monorepo(tmp_path)
+    monkeypatch.setattr(settings, "monorepo_detect", True)
+
+    targets = [
+        find_target(tmp_path / "packages" / name / "main.py") for name in ("a", "b")
+    ]
+    assert targets[0] is not None
+    assert targets[0] == targets[1]
+    assert targets[0].project_path == tmp_path.resolve()
+    assert targets[0].monorepo
+
+
+def test_find_targets(tmp_path):
+    for rel, marker in (
+        ("tools", "pyproject.toml"),
+        ("tools/sub", "pyproject.toml"),
+        ("engine", "Cargo.toml"),
+        ("node_modules/dep", "package.json"),
+    ):
+        (tmp_path / rel).mkdir(parents=True)
+        (tmp_path / rel / marker).write_text("")
+
+    # Projects below the path are only started for when asked for.
+    assert find_targets(tmp_path, max_targets=8) == []
+    targets = find_targets(tmp_path, max_targets=8, subprojects=True)
+    # Only the outermost project of each language, and none in dependencies.
+    assert sorted(t.project_path.relative_to(tmp_path).as_posix() for t in targets) == [
+        "engine",
+        "tools",
+    ]
+    assert len(find_targets(tmp_path, max_targets=1, subprojects=True)) == 1
+    # The project containing the path wins over those below it.
+    [target] = find_targets(tmp_path / "tools", max_targets=8, subprojects=True)
+    assert target.project_path == tmp_path / "tools"
+    # Inside a project, other languages count only at its root.
+    [target] = find_targets(tmp_path / "tools" / "sub", max_targets=8)
+    assert target.project_path == tmp_path / "tools" / "sub"
+    (tmp_path / "tools" / "package.json").write_text("{}")
+    (tmp_path / "tools" / "lib").mkdir()
+    languages = {
+        t.client_cls.get_language_config().kind.value: t.project_path
+        for t in find_targets(tmp_path / "tools" / "lib", max_targets=8)
+    }
+    assert languages == {
+        "python": tmp_path / "tools",
+        "typescript": tmp_path / "tools",
+    }
+
+
+def test_polyglot_project(tmp_path):
+    (tmp_path / "pyproject.toml").write_text("")
+    (tmp_path / "package.json").write_text("{}")
+    (tmp_path / "main.py").write_text("")
+    (tmp_path / "index.ts").write_text("")
+
+    languages = {
+        t.client_cls.get_language_config().kind.value for t in match_targets(tmp_path)
+    }
+    assert {"python", "typescript"} <= languages
+    assert {
+        t.client_cls.get_language_config().kind.value
+        for t in find_targets(tmp_path, max_targets=8)
+    } == languages
+
+    # Files are routed to the client of their language.
+    for name, language in (("main.py", "python"), ("index.ts", "typescript")):
+        target = match_target(tmp_path, tmp_path / name)
+        assert target is not None
+        assert target.client_cls.get_language_config().kind.value == language
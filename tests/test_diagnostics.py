@@ -0,0 +1,90 @@
+import anyio
+import pytest
+
+from lsp_cli.manager.diagnostics import DiagnosticsStore
+from lsp_cli.manager.models import DiagnosticsResponse
+
+
+def publish(store, path, version, *messages, severity=1):
+    params = {
+        "uri": path.as_uri(),
+        "diagnostics": [
+            {
+                "range": {
+                    "start": {"line": 0, "character": 4},
+                    "end": {"line": 0, "character": 5},
+                },
+                "severity": severity,
+                "message": message,
+                "source": "checker",
+                "code": 42,
+            }
+            for message in messages
+        ],
+    }
+    if version is not None:
+        params["version"] = version
+    store.publish(
+        {
+            "jsonrpc": "2.0",
+            "method": "textDocument/publishDiagnostics",
+            "params": params,
+        }
+    )
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_text("x = 1\n")
+    return path
+
+
+def test_published_diagnostics_are_stored_until_the_file_changes(source):
+    store = DiagnosticsStore()
+    publish(store, source, 0, "bad")
+
+    mtime_ns = source.stat().st_mtime_ns
+    [item] = store.get(source, mtime_ns)
+    assert (item.line, item.character, item.severity) == (1, 5, "error")
+    assert (item.source, item.code) == ("checker", "42")
+
+    assert store.get(source, mtime_ns + 1) is None
+
+
+def test_stale_versions_and_close_retractions_are_ignored(source):
+    store = DiagnosticsStore()
+    mtime_ns = source.stat().st_mtime_ns
+    publish(store, source, 2, "new")
+    publish(store, source, 1, "old")
+    # Sent by servers that only check open documents, when it is closed.
+    publish(store, source, None)
+    assert [d.message for d in store.get(source, mtime_ns)] == ["new"]
+
+    publish(store, source, None, "workspace", severity=2)
+    assert [d.severity for d in store.get(source, mtime_ns)] == ["warning"]
+
+
+@pytest.mark.asyncio
+async def test_updated_event_is_set_on_next_publish(source):
+    store = DiagnosticsStore()
+    updated = store.updated(source)
+    publish(store, source, 0)
+    with anyio.fail_after(1):
+        await updated.wait()
+    assert store.get(source, source.stat().st_mtime_ns) == []
+
+
+def test_format_summarizes_counts(source):
+    store = DiagnosticsStore()
+    publish(store, source, 0, "bad\ndetails")
+    resp = DiagnosticsResponse(
+        items=store.get(source, source.stat().st_mtime_ns),
+        checked_files=1,
+        unchecked_files=2,
+    )
+    assert resp.format().splitlines() == [
+        f"{source}:1:5: error: bad",
+        "    details [checker 42]",
+        "1 error, 0 warnings in 1 file (2 files not checked)",
+    ]
@@ -0,0 +1,74 @@
+import hashlib
+import inspect
+from pathlib import Path
+
+import pytest
+from lsap.capability.reference import ReferenceCapability
+
+from lsp_cli.manager import documents
+from lsp_cli.manager.documents import (
+    CachedReferenceCapability,
+    Document,
+    DocumentStore,
+)
+
+
+def test_lines_are_sliced_from_the_index(tmp_path: Path):
+    path = tmp_path / "a.py"
+    path.write_bytes(b"one\r\ntwo\rthree\nfour")
+    doc = Document.load(path)
+    assert doc.line_count == 4
+    assert [doc.line(i) for i in range(4)] == ["one", "two", "three", "four"]
+    assert doc.line(4) == ""
+    assert doc.text == "one\ntwo\nthree\nfour"
+
+
+def test_columns_convert_between_utf16_and_characters(tmp_path: Path):
+    path = tmp_path / "a.py"
+    path.write_text('s = "é😀" + x\nascii\n', encoding="utf-8")
+    doc = Document.load(path)
+    # The emoji takes two UTF-16 code units.
+    assert doc.to_utf16(0, 11) == 12
+    assert doc.to_character(0, 12) == 11
+    assert doc.to_character(1, 3) == 3
+
+
+def test_large_files_are_mapped(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(documents, "MMAP_THRESHOLD", 8)
+    path = tmp_path / "big.py"
+    path.write_text("x = 1\ny = 2\n")
+    doc = Document.load(path)
+    assert not isinstance(doc.data, bytes)
+    assert doc.line(1) == "y = 2"
+
+
+@pytest.mark.asyncio
+async def test_store_reloads_changed_files_and_evicts_past_budget(tmp_path: Path):
+    a, b = tmp_path / "a.py", tmp_path / "b.py"
+    a.write_text("a = 1\n")
+    b.write_text("b = 2\n")
+    store = DocumentStore(max_bytes=10)
+
+    first = await store.get(a)
+    assert await store.get(a) is first
+
+    a.write_text("a = 10\n")
+    second = await store.get(a)
+    assert second.line(0) == "a = 10"
+
+    # Both files do not fit, so reading `b` evicts `a`.
+    await store.get(b)
+    assert await store.get(a) is not second
+
+
+def test_reference_override_matches_upstream():
+    # `CachedReferenceCapability._process_reference` is a copy of lsap's; a
+    # change upstream must be merged into it before this pin is updated.
+    source = inspect.getsource(ReferenceCapability._process_reference)
+    assert hashlib.sha256(source.encode()).hexdigest() == (
+        "779cf398a4ecac3fef22aea6fb65393f0ca4593b68649fb153ba81740b810103"
+    )
+    assert "self._process_reference)(" in inspect.getsource(ReferenceCapability)
+    assert inspect.signature(
+        CachedReferenceCapability._process_reference, eval_str=True
+    ) == inspect.signature(ReferenceCapability._process_reference, eval_str=True)
@@ -0,0 +1,344 @@
+import os
+from pathlib import Path
+from typing import Any, cast
+
+import pytest
+from lsap.capability.rename import (
+    CachedRename,
+    RenamePreviewCapability,
+    _preview_cache,
+)
+from lsap.exception import NotFoundError
+from lsap.schema.locate import Locate
+from lsap.schema.rename import RenamePreviewRequest
+from lsap.utils.document import DocumentReader
+from lsp_client import Client
+from lsp_client.exception import EditApplicationError
+from lsp_client.utils.uri import from_local_uri
+from lsprotocol.types import (
+    OptionalVersionedTextDocumentIdentifier,
+    Position,
+    PrepareRenameDefaultBehavior,
+    PrepareRenamePlaceholder,
+    Range,
+    TextDocumentEdit,
+    TextEdit,
+    WorkspaceEdit,
+)
+
+from lsp_cli.cli.rename import parse_batch
+from lsp_cli.edits import apply, previews, upstream
+from lsp_cli.edits.batch import RenameBatchCapability, merge_renames
+from lsp_cli.edits.capability import StoredRenamePreviewCapability
+from lsp_cli.edits.exclude import ExcludeMatcher, absolute_patterns
+from lsp_cli.edits.models import RenameBatchRequest
+from lsp_cli.edits.previews import CompactEdit, PreviewStore
+
+
+def rename(line: int, start: int, end: int, new_text: str) -> TextEdit:
+    return TextEdit(
+        range=Range(
+            start=Position(line=line, character=start),
+            end=Position(line=line, character=end),
+        ),
+        new_text=new_text,
+    )
+
+
+@pytest.mark.parametrize(
+    ("path", "excluded"),
+    [
+        ("tests/test_a.py", True),
+        ("pkg/tests/test_b.py", True),
+        ("stubs/a.pyi", True),
+        ("gen/deep/gen_c.py", True),
+        ("docs/conf.py", True),
+        ("docs/index.py", False),
+        ("src/a.py", False),
+    ],
+)
+def test_exclude_patterns(tmp_path: Path, path: str, excluded: bool):
+    matcher = ExcludeMatcher.compile(
+        tmp_path, ["tests/", "*.pyi", "gen/**/gen_*.py", "./docs/conf.py"]
+    )
+    assert matcher(tmp_path / path) is excluded
+
+
+def test_exclude_paths_from_the_current_directory(tmp_path: Path):
+    root = tmp_path / "proj"
+    patterns = absolute_patterns(
+        [str(root / "src" / "a.py"), "./gen/*.py", "../docs", "tests"],
+        root / "src",
+    )
+    matcher = ExcludeMatcher.compile(root, patterns)
+    for path, excluded in (
+        ("src/a.py", True),
+        ("src/gen/b.py", True),
+        ("gen/b.py", False),
+        ("docs/index.md", True),
+        ("src/tests/test_a.py", True),
+        ("src/b.py", False),
+        # Paths are anchored, unlike bare names.
+        ("src/src/a.py", False),
+    ):
+        assert matcher(root / path) is excluded, path
+
+
+@pytest.mark.parametrize("pattern", ["/elsewhere/a.py", "../a.py", "src/../../a.py"])
+def test_exclude_patterns_outside_of_the_root(tmp_path: Path, pattern: str):
+    with pytest.raises(ValueError, match="outside"):
+        ExcludeMatcher.compile(tmp_path, [pattern])
+
+
+def test_staged_files_keep_line_endings_and_mode(tmp_path: Path):
+    path = tmp_path / "a.py"
+    path.write_bytes(b"old = 1\r\nprint(old)\r\n")
+    path.chmod(0o755)
+
+    staged = apply._stage(
+        path.as_uri(),
+        path,
+        None,
+        "utf-8",
+        [rename(0, 0, 3, "new"), rename(1, 6, 9, "new")],
+    )
+    assert path.read_bytes() == b"old = 1\r\nprint(old)\r\n"
+
+    apply._commit([staged])
+    assert path.read_bytes() == b"new = 1\r\nprint(new)\r\n"
+    assert path.stat().st_mode & 0o777 == 0o755
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def _commit_rename(path: Path) -> None:
+    staged = apply._stage(path.as_uri(), path, None, "utf-8", [rename(0, 0, 3, "new")])
+    apply._commit([staged])
+
+
+def test_links_are_written_through(tmp_path: Path):
+    target = tmp_path / "a.py"
+    target.write_text("old = 1\n")
+    link = tmp_path / "link.py"
+    link.symlink_to(target)
+    hardlink = tmp_path / "hard.py"
+    hardlink.hardlink_to(target)
+
+    _commit_rename(link)
+    assert link.is_symlink()
+    assert target.read_text() == hardlink.read_text() == "new = 1\n"
+
+    _commit_rename(hardlink)
+    assert target.stat().st_ino == hardlink.stat().st_ino
+    assert target.read_text() == "new = 1\n"
+    assert sorted(tmp_path.iterdir()) == [target, hardlink, link]
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "geteuid") or os.geteuid() != 0, reason="needs to chown"
+)
+def test_staged_files_keep_owner(tmp_path: Path):
+    path = tmp_path / "a.py"
+    path.write_text("old = 1\n")
+    os.chown(path, 1234, 5678)
+
+    _commit_rename(path)
+    assert path.read_text() == "new = 1\n"
+    assert (path.stat().st_uid, path.stat().st_gid) == (1234, 5678)
+
+
+def test_failed_commit_restores_replaced_files(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    paths = [tmp_path / f"{name}.py" for name in "abc"]
+    for path in paths:
+        path.write_text("old = 1\n")
+    staged = [
+        apply._stage(path.as_uri(), path, None, "utf-8", [rename(0, 0, 3, "new")])
+        for path in paths
+    ]
+
+    replace = Path.replace
+
+    def failing_replace(self: Path, target: Path) -> Path:
+        if target == paths[2]:
+            raise PermissionError(target)
+        return replace(self, target)
+
+    monkeypatch.setattr(Path, "replace", failing_replace)
+    with pytest.raises(PermissionError):
+        apply._commit(staged)
+
+    assert [path.read_text() for path in paths] == ["old = 1\n"] * 3
+    assert sorted(tmp_path.iterdir()) == paths
+
+
+def preview(
+    uri: str, edits: list[TextEdit] | None = None, new_name: str = "new"
+) -> CachedRename:
+    edit = WorkspaceEdit(
+        document_changes=[
+            TextDocumentEdit(
+                text_document=OptionalVersionedTextDocumentIdentifier(
+                    uri=uri, version=3
+                ),
+                edits=edits or [rename(0, 0, 3, "new"), rename(4, 2, 5, "new")],
+            )
+        ]
+    )
+    return CachedRename(edit=edit, old_name="old", new_name=new_name)
+
+
+def test_previews_round_trip_through_the_compact_form():
+    store = PreviewStore(ttl=60, max_bytes=1 << 20)
+    rename_preview = preview("file:///a.py")
+    store.put("r1", rename_preview)
+    assert store.get("r1") == rename_preview
+
+
+def test_previews_expire(monkeypatch: pytest.MonkeyPatch):
+    now = 1000.0
+    monkeypatch.setattr(previews.time, "monotonic", lambda: now)
+    store = PreviewStore(ttl=60, max_bytes=1 << 20)
+    store.put("r1", preview("file:///a.py"))
+
+    now += 61
+    with pytest.raises(NotFoundError, match="expired"):
+        store.get("r1")
+
+
+def test_least_recently_used_previews_are_evicted_past_the_budget():
+    size = CompactEdit.compact(preview("file:///a.py").edit).size
+    store = PreviewStore(ttl=60, max_bytes=size * 2)
+
+    store.put("r1", preview("file:///a.py"))
+    store.put("r2", preview("file:///b.py"))
+    store.get("r1")
+    store.put("r3", preview("file:///c.py"))
+
+    store.get("r1")
+    store.get("r3")
+    with pytest.raises(NotFoundError):
+        store.get("r2")
+
+
+def test_batch_renames_merge_and_keep_shared_edits_once():
+    edit = merge_renames(
+        [
+            preview("file:///a.py", [rename(0, 0, 3, "x"), rename(2, 0, 3, "x")]),
+            preview("file:///a.py", [rename(2, 0, 3, "x"), rename(2, 4, 7, "y")]),
+            preview("file:///b.py", [rename(0, 0, 3, "z")]),
+        ]
+    )
+    [a, b] = edit.document_changes
+    assert a.text_document.version == 3
+    assert [(e.range.start.line, e.range.start.character) for e in a.edits] == [
+        (0, 0),
+        (2, 0),
+        (2, 4),
+    ]
+    assert len(b.edits) == 1
+
+
+def test_batch_renames_with_overlapping_edits_conflict():
+    with pytest.raises(EditApplicationError, match=r"a\.py:1: `old` → `x` and"):
+        merge_renames(
+            [
+                preview("file:///a.py", [rename(0, 0, 3, "x")], new_name="x"),
+                preview("file:///a.py", [rename(0, 1, 3, "y")], new_name="y"),
+            ]
+        )
+
+
+@pytest.mark.asyncio
+async def test_batch_rename_failures_are_reported_per_rename(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    async def failing_rename(
+        self: RenameBatchCapability, req: RenamePreviewRequest
+    ) -> CachedRename:
+        match req.new_name:
+            case "a":
+                raise ValueError("Unknown PrepareRenameResult type")
+            case "b":
+                raise FileNotFoundError("src/b.py")
+            case _:
+                raise NotFoundError("nothing to rename there")
+
+    monkeypatch.setattr(RenameBatchCapability, "_rename", failing_rename)
+    capability = RenameBatchCapability(
+        cast(Client, None), preview=cast(StoredRenamePreviewCapability, None)
+    )
+    renames = [
+        RenamePreviewRequest(
+            locate=Locate(file_path=Path(f"src/{name}.py"), find="x"), new_name=name
+        )
+        for name in "abc"
+    ]
+    with pytest.raises(NotFoundError) as e:
+        await capability(RenameBatchRequest(renames=renames))
+    assert str(e.value).splitlines() == [
+        "Cannot rename:",
+        "src/a.py → a: Unknown PrepareRenameResult type",
+        "src/b.py → b: src/b.py",
+        "src/c.py → c: nothing to rename there",
+    ]
+
+
+def test_upstream_old_name():
+    reader = DocumentReader("def old_name(): pass\n")
+    pos = Position(line=0, character=6)
+    span = Range(
+        start=Position(line=0, character=4), end=Position(line=0, character=12)
+    )
+    assert upstream.old_name(reader, pos, span) == "old_name"
+    assert (
+        upstream.old_name(
+            reader, pos, PrepareRenamePlaceholder(range=span, placeholder="shown")
+        )
+        == "shown"
+    )
+    assert (
+        upstream.old_name(
+            reader, pos, PrepareRenameDefaultBehavior(default_behavior=True)
+        )
+        == "old_name"
+    )
+    with pytest.raises(ValueError):
+        upstream.old_name(reader, pos, cast(Any, None))
+
+
+@pytest.mark.asyncio
+async def test_upstream_file_changes_and_preview_cache(tmp_path: Path):
+    path = tmp_path / "a.py"
+    path.write_text("old = 1\nprint(old)\n")
+
+    class FakeClient:
+        def from_uri(self, uri: str, relative: bool = True) -> Path:
+            path = Path(from_local_uri(uri))
+            return path.relative_to(tmp_path) if relative else path
+
+        async def read_file(self, file_path: Path) -> str:
+            return file_path.read_text()
+
+    capability = RenamePreviewCapability(cast(Client, FakeClient()))
+    cached = preview(path.as_uri(), [rename(0, 0, 3, "new"), rename(1, 6, 9, "new")])
+    [change] = await upstream.file_changes(capability, cached.edit)
+    assert change.file_path == Path("a.py")
+    assert [(d.line, d.original, d.modified) for d in change.diffs] == [
+        (1, "old = 1", "new = 1"),
+        (2, "print(old)", "print(new)"),
+    ]
+
+    _preview_cache.put("r1", cached)
+    assert upstream.pop_cached_preview("r1") is cached
+    assert upstream.pop_cached_preview("r1") is None
+
+
+def test_batch_spec_lines(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(tmp_path)
+    renames = parse_batch("# migration\n\nsrc/a.py  Foo.bar  baz\n")
+    assert [(r.locate.file_path, r.new_name) for r in renames] == [
+        (tmp_path / "src/a.py", "baz")
+    ]
+    with pytest.raises(ValueError, match="Line 1"):
+        parse_batch("src/a.py Foo\n")
@@ -0,0 +1,89 @@
+"""Guard the CLI startup path against importing the server stack."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+# Only the manager process may load these.
+SERVER_MODULES = (
+    "litestar",
+    "uvicorn",
+    "asyncer",
+    "lsp_client",
+    "lsp_cli.manager.manager",
+    "lsp_cli.manager.client",
+)
+
+# Resolving `lsp server list` takes ~0.8s on a laptop. The ceiling only catches
+# gross regressions, with room for loaded runners; which modules are imported is
+# checked exactly below.
+SERVER_COMMAND_BUDGET = 2.5
+
+
+def loaded_modules(*argv: str) -> set[str]:
+    """Resolve the command for argv in a fresh interpreter and return `sys.modules`.
+
+    What gets imported, unlike how long it takes, does not depend on how loaded
+    the machine is.
+    """
+    code = (
+        "import json, sys; import lsp_cli.__main__ as m; "
+        f"m.app.parse_args({list(argv)!r}); print(json.dumps(list(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    # `--help` prints before the module list.
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+
+def import_seconds(*argv: str) -> float:
+    """Time importing the CLI and resolving the command for argv, lazy imports included."""
+    code = (
+        "import time; start = time.perf_counter(); import lsp_cli.__main__ as m; "
+        f"m.app.parse_args({list(argv)!r}); print(time.perf_counter() - start)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.splitlines()[-1])
+
+
+def imported(modules: set[str], module: str) -> bool:
+    return any(name == module or name.startswith(f"{module}.") for name in modules)
+
+
+@pytest.mark.parametrize(
+    ("argv", "command"),
+    [
+        (["server", "list"], "lsp_cli.cli.server"),
+        (["definition", "--help"], "lsp_cli.cli.definition"),
+        (["shell", "--help"], "lsp_cli.cli.shell"),
+    ],
+)
+def test_command_does_not_import_server_stack(argv: list[str], command: str):
+    modules = loaded_modules(*argv)
+    # The lazy command itself was loaded, and every command connects to the
+    # manager.
+    assert command in modules
+    assert "lsp_cli.cli.connect" in modules
+    loaded = [m for m in SERVER_MODULES if imported(modules, m)]
+    assert not loaded, f"`lsp {' '.join(argv)}` imports server modules: {loaded}"
+
+
+def test_commands_are_loaded_lazily():
+    modules = loaded_modules("server", "list")
+    eager = [
+        name
+        for name in ("lsp_cli.cli.rename", "lsp_cli.cli.search", "lsp_cli.cli.calls")
+        if name in modules
+    ]
+    assert not eager, f"`lsp server list` imports other commands: {eager}"
+
+
+def test_server_command_import_budget():
+    # The fastest of a few runs, so a single slow start does not fail it.
+    seconds = min(import_seconds("server", "list") for _ in range(3))
+    assert seconds < SERVER_COMMAND_BUDGET, f"Imports took {seconds:.2f}s"
@@ -0,0 +1,96 @@
+from pathlib import Path
+
+from lsprotocol.types import DocumentSymbol, Position, Range, SymbolKind
+
+from lsp_cli.cli.index import INDEX_VERSION, assign_files, read_index
+from lsp_cli.manager.documents import Document
+from lsp_cli.manager.index import flatten_symbols
+from lsp_cli.manager.models import CreateClientResponse, ManagedClientInfo
+
+
+def _range(line: int, start: int, end_line: int, end: int) -> Range:
+    return Range(
+        start=Position(line=line, character=start),
+        end=Position(line=end_line, character=end),
+    )
+
+
+def test_flatten_symbols(tmp_path: Path):
+    path = tmp_path / "a.py"
+    path.write_text(
+        'class Café:\n    def f(self): ...\ns = "😀"; x = 1\n', encoding="utf-8"
+    )
+    method = DocumentSymbol(
+        name="f",
+        kind=SymbolKind.Method,
+        range=_range(1, 4, 1, 20),
+        selection_range=_range(1, 8, 1, 9),
+    )
+    symbols = [
+        DocumentSymbol(
+            name="Café",
+            kind=SymbolKind.Class,
+            range=_range(0, 0, 1, 20),
+            selection_range=_range(0, 6, 0, 10),
+            children=[method],
+        ),
+        DocumentSymbol(
+            name="x",
+            kind=SymbolKind.Variable,
+            range=_range(2, 10, 2, 15),
+            # The emoji before it takes two UTF-16 code units.
+            selection_range=_range(2, 10, 2, 11),
+        ),
+    ]
+    assert flatten_symbols(symbols, Document.load(path)) == [
+        ("Café", "class", 1, 7, 2, -1),
+        ("f", "method", 2, 9, 2, 0),
+        ("x", "variable", 3, 10, 3, -1),
+    ]
+
+
+def _client(project: Path, language: str, suffixes: list[str]) -> CreateClientResponse:
+    return CreateClientResponse(
+        uds_path=Path("/tmp/x.sock"),
+        info=ManagedClientInfo(
+            project_path=project,
+            language=language,
+            remaining_time=0,
+            suffixes=suffixes,
+        ),
+    )
+
+
+def test_files_go_to_the_innermost_project_of_their_language():
+    clients = [
+        _client(Path("/repo"), "python", [".py"]),
+        _client(Path("/repo/tools"), "python", [".py"]),
+        _client(Path("/repo/web"), "typescript", [".ts"]),
+    ]
+    files = [
+        Path("/repo/a.py"),
+        Path("/repo/tools/b.py"),
+        Path("/repo/web/c.ts"),
+        Path("/repo/d.ts"),
+    ]
+    assert assign_files(files, clients) == {
+        0: [Path("/repo/a.py")],
+        1: [Path("/repo/tools/b.py")],
+        2: [Path("/repo/web/c.ts")],
+    }
+
+
+def test_previous_exports_of_other_directories_are_ignored(tmp_path: Path):
+    output = tmp_path / "index.jsonl"
+    assert read_index(output, tmp_path) == {}
+
+    header = f'{{"version":{INDEX_VERSION},"root":"{tmp_path.as_posix()}"}}'
+    record = '{"path":"a.py","language":"python","hash":"1","symbols":[]}'
+    output.write_text(f"{header}\n{record}\n")
+    assert read_index(output, tmp_path) == {
+        "a.py": {"path": "a.py", "language": "python", "hash": "1", "symbols": []}
+    }
+    assert read_index(output, tmp_path / "sub") == {}
+
+    output.write_text(f"{header}\nnot json\n")
+    assert read_index(output, tmp_path) == {}
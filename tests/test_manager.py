@@ -0,0 +1,107 @@
+import signal
+from pathlib import Path
+
+import anyio
+import pytest
+from litestar import Litestar
+
+from lsp_cli.client import find_target
+from lsp_cli.manager import client as managed_client
+from lsp_cli.manager import manager as manager_module
+from lsp_cli.manager.client import ManagedClient
+from lsp_cli.manager.manager import Manager, get_manager
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(manager_module, "MANAGER_LOG_PATH", tmp_path / "manager.log")
+    monkeypatch.setattr(
+        managed_client, "get_client_log_path", lambda id: tmp_path / f"{id}.log"
+    )
+    (tmp_path / "proj").mkdir()
+    (tmp_path / "proj" / "pyproject.toml").write_text("")
+    (tmp_path / "proj" / "main.py").write_text("")
+    return tmp_path / "proj"
+
+
+@pytest.mark.asyncio
+async def test_client_stops_before_serving(project: Path):
+    target = find_target(project / "main.py")
+    assert target is not None
+    client = ManagedClient(target)
+    client.stop()
+    assert not client.is_running
+
+
+@pytest.mark.asyncio
+async def test_concurrent_creation_starts_one_client(
+    project: Path, monkeypatch: pytest.MonkeyPatch
+):
+    started: list[str] = []
+
+    async def run(self: ManagedClient) -> None:
+        started.append(self.id)
+        # Other callers arrive while the client is still starting.
+        await anyio.sleep(0.05)
+        self._ready_event.set()
+        while self.is_running:
+            await anyio.sleep(0.01)
+        self._stopped_event.set()
+
+    monkeypatch.setattr(ManagedClient, "run", run)
+    clients: list[ManagedClient] = []
+
+    async def create() -> None:
+        clients.append(await manager.create_client(project / "main.py"))
+
+    async with Manager().run() as manager:
+        async with anyio.create_task_group() as tg:
+            for _ in range(5):
+                tg.start_soon(create)
+        assert len(started) == 1
+        assert len(clients) == 5
+        assert all(client is clients[0] for client in clients)
+        assert len(manager.list_clients()) == 1
+
+
+@pytest.mark.asyncio
+async def test_client_failing_to_start_leaves_the_manager_running(
+    project: Path, monkeypatch: pytest.MonkeyPatch
+):
+    target = find_target(project / "main.py")
+    assert target is not None
+
+    class FailingClient(target.client_cls):
+        async def __aenter__(self):
+            raise RuntimeError("no language server here")
+
+    monkeypatch.setattr(managed_client, "RUNTIME_DIR", project.parent)
+    monkeypatch.setattr(
+        managed_client, "caching_client", lambda client_cls, documents: FailingClient
+    )
+    async with Manager().run() as manager:
+        with pytest.raises(RuntimeError, match="no language server here"):
+            await manager.create_client(project / "main.py")
+        clients, [error] = await manager.create_clients(project)
+        assert not clients
+        assert error.startswith(f"python {project}: Failed to start client")
+        assert error.endswith("no language server here")
+        assert not manager.list_clients()
+
+
+@pytest.mark.asyncio
+async def test_manager_failure_stops_the_server(
+    project: Path, monkeypatch: pytest.MonkeyPatch
+):
+    raised: list[int] = []
+    monkeypatch.setattr(manager_module.signal, "raise_signal", raised.append)
+
+    async def fail() -> None:
+        raise RuntimeError("task failed")
+
+    app = Litestar()
+    with pytest.raises(ExceptionGroup):
+        async with manager_module.lifespan(app):
+            get_manager(app.state)._tg.soonify(fail)()
+            await anyio.sleep_forever()
+    assert raised == [signal.SIGINT]
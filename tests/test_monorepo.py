@@ -0,0 +1,49 @@
+from pathlib import Path
+
+from lsp_client.clients.lang import lang_clients
+from lsp_client.utils.workspace import WORKSPACE_ROOT_DIR
+
+from lsp_cli.manager.monorepo import find_projects, monorepo_client, monorepo_workspace
+
+
+def _python_config():
+    for client_cls in lang_clients.values():
+        config = client_cls.get_language_config()
+        if config.kind.value == "python":
+            return client_cls, config
+    raise AssertionError("no Python client")
+
+
+def test_find_projects(tmp_path: Path):
+    _, config = _python_config()
+    (tmp_path / "pyproject.toml").write_text("")
+    for rel in ("libs/a", "libs/a/nested", "apps/b", "node_modules/c", ".venv/d"):
+        (tmp_path / rel).mkdir(parents=True)
+        (tmp_path / rel / "pyproject.toml").write_text("")
+    (tmp_path / "docs").mkdir()
+
+    projects = find_projects(tmp_path, config)
+    assert [p.relative_to(tmp_path).as_posix() for p in projects] == [
+        "apps/b",
+        "libs/a",
+        "libs/a/nested",
+    ]
+
+    workspace = monorepo_workspace(tmp_path, projects)
+    assert workspace[WORKSPACE_ROOT_DIR].path == tmp_path
+    assert workspace["libs/a"].path == tmp_path / "libs" / "a"
+
+
+def test_monorepo_client_paths(tmp_path: Path):
+    base_cls, _ = _python_config()
+    client_cls = monorepo_client(base_cls, tmp_path)
+    assert client_cls.__name__ == base_cls.__name__
+
+    projects = [tmp_path / "libs" / "a"]
+    client = client_cls(workspace=monorepo_workspace(tmp_path, projects))
+    file = tmp_path / "libs" / "a" / "main.py"
+
+    assert client.as_uri(Path("libs/a/main.py")) == file.as_uri()
+    assert client.as_uri(file) == file.as_uri()
+    assert client.from_uri(file.as_uri()) == Path("libs/a/main.py")
+    assert client.from_uri(file.as_uri(), relative=False) == file
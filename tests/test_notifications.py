@@ -0,0 +1,44 @@
+import anyio
+import pytest
+
+from lsp_cli.manager import notifications
+from lsp_cli.manager.notifications import NotificationHub
+
+pytestmark = pytest.mark.asyncio
+
+
+def notification(method: str, value: int = 0) -> dict:
+    return {"jsonrpc": "2.0", "method": method, "params": {"value": value}}
+
+
+async def test_subscribers_receive_their_methods():
+    hub = NotificationHub()
+    with hub.subscribe() as every, hub.subscribe(["$/progress"]) as progress:
+        hub.publish(notification("textDocument/publishDiagnostics"))
+        hub.publish(notification("$/progress"))
+        hub.close()
+
+        assert [n["method"] async for n in every] == [
+            "textDocument/publishDiagnostics",
+            "$/progress",
+        ]
+        assert [n["method"] async for n in progress] == ["$/progress"]
+
+
+async def test_lagging_subscriber_drops_new_notifications(monkeypatch):
+    monkeypatch.setattr(notifications, "SUBSCRIBER_BUFFER", 2)
+    hub = NotificationHub()
+    with hub.subscribe() as received:
+        for value in range(5):
+            hub.publish(notification("$/progress", value))
+        hub.close()
+
+        with anyio.fail_after(1):
+            assert [n["params"]["value"] async for n in received] == [0, 1]
+
+
+async def test_subscribing_after_close_ends_immediately():
+    hub = NotificationHub()
+    hub.close()
+    with hub.subscribe() as received:
+        assert [n async for n in received] == []
@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from lsp_cli.manager.open_documents import OpenDocumentPool
+
+
+def uri(path: Path) -> str:
+    return path.as_uri()
+
+
+def test_idle_documents_are_evicted_least_recently_used(tmp_path: Path):
+    a, b, c = (uri(tmp_path / name) for name in ("a.py", "b.py", "c.py"))
+    for name in ("a.py", "b.py", "c.py"):
+        (tmp_path / name).write_text("x = 1\n")
+    pool = OpenDocumentPool(max_documents=2)
+
+    assert pool.acquire([a, b]) == [a, b]
+    assert pool.release([a, b]) == []
+    # Reusing `a` keeps it open and makes `b` the least recently used.
+    assert pool.acquire([a]) == []
+    assert pool.release([a]) == []
+
+    assert pool.acquire([c]) == [c]
+    assert pool.release([c]) == [b]
+    assert (pool.count, pool.size) == (2, 12)
+
+
+def test_documents_in_use_stay_open_past_the_cap(tmp_path: Path):
+    a, b = (uri(tmp_path / name) for name in ("a.py", "b.py"))
+    for name in ("a.py", "b.py"):
+        (tmp_path / name).write_text("x = 1\n")
+    pool = OpenDocumentPool(max_documents=1)
+
+    pool.acquire([a])
+    pool.acquire([b])
+    assert pool.release([b]) == [b]
+    assert pool.release([a]) == []
+
+
+def test_idle_documents_changed_on_disk_are_stale(tmp_path: Path):
+    path = tmp_path / "a.py"
+    path.write_text("x = 1\n")
+    a = uri(path)
+    pool = OpenDocumentPool(max_documents=8)
+    pool.acquire([a])
+
+    path.write_text("x = 10\n")
+    assert pool.stale([a]) == []  # still in use
+    pool.release([a])
+    assert pool.stale([a]) == [a]
+    assert pool.count == 0
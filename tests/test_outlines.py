@@ -0,0 +1,80 @@
+import pytest
+from lsap.schema.models import SymbolDetailInfo
+from lsprotocol.types import DocumentSymbol, Position, Range, SymbolKind
+
+from lsp_cli.cli.outline import expand_paths, format_compact
+from lsp_cli.manager.outlines import OutlineCache
+from lsp_cli.syntax.models import ApproximateOutlineResponse
+
+RANGE = Range(start=Position(line=0, character=0), end=Position(line=0, character=1))
+SYMBOLS = [
+    DocumentSymbol(
+        name="x", kind=SymbolKind.Variable, range=RANGE, selection_range=RANGE
+    )
+]
+
+
+def test_symbols_are_kept_while_the_content_is_unchanged():
+    cache = OutlineCache(max_entries=8)
+    cache.put("file:///a.py", "x = 1\n", SYMBOLS)
+    assert cache.get("file:///a.py", "x = 1\n") is SYMBOLS
+    assert cache.get("file:///a.py", "x = 2\n") is None
+    assert cache.get("file:///b.py", "x = 1\n") is None
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = OutlineCache(max_entries=2)
+    cache.put("file:///a.py", "a", SYMBOLS)
+    cache.put("file:///b.py", "b", SYMBOLS)
+    cache.get("file:///a.py", "a")
+    cache.put("file:///c.py", "c", SYMBOLS)
+    assert cache.get("file:///a.py", "a") is SYMBOLS
+    assert cache.get("file:///b.py", "b") is None
+
+
+def test_expand_paths(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pkg" / "sub").mkdir(parents=True)
+    for rel in ("a.py", "pkg/b.py", "pkg/sub/c.py", "pkg/notes.txt"):
+        (tmp_path / rel).write_text("")
+
+    files, dirs = expand_paths(["a.py", "pkg/**/*.py", "pkg/sub"])
+    assert [f.relative_to(tmp_path).as_posix() for f in files] == [
+        "a.py",
+        "pkg/b.py",
+        "pkg/sub/c.py",
+    ]
+    assert dirs == [tmp_path / "pkg" / "sub"]
+    assert expand_paths(["*.rs"]) == ([], [])
+    with pytest.raises(FileNotFoundError):
+        expand_paths(["missing.py"])
+
+
+def test_format_compact(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def item(*path: str, kind: str, line: int) -> SymbolDetailInfo:
+        pos = {"line": line, "character": 1}
+        return SymbolDetailInfo(
+            file_path=tmp_path / "a.py",
+            name=path[-1],
+            path=list(path),
+            kind=kind,
+            range={"start": pos, "end": pos},
+        )
+
+    resp = ApproximateOutlineResponse(
+        file_path=tmp_path / "a.py",
+        items=[
+            item("A", kind="class", line=1),
+            item("A", "f", kind="method", line=2),
+            item("g", kind="function", line=5),
+        ],
+        approximate=True,
+    )
+    assert format_compact(resp) == (
+        "## `a.py` (approximate)\n"
+        "- `A` (class):1\n"
+        "  - `f` (method):2\n"
+        "- `g` (function):5"
+    )
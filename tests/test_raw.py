@@ -0,0 +1,91 @@
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, cast
+
+import pytest
+from lsp_client import Client
+from pydantic import BaseModel
+
+from lsp_cli.cli import raw as raw_command
+from lsp_cli.manager.jsonrpc import LspRequest, LspResponse
+from lsp_cli.manager.raw import forward_request
+
+
+@pytest.mark.asyncio
+async def test_raw_command_leaves_out_missing_params(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+):
+    sent: list[tuple[str, Any]] = []
+
+    class FakeClient:
+        async def post(self, url: str, resp_schema: type[BaseModel], *, json: Any):
+            sent.append((url, json.model_dump(mode="json")))
+            return LspResponse(payload={"id": 1, "result": None, "jsonrpc": "2.0"})
+
+    @asynccontextmanager
+    async def connect_server(
+        path: Path, project_path: Path | None = None
+    ) -> AsyncGenerator[FakeClient]:
+        yield FakeClient()
+
+    monkeypatch.setattr(raw_command, "connect_server", connect_server)
+    await raw_command.raw("shutdown")
+    await raw_command.raw("workspace/symbol", '{"query": "x"}')
+    assert sent == [
+        (
+            "/lsp/request",
+            {"payload": {"id": 1, "method": "shutdown", "jsonrpc": "2.0"}},
+        ),
+        (
+            "/lsp/request",
+            {
+                "payload": {
+                    "id": 1,
+                    "method": "workspace/symbol",
+                    "params": {"query": "x"},
+                    "jsonrpc": "2.0",
+                }
+            },
+        ),
+    ]
+    assert capsys.readouterr().out == "null\nnull\n"
+
+
+@pytest.mark.asyncio
+async def test_forwarded_request_leaves_out_missing_params():
+    sent: list[dict[str, Any]] = []
+
+    class FakeServer:
+        async def request(self, raw: dict[str, Any]) -> dict[str, Any]:
+            sent.append(raw)
+            return {"id": raw["id"], "result": None, "jsonrpc": "2.0"}
+
+    class FakeClient:
+        request_timeout = 5
+
+        def get_server(self) -> FakeServer:
+            return FakeServer()
+
+    request = LspRequest.model_validate(
+        {"payload": {"id": 7, "method": "shutdown", "jsonrpc": "2.0"}}
+    )
+    resp = await forward_request(cast(Client, FakeClient()), request)
+    assert resp.payload["id"] == 7
+    [raw] = sent
+    assert {key: value for key, value in raw.items() if key != "id"} == {
+        "method": "shutdown",
+        "jsonrpc": "2.0",
+    }
+    # Null params are rejected rather than passed on.
+    with pytest.raises(ValueError):
+        LspRequest.model_validate(
+            {
+                "payload": {
+                    "id": 7,
+                    "method": "shutdown",
+                    "params": None,
+                    "jsonrpc": "2.0",
+                }
+            }
+        )
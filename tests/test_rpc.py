@@ -0,0 +1,168 @@
+import os
+import socket
+from functools import partial
+
+import anyio
+import pytest
+from anyio.abc import UNIXSocketStream
+from pydantic import BaseModel, RootModel
+
+from lsp_cli.utils import rpc
+from lsp_cli.utils.rpc import (
+    RpcClient,
+    RpcConnection,
+    RpcError,
+    connect_rpc,
+    serve_rpc,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+class Echo(BaseModel):
+    value: str
+    delay: float = 0.0
+
+
+async def push(conn: RpcConnection, value: str) -> None:
+    for i in range(3):
+        await conn.notify("/echoed", {"value": value, "index": i})
+    await anyio.sleep_forever()
+
+
+async def dispatch(method: str, params: object, conn: RpcConnection) -> Echo | None:
+    if method == "/subscribe":
+        conn.start_soon(push, conn, Echo.model_validate(params).value)
+        return None
+    if method != "/echo":
+        raise RpcError(404, f"Unknown method: {method}")
+    echo = Echo.model_validate(params)
+    if echo.value == "fail":
+        raise RuntimeError("boom")
+    await anyio.sleep(echo.delay)
+    return echo
+
+
+async def test_pipelined_requests_resolve_out_of_order(tmp_path):
+    path = tmp_path / "rpc.sock"
+    async with (
+        await anyio.create_unix_listener(path) as listener,
+        anyio.create_task_group() as tg,
+    ):
+        tg.start_soon(partial(serve_rpc, listener, dispatch, shm_threshold=None))
+
+        async with await connect_rpc(path, timeout=5) as client:
+            done: list[str] = []
+
+            async def call(value: str, delay: float) -> None:
+                resp = await client.post(
+                    "/echo", Echo, json=Echo(value=value, delay=delay)
+                )
+                assert resp.value == value
+                done.append(value)
+
+            async with anyio.create_task_group() as calls:
+                calls.start_soon(call, "slow", 0.2)
+                calls.start_soon(call, "fast", 0.0)
+            assert done == ["fast", "slow"]
+
+            with pytest.raises(RpcError) as exc_info:
+                await client.post("/missing", Echo)
+            assert exc_info.value.status == 404
+
+            with pytest.raises(RpcError) as exc_info:
+                await client.post("/echo", Echo, json=Echo(value="fail"))
+            assert (exc_info.value.status, exc_info.value.detail) == (500, "boom")
+
+            # The connection survives errors.
+            assert (
+                await client.post("/echo", Echo, json=Echo(value="ok"))
+            ).value == "ok"
+
+        tg.cancel_scope.cancel()
+
+
+async def test_pending_request_fails_when_server_closes():
+    client_sock, server_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    client_stream = await UNIXSocketStream.from_socket(client_sock)
+    server_stream = await UNIXSocketStream.from_socket(server_sock)
+    async with RpcClient(client_stream, timeout=5) as client:
+        async with anyio.create_task_group() as tg:
+
+            async def close_server() -> None:
+                await anyio.sleep(0.05)
+                await server_stream.aclose()
+
+            tg.start_soon(close_server)
+            with pytest.raises(ConnectionError):
+                await client.post("/echo", Echo, json=Echo(value="lost"))
+
+
+async def test_reply_arriving_as_the_call_gives_up_closes_its_memfd():
+    client_sock, server_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    client_stream = await UNIXSocketStream.from_socket(client_sock)
+    server_stream = await UNIXSocketStream.from_socket(server_sock)
+    fd = rpc.write_memfd(b'{"value":"late"}')
+    async with server_stream, RpcClient(client_stream, timeout=5) as client:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(partial(client.post, "/echo", Echo, json=Echo(value="x")))
+            request = await rpc.recv_frame(rpc.FdReceiveBuffer(server_stream))
+            assert request is not None
+            # The reply arrives after the call timed out or was cancelled, but
+            # before it got to run again.
+            tg.cancel_scope.cancel()
+            assert client._deliver({"id": request["id"], "result_size": 16}, fd)
+    with pytest.raises(OSError):
+        os.fstat(fd)
+
+
+async def test_large_result_is_handed_off_through_memfd(tmp_path, mocker):
+    read_memfd = mocker.spy(rpc, "read_memfd")
+    path = tmp_path / "rpc.sock"
+    async with (
+        await anyio.create_unix_listener(path) as listener,
+        anyio.create_task_group() as tg,
+    ):
+        tg.start_soon(partial(serve_rpc, listener, dispatch, shm_threshold=1024))
+
+        async with await connect_rpc(path, timeout=5) as client:
+            small, large = "x" * 10, "y" * 100_000
+            async with anyio.create_task_group() as calls:
+                for value in (large, small, large):
+                    calls.start_soon(
+                        partial(client.post, "/echo", Echo, json=Echo(value=value))
+                    )
+            resp = await client.post("/echo", Echo, json=Echo(value=large))
+            assert resp.value == large
+            assert read_memfd.call_count == 3
+
+        tg.cancel_scope.cancel()
+
+
+async def test_server_pushes_notifications(tmp_path):
+    path = tmp_path / "rpc.sock"
+    async with (
+        await anyio.create_unix_listener(path) as listener,
+        anyio.create_task_group() as tg,
+    ):
+        tg.start_soon(partial(serve_rpc, listener, dispatch, shm_threshold=None))
+
+        async with await connect_rpc(path, timeout=5) as client:
+            await client.post("/subscribe", RootModel[None], json=Echo(value="hi"))
+            # Replies are still matched up while notifications arrive.
+            assert (
+                await client.post("/echo", Echo, json=Echo(value="ok"))
+            ).value == "ok"
+
+            received = []
+            with anyio.fail_after(5):
+                async for frame in client.notifications():
+                    received.append(frame)
+                    if len(received) == 3:
+                        break
+            assert [f["params"]["index"] for f in received] == [0, 1, 2]
+            assert all(
+                f == {"method": "/echoed", "params": f["params"]} for f in received
+            )
+
+        tg.cancel_scope.cancel()
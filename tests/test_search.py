@@ -0,0 +1,110 @@
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import anyio
+import pytest
+from lsap.schema.models import SymbolKind
+from lsap.schema.search import SearchItem, SearchRequest, SearchResponse
+
+from lsp_cli.cli import search
+from lsp_cli.cli.search import match_rank, merge_results
+from lsp_cli.manager.models import (
+    CreateClientResponse,
+    CreateClientsResponse,
+    ManagedClientInfo,
+)
+from lsp_cli.settings import settings
+
+
+def _item(name: str, file: str, line: int = 1) -> SearchItem:
+    return SearchItem(name=name, kind=SymbolKind.Class, file_path=Path(file), line=line)
+
+
+def test_match_rank():
+    ranks = [
+        match_rank("Config", name)
+        for name in (
+            "Config",
+            "config",
+            "ConfigLoader",
+            "configure",
+            "AppConfig",
+            "Cfg",
+        )
+    ]
+    assert ranks == sorted(ranks) == [0, 1, 2, 3, 4, 5]
+
+
+def test_merge_results():
+    python = [_item("AppConfig", "/a/app.py"), _item("Config", "/a/config.py")]
+    rust = [
+        _item("ConfigLoader", "/b/lib.rs"),
+        _item("AppConfig", "/b/app.rs"),
+        # Reported by both servers, e.g. through overlapping projects.
+        _item("Config", "/a/config.py"),
+    ]
+
+    merged = merge_results("Config", [python, rust])
+    assert [(item.name, item.file_path.as_posix()) for item in merged] == [
+        ("Config", "/a/config.py"),
+        ("ConfigLoader", "/b/lib.rs"),
+        # Equal matches keep their servers' order, interleaved.
+        ("AppConfig", "/a/app.py"),
+        ("AppConfig", "/b/app.rs"),
+    ]
+
+
+def _server(language: str) -> CreateClientResponse:
+    info = ManagedClientInfo(
+        project_path=Path("/a"), language=language, remaining_time=60
+    )
+    return CreateClientResponse(uds_path=Path(f"/{language}.sock"), info=info)
+
+
+@pytest.mark.asyncio
+async def test_search_all_leaves_out_failing_servers(monkeypatch: pytest.MonkeyPatch):
+    class Manager:
+        async def post(self, *args, **kwargs) -> CreateClientsResponse:
+            return CreateClientsResponse(
+                clients=[_server("python"), _server("rust"), _server("go")],
+                errors=["java /a: cannot start"],
+            )
+
+    @asynccontextmanager
+    async def connect_manager():
+        yield Manager()
+
+    async def search_server(
+        server: CreateClientResponse, req: SearchRequest
+    ) -> SearchResponse | None:
+        match server.info.language:
+            case "python":
+                return SearchResponse(
+                    request=req,
+                    items=[_item("Config", "/a/config.py")],
+                    start_index=0,
+                    max_items=req.max_items,
+                    total=1,
+                    has_more=False,
+                    pagination_id="p",
+                )
+            case "rust":
+                raise OSError("connection refused")
+            case _:
+                await anyio.sleep_forever()
+                return None
+
+    monkeypatch.setattr(search, "connect_manager", connect_manager)
+    monkeypatch.setattr(search, "_search_server", search_server)
+    monkeypatch.setattr(settings, "search_timeout", 0.05)
+
+    resp, errors = await search.search_all(
+        Path("/a"), SearchRequest(query="Config", max_items=10)
+    )
+    assert [item.name for item in resp.items] == ["Config"]
+    assert resp.total == 1
+    assert errors == [
+        "java /a: cannot start",
+        "rust /a: connection refused",
+        "go /a: no answer within 0.05s",
+    ]
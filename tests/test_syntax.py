@@ -0,0 +1,79 @@
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+from lsap.utils.symbol import iter_symbols
+from lsprotocol.types import SymbolKind
+
+from lsp_cli.syntax import get_parser
+
+SOURCE = dedent(
+    '''\
+    """Module."""
+    import os
+
+    LIMIT: int = 10
+    a, (b, *c) = 1, (2, 3)
+
+    if os.name == "nt":
+        def helper(): ...
+    else:
+        def helper(): ...
+
+
+    @decorator
+    class Größe(Base, metaclass=Meta):
+        field = 1
+
+        async def run(self, n: int = 0) -> str:
+            local = 1
+
+            def inner(): ...
+
+            return "é" + str(local)
+    '''
+)
+
+
+@pytest.fixture
+def symbols():
+    parser = get_parser(Path("module.py"))
+    assert parser is not None
+    return {
+        ".".join(path): symbol for path, symbol in iter_symbols(parser.parse(SOURCE))
+    }
+
+
+def test_symbols_are_nested_like_the_language_server(symbols):
+    assert set(symbols) == {
+        "LIMIT",
+        "a",
+        "b",
+        "c",
+        "helper",
+        "Größe",
+        "Größe.field",
+        "Größe.run",
+        "Größe.run.inner",
+    }
+    assert symbols["LIMIT"].kind == SymbolKind.Constant
+    assert symbols["LIMIT"].detail == "int"
+    assert symbols["Größe"].kind == SymbolKind.Class
+    assert symbols["Größe"].detail == "(Base, metaclass=Meta)"
+    assert symbols["Größe.run"].kind == SymbolKind.Method
+    assert symbols["Größe.run"].detail == "(self, n: int=0) -> str"
+
+
+def test_ranges_use_characters_and_span_decorators(symbols):
+    cls = symbols["Größe"]
+    assert (cls.range.start.line, cls.range.start.character) == (12, 0)
+    name = cls.selection_range
+    # `ast` reports byte offsets; positions count characters.
+    assert (name.start.line, name.start.character, name.end.character) == (13, 6, 11)
+
+    run = symbols["Größe.run"].selection_range.start
+    assert (run.line, run.character) == (16, 14)
+
+
+def test_unsupported_files_have_no_parser():
+    assert get_parser(Path("main.rs")) is None
@@ -0,0 +1,105 @@
+import os
+from contextlib import AsyncExitStack
+
+import anyio
+import pytest
+
+from lsp_cli.manager import __main__ as manager_main
+from lsp_cli.utils.lock import file_lock, try_lock
+from lsp_cli.utils.socket import is_socket_alive
+from lsp_cli.utils.uds import listen_uds
+
+
+@pytest.mark.asyncio
+async def test_listen_uds_accepts_before_serving(tmp_path):
+    uds_path = tmp_path / "test.sock"
+
+    assert not await is_socket_alive(uds_path)
+
+    async with listen_uds(uds_path):
+        # No server is attached yet, but connections already succeed.
+        assert await is_socket_alive(uds_path)
+        assert await is_socket_alive(uds_path)
+
+    assert not uds_path.exists()
+    assert not await is_socket_alive(uds_path)
+
+
+@pytest.fixture
+def manager_paths(tmp_path, monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    monkeypatch.setattr(manager_main, "MANAGER_LOCK_PATH", tmp_path / "manager.lock")
+    monkeypatch.setattr(
+        manager_main, "MANAGER_LISTEN_LOCK_PATH", tmp_path / "manager.listen.lock"
+    )
+    monkeypatch.setattr(manager_main, "MANAGER_UDS_PATH", tmp_path / "manager.sock")
+    monkeypatch.setattr(manager_main, "LOCK_WAIT", 0.5)
+    signals: list[str] = []
+    monkeypatch.setattr(manager_main, "notify_ready", lambda: signals.append("ready"))
+    return signals
+
+
+@pytest.mark.asyncio
+async def test_deferring_manager_waits_for_the_holder(tmp_path, manager_paths):
+    holder = try_lock(tmp_path / "manager.lock")
+    assert holder is not None
+    try:
+        async with AsyncExitStack() as stack:
+            # A holder that stopped listening but never exits is not reported ready.
+            assert await manager_main.listen_or_defer(stack) is None
+            assert manager_paths == []
+
+            async with listen_uds(tmp_path / "manager.sock"):
+                assert await manager_main.listen_or_defer(stack) is None
+            assert manager_paths == ["ready"]
+    finally:
+        os.close(holder)
+
+
+@pytest.mark.asyncio
+async def test_deferring_manager_waits_for_a_starting_holder(tmp_path, manager_paths):
+    listening = anyio.Event()
+    done = anyio.Event()
+
+    async def start_holder() -> None:
+        async with AsyncExitStack() as stack:
+            async with file_lock(tmp_path / "manager.listen.lock"):
+                listening.set()
+                holder = try_lock(tmp_path / "manager.lock")
+                assert holder is not None
+                stack.callback(os.close, holder)
+                await anyio.sleep(0.1)
+                await stack.enter_async_context(listen_uds(tmp_path / "manager.sock"))
+            await done.wait()
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(start_holder)
+        await listening.wait()
+        async with AsyncExitStack() as stack:
+            assert await manager_main.listen_or_defer(stack) is None
+        done.set()
+    assert manager_paths == ["ready"]
+
+
+@pytest.mark.asyncio
+async def test_deferring_manager_takes_over_from_an_exiting_holder(
+    tmp_path, manager_paths
+):
+    holder = try_lock(tmp_path / "manager.lock")
+    assert holder is not None
+
+    async def release() -> None:
+        await anyio.sleep(0.1)
+        os.close(holder)
+
+    async with AsyncExitStack() as stack:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(release)
+            sock = await manager_main.listen_or_defer(stack)
+        assert sock is not None
+        assert await is_socket_alive(tmp_path / "manager.sock")
+        assert try_lock(tmp_path / "manager.lock") is None
+    assert not (tmp_path / "manager.sock").exists()
+    lock_fd = try_lock(tmp_path / "manager.lock")
+    assert lock_fd is not None
+    os.close(lock_fd)
+    assert manager_paths == []
@@ -0,0 +1,68 @@
+from collections.abc import Sequence
+from pathlib import Path
+
+from lsprotocol.types import DocumentSymbol, Position, Range, SymbolKind
+
+from lsp_cli.manager.unused import ReferenceCache, Witness, iter_candidates
+
+
+def _symbol(
+    name: str, kind: SymbolKind, line: int, children: Sequence[DocumentSymbol] = ()
+) -> DocumentSymbol:
+    span = Range(
+        start=Position(line=line, character=0), end=Position(line=line, character=9)
+    )
+    return DocumentSymbol(
+        name=name,
+        kind=kind,
+        range=span,
+        selection_range=span,
+        children=list(children),
+    )
+
+
+def test_top_level_symbols_and_members_of_types_are_checked():
+    symbols = [
+        _symbol(
+            "Shape",
+            SymbolKind.Class,
+            0,
+            [
+                _symbol("__init__", SymbolKind.Method, 1),
+                _symbol(
+                    "area",
+                    SymbolKind.Method,
+                    2,
+                    [_symbol("local", SymbolKind.Variable, 3)],
+                ),
+            ],
+        ),
+        _symbol(
+            "main", SymbolKind.Function, 5, [_symbol("inner", SymbolKind.Function, 6)]
+        ),
+        _symbol(
+            "pkg", SymbolKind.Module, 8, [_symbol("helper", SymbolKind.Function, 9)]
+        ),
+    ]
+    assert [c.name for c in iter_candidates(symbols)] == [
+        "Shape",
+        "Shape.area",
+        "main",
+        "pkg.helper",
+    ]
+
+
+def test_references_are_forgotten_when_files_change(tmp_path: Path):
+    cache = ReferenceCache(max_files=1)
+    user = tmp_path / "user.py"
+    user.write_text("area()\n")
+    cache.get(tmp_path / "a.py", "1").used[0, 4] = Witness.of(user)
+
+    assert cache.get(tmp_path / "a.py", "1").used[0, 4].holds()
+    user.write_text("pass\n")
+    assert not cache.get(tmp_path / "a.py", "1").used[0, 4].holds()
+    # A new content of the file, or too many files, forget its references.
+    assert not cache.get(tmp_path / "a.py", "2").used
+    cache.get(tmp_path / "a.py", "2").used[0, 4] = Witness.of(user)
+    cache.get(tmp_path / "b.py", "1")
+    assert not cache.get(tmp_path / "a.py", "2").used
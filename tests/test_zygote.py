@@ -0,0 +1,113 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from importlib.metadata import version
+from pathlib import Path
+
+import pytest
+
+from lsp_cli.__main__ import COMMANDS
+from lsp_cli.zygote import (
+    FALLBACK,
+    env_fingerprint,
+    recv_int,
+    recv_request,
+    send_int,
+    send_request,
+    shim,
+)
+
+
+def test_request_roundtrip_passes_stdio():
+    shim, zygote = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    with shim, zygote:
+        request = {"argv": ["lsp", "server", "list"], "cwd": "/", "env": {}}
+        send_request(shim, request)
+
+        received = recv_request(zygote)
+        assert received is not None
+        payload, fds = received
+        try:
+            assert payload == request
+            assert len(fds) == 3
+            assert all(os.path.sameopenfile(fd, i) for i, fd in enumerate(fds))
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+        send_int(zygote, FALLBACK)
+        assert recv_int(shim) == FALLBACK
+        zygote.close()
+        assert recv_int(shim) is None
+
+
+def test_env_fingerprint_only_keeps_import_time_variables():
+    env = {"LSP_DEBUG": "1", "XDG_RUNTIME_DIR": "/run", "HOME": "/h", "TERM": "xterm"}
+    assert env_fingerprint(env) == {
+        "LSP_DEBUG": "1",
+        "XDG_RUNTIME_DIR": "/run",
+        "HOME": "/h",
+    }
+
+
+@pytest.fixture
+def zygote(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """A zygote serving on a socket of its own, with matching environments."""
+    for name in ("XDG_RUNTIME_DIR", "XDG_STATE_HOME", "XDG_CONFIG_HOME"):
+        (tmp_path / name).mkdir(mode=0o700)
+        monkeypatch.setenv(name, str(tmp_path / name))
+    uds_path = tmp_path / "XDG_RUNTIME_DIR" / "lsp-cli" / "zygote.sock"
+    monkeypatch.setattr(shim, "ZYGOTE_UDS_PATH", uds_path)
+
+    process = subprocess.Popen(
+        (sys.executable, "-m", "lsp_cli.zygote"),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while not uds_path.exists():
+            assert process.poll() is None, "zygote exited"
+            assert time.monotonic() < deadline, "zygote did not start"
+            time.sleep(0.05)
+        yield uds_path
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def test_command_runs_in_a_zygote_worker(
+    zygote: Path, capfd: pytest.CaptureFixture[str]
+):
+    assert shim.run_in_zygote(["lsp", "--version"]) == 0
+    # The worker wrote to this process's stdout, as handed over.
+    assert capfd.readouterr().out.strip() == version("lsp-cli")
+
+
+def test_mismatched_environment_runs_in_process(
+    zygote: Path, monkeypatch: pytest.MonkeyPatch, capfd: pytest.CaptureFixture[str]
+):
+    monkeypatch.setenv("LSP_DEBUG", "1")
+    assert shim.run_in_zygote(["lsp", "--version"]) is None
+    monkeypatch.delenv("LSP_DEBUG")
+    # Another interpreter or installation of the CLI.
+    monkeypatch.setattr(shim, "runtime_stamp", lambda: ["/other/python"])
+    assert shim.run_in_zygote(["lsp", "--version"]) is None
+    assert not capfd.readouterr().out
+
+
+def test_zygote_preloads_every_command():
+    code = (
+        "import sys; from lsp_cli.zygote.__main__ import preload; preload(); "
+        "print(*sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    modules = set(result.stdout.split())
+    missing = [name for name in COMMANDS if f"lsp_cli.cli.{name}" not in modules]
+    assert not missing, f"Workers would import these commands themselves: {missing}"